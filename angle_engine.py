@@ -0,0 +1,110 @@
+import math
+
+import numpy as np
+
+NUM_LANDMARKS = 33  # MediaPipe Pose eklem sayısı
+LANDMARK_FIELDS = 4  # x, y, z, visibility
+
+
+def landmarks_to_array(landmarks, out=None):
+    """
+    MediaPipe eklem noktalarını (33, 4) float32 diziye dönüştürür.
+
+    Args:
+        landmarks: MediaPipe eklem noktaları veya hazır (33, 4) dizi
+        out: Yeniden kullanılacak (33, 4) float32 dizi (isteğe bağlı)
+
+    Returns:
+        np.ndarray: Sütunları x, y, z, visibility olan (33, 4) float32 dizi
+    """
+    if isinstance(landmarks, np.ndarray):
+        if out is None:
+            return landmarks if landmarks.dtype == np.float32 else landmarks.astype(np.float32)
+        np.copyto(out, landmarks, casting="same_kind")
+        return out
+
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+    out[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks]
+    return out
+
+
+def angle_xy(a_x, a_y, b_x, b_y, c_x, c_y):
+    """
+    Koordinatları verilen üç nokta arasındaki açıyı hesaplar (b noktasında).
+    Tek açı için NumPy yerine math kullanılır (skaler işlemlerde daha hızlı).
+
+    Returns:
+        float: Açı değeri (derece), vektörlerden biri sıfır uzunluktaysa NaN
+    """
+    ba_x, ba_y = a_x - b_x, a_y - b_y
+    bc_x, bc_y = c_x - b_x, c_y - b_y
+    norm = math.hypot(ba_x, ba_y) * math.hypot(bc_x, bc_y)
+    if norm == 0:
+        return math.nan
+    cosine_angle = (ba_x * bc_x + ba_y * bc_y) / norm
+    return math.degrees(math.acos(min(1.0, max(-1.0, cosine_angle))))
+
+
+class AngleEngine:
+    def __init__(self, triplets):
+        """
+        Verilen eklem üçlüleri için açıları tek bir vektörel çağrıda hesaplar.
+
+        Aynı üçlü birden fazla kez verilirse yalnızca bir kez hesaplanır.
+
+        Args:
+            triplets: (a, b, c) eklem indeksleri; açı b noktasındadır
+        """
+        self.slots = {}
+        unique = []
+        for triplet in triplets:
+            triplet = tuple(int(i) for i in triplet)
+            if triplet not in self.slots:
+                self.slots[triplet] = len(unique)
+                unique.append(triplet)
+        self.triplets = np.array(unique, dtype=np.intp).reshape(-1, 3)
+        self._triplet_list = [tuple(triplet) for triplet in self.triplets.tolist()]
+
+    def slot(self, triplet):
+        """
+        Üçlünün compute() çıktısındaki indeksini döndürür.
+        """
+        return self.slots[tuple(int(i) for i in triplet)]
+
+    def compute(self, landmark_array):
+        """
+        Tüm üçlülerin açılarını hesaplar.
+
+        Args:
+            landmark_array: (33, 4) dizi veya (N, 33, 4) kare yığını
+
+        Returns:
+            np.ndarray: Derece cinsinden açılar, (T,) veya (N, T)
+        """
+        xy = np.asarray(landmark_array)[..., :2].astype(np.float64)
+        a = xy[..., self.triplets[:, 0], :]
+        b = xy[..., self.triplets[:, 1], :]
+        c = xy[..., self.triplets[:, 2], :]
+        ba = a - b
+        bc = c - b
+
+        # Sıfır uzunluklu vektörlerde sonuç NaN olur (tek nokta hesabıyla aynı)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cosine_angle = (ba * bc).sum(axis=-1) / (np.hypot(ba[..., 0], ba[..., 1]) * np.hypot(bc[..., 0], bc[..., 1]))
+        return np.degrees(np.arccos(np.clip(cosine_angle, -1.0, 1.0)))
+
+    def compute_scalar(self, landmark_array):
+        """
+        Tek karenin açılarını üçlü başına math ile hesaplar. Birkaç üçlü için
+        compute()'tan hızlıdır: NumPy çağrılarının sabit maliyeti açı sayısından büyüktür.
+
+        Args:
+            landmark_array: (33, 4) dizi
+
+        Returns:
+            list: Derece cinsinden açılar (float), compute() ile aynı sırada
+        """
+        item = landmark_array.item
+        return [angle_xy(item(a, 0), item(a, 1), item(b, 0), item(b, 1), item(c, 0), item(c, 1))
+                for a, b, c in self._triplet_list]
@@ -0,0 +1,303 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import traceback
+
+import cv2
+
+from exercise_detection import ExerciseDetection
+from landmark_recording import LandmarkRecorder
+from pose_estimator import PoseEstimator
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# Her işçi sürecin kendi PoseEstimator nesnesi (process_video_worker tarafından kullanılır)
+_worker_pose = None
+
+
+def collect_videos(inputs):
+    """
+    Verilen dosya ve dizinlerden video dosyalarının listesini çıkarır.
+
+    Args:
+        inputs: Video dosyası veya dizin yolları
+
+    Returns:
+        list: Sıralı video dosyası yolları
+    """
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        elif os.path.isfile(path):
+            videos.append(path)
+        else:
+            print(f"Uyarı: {path} bulunamadı, atlanıyor.")
+    # Aynı dosya birden fazla kez verildiyse bir kez işlenir
+    unique = {}
+    for video in videos:
+        unique.setdefault(os.path.realpath(video), video)
+    return list(unique.values())
+
+
+def output_names(videos):
+    """
+    Videoların sonuç dosyası adlarını belirler: videoların ortak üst dizinine göre
+    uzantısız göreli yollar (a/x.mp4 ve b/x.mp4 için "a/x" ve "b/x"). Sonuçlar ve
+    kayıtlar çıktı dizininde aynı alt dizin yapısıyla yazılır.
+
+    Args:
+        videos: Video dosyası yolları
+
+    Returns:
+        dict: Video yolu -> göreli sonuç adı
+
+    Raises:
+        ValueError: İki video aynı ada düşerse (örneğin aynı dizindeki x.mp4 ve x.avi)
+    """
+    if not videos:
+        return {}
+    paths = [os.path.abspath(video) for video in videos]
+    root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    names = {}
+    owners = {}
+    for video, path in zip(videos, paths):
+        name = os.path.splitext(os.path.relpath(path, root))[0]
+        key = os.path.normcase(name)
+        if key in owners:
+            raise ValueError(f"{owners[key]} ve {video} aynı sonuç dosyasına yazılacaktı ({name}).")
+        owners[key] = video
+        names[video] = name
+    return names
+
+
+def init_worker(model_complexity):
+    """
+    İşçi süreç başlatıcısı: her süreç için bir PoseEstimator oluşturur ve ısıtır.
+    """
+    global _worker_pose
+    _worker_pose = PoseEstimator(static_image_mode=False, model_complexity=model_complexity,
+                                 min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    _worker_pose.warmup()
+
+
+def process_video(video_path, exercise_name, pose, record_path=None):
+    """
+    Bir videoyu ekran olmadan işler ve seçilen egzersizin tekrar sayısını ve
+    durum zaman çizelgesini çıkarır.
+
+    Args:
+        video_path: Video dosyasının yolu
+        exercise_name: ExerciseDetection içindeki egzersiz adı
+        pose: PoseEstimator nesnesi
+        record_path: Verilirse her karenin eklemleri bu dosyaya kaydedilir
+
+    Returns:
+        dict: Video için sonuçlar
+    """
+    exercise_detection = ExerciseDetection(monitor_all=False)
+    exercise_detection.subscribe(exercise_name)
+    exercise = exercise_detection.exercises[exercise_name]
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"{video_path} açılamadı.")
+
+    # Önceki videonun takip durumunu temizle
+    pose.reset()
+    recorder = LandmarkRecorder(record_path, append=False) if record_path else None
+
+    frame_count = 0
+    detected_frames = 0
+    timeline = []
+    last_state = None
+    last_count = None
+    start = time.perf_counter()
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            time_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+
+            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            landmarks = pose.estimate(image, time_ms)
+            if recorder is not None:
+                recorder.write(time_ms, landmarks)
+            if landmarks is not None:
+                detected_frames += 1
+                exercise_detection.detect_exercises(landmarks, time_ms)
+
+            # Yalnızca durum veya tekrar sayısı değiştiğinde zaman çizelgesine ekle
+            state = exercise.get_state()
+            count = exercise.get_repetition_count()
+            if state != last_state or count != last_count:
+                timeline.append({"frame": frame_count, "time_ms": round(time_ms, 1),
+                                 "state": state, "repetition_count": count})
+                last_state, last_count = state, count
+            frame_count += 1
+    finally:
+        cap.release()
+        if recorder is not None:
+            recorder.close()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "video": video_path,
+        "exercise": exercise_name,
+        "frames": frame_count,
+        "detected_frames": detected_frames,
+        "repetition_count": exercise.get_repetition_count(),
+        "processing_seconds": round(elapsed, 3),
+        "timeline": timeline,
+    }
+    if record_path:
+        result["recording"] = record_path
+    return result
+
+
+def process_video_worker(task):
+    """
+    Havuz işçisi: process_video'yu çağırır, hataları sonuç olarak döndürür.
+    """
+    video_path, exercise_name, record_path = task
+    try:
+        return process_video(video_path, exercise_name, _worker_pose, record_path)
+    except Exception as e:
+        traceback.print_exc()
+        return {"video": video_path, "exercise": exercise_name, "frames": 0, "error": str(e)}
+
+
+def write_result(result, output_dir, name):
+    """
+    Tek bir videonun sonucunu JSON dosyası olarak yazar.
+
+    Args:
+        result: process_video sonucu
+        output_dir: Sonuç dizini
+        name: output_names ile belirlenen göreli sonuç adı
+
+    Returns:
+        str: Yazılan dosyanın yolu
+    """
+    output_path = os.path.join(output_dir, f"{name}.json")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return output_path
+
+
+def recording_path(name, record_dir):
+    """
+    Videonun eklem kaydı dosyasının yolunu döndürür (gerekirse alt dizini oluşturur).
+
+    Args:
+        name: output_names ile belirlenen göreli sonuç adı
+        record_dir: Kayıt dizini
+    """
+    path = os.path.join(record_dir, f"{name}.lmk")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def run_batch(videos, exercise_name, output_dir, processes=None, model_complexity=1, record_dir=None):
+    """
+    Videoları süreç havuzuna dağıtır ve sonuçları yazar.
+
+    Args:
+        videos: Video dosyası yolları
+        exercise_name: Egzersiz adı
+        output_dir: Sonuçların yazılacağı dizin
+        processes: İşçi süreç sayısı (None ise tüm çekirdekler)
+        model_complexity: MediaPipe Pose model karmaşıklığı
+        record_dir: Verilirse her videonun eklemleri bu dizine .lmk dosyası olarak kaydedilir
+
+    Returns:
+        list: Tüm videoların sonuçları
+
+    Raises:
+        ValueError: İki videonun sonuç dosyası adı çakışırsa (işleme başlamadan önce)
+    """
+    names = output_names(videos)
+    os.makedirs(output_dir, exist_ok=True)
+    processes = processes or os.cpu_count() or 1
+    processes = min(processes, len(videos)) or 1
+    tasks = [(video, exercise_name, recording_path(names[video], record_dir) if record_dir else None)
+             for video in videos]
+
+    results = []
+    start = time.perf_counter()
+    # MediaPipe grafikleri fork sonrası güvenli değil, işçileri spawn ile başlat
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, initializer=init_worker, initargs=(model_complexity,)) as pool:
+        for result in pool.imap_unordered(process_video_worker, tasks):
+            results.append(result)
+            if "error" in result:
+                print(f"{result['video']}: hata - {result['error']}")
+                continue
+            write_result(result, output_dir, names[result["video"]])
+            print(f"{result['video']}: {result['repetition_count']} tekrar, {result['frames']} kare")
+    elapsed = time.perf_counter() - start
+
+    total_frames = sum(result["frames"] for result in results)
+    throughput = total_frames / elapsed if elapsed > 0 else 0.0
+    summary = {
+        "exercise": exercise_name,
+        "videos": len(videos),
+        "processes": processes,
+        "total_frames": total_frames,
+        "elapsed_seconds": round(elapsed, 3),
+        "frames_per_second": round(throughput, 1),
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"Toplam {total_frames} kare {elapsed:.1f} s içinde işlendi "
+          f"({throughput:.1f} FPS, {processes} süreç).")
+    return results
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Kayıtlı videoları toplu olarak işler")
+    parser.add_argument("inputs", nargs="+", help="Video dosyaları veya video içeren dizinler")
+    parser.add_argument("--exercise", required=True, help="Egzersiz adı (örneğin: squat)")
+    parser.add_argument("--output", default="batch_results", help="Sonuç dizini")
+    parser.add_argument("--processes", type=int, default=None, help="İşçi süreç sayısı (varsayılan: tüm çekirdekler)")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=(0, 1, 2),
+                        help="MediaPipe Pose model karmaşıklığı")
+    parser.add_argument("--record-dir", default=None,
+                        help="Her videonun eklemlerini yeniden analiz için bu dizine kaydet")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    exercise_names = list(ExerciseDetection().exercises.keys())
+    if args.exercise not in exercise_names:
+        print(f"Hata: {args.exercise} egzersizi ExerciseDetection içinde bulunamadı.")
+        print(f"Mevcut egzersizler: {exercise_names}")
+        return 1
+
+    videos = collect_videos(args.inputs)
+    if not videos:
+        print("İşlenecek video bulunamadı.")
+        return 1
+
+    try:
+        output_names(videos)
+    except ValueError as e:
+        print(f"Hata: {e}")
+        return 1
+
+    run_batch(videos, args.exercise, args.output, args.processes, args.model_complexity, args.record_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
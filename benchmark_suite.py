@@ -0,0 +1,423 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from angle_engine import AngleEngine
+from exercise_classes import ExerciseBase
+from exercise_detection import ExerciseDetection
+from exercise_engine import NOMINAL_FRAME_MS, ExerciseEngine, advance_state_machines
+from exercise_specs import EXERCISE_SPECS
+from ExerciseStateMachine import ExerciseStateMachine
+from hud import ExerciseHud
+from landmark_codec import decode_landmark_stream, encode_landmark_stream
+from landmark_filter import FILTERED_STABLE_MS, OneEuroFilter
+from landmark_recording import LandmarkRecording
+from LumbarSideBendingFlexion import LumbarSideBendingFlexion
+from skeleton_renderer import SkeletonRenderer
+from Squat import Squat
+from synthetic_landmarks import SyntheticExercise
+
+RESOLUTIONS = {"720p": (720, 1280), "1080p": (1080, 1920)}
+
+
+def synthetic_landmarks(n_frames=1000, seed=0, fps=30.0):
+    """
+    Benchmark için tekrarlanabilir squat dizisi üretir (poz kaybı olmadan).
+
+    Returns:
+        tuple: ((n, 33, 4) float32 eklemler, (n,) zaman damgaları ms)
+    """
+    repetitions = int(n_frames / fps / 2.5) + 1
+    synthetic = SyntheticExercise("squat", repetitions=repetitions, fps=fps, seed=seed)
+    timestamps_ms, landmarks = synthetic.generate(0, n_frames)
+    return landmarks, timestamps_ms
+
+
+def recorded_landmarks(path, limit=None):
+    """
+    Kayıttaki poz bulunan kareleri döndürür.
+
+    Returns:
+        tuple: ((n, 33, 4) float32 eklemler, (n,) zaman damgaları ms)
+    """
+    recording = LandmarkRecording(path)
+    detected = recording.detected()
+    landmarks = np.array(recording.landmarks[detected][:limit])
+    timestamps_ms = np.array(recording.timestamps_ms[detected][:limit])
+    return landmarks, timestamps_ms
+
+
+def as_mediapipe(landmarks):
+    """
+    (33, 4) dizileri MediaPipe eklem nesnelerine (x, y, z, visibility alanları) çevirir.
+    """
+    return [[SimpleNamespace(x=float(x), y=float(y), z=float(z), visibility=float(v)) for x, y, z, v in frame]
+            for frame in landmarks]
+
+
+def measure(function, operations, repeats=5, min_seconds=0.2):
+    """
+    function'ı operations işlem yapan bir tur olarak ölçer. Bir turun en az
+    min_seconds sürmesi için tur içinde tekrar sayısı artırılır.
+
+    Returns:
+        dict: ns_per_op (en iyi tur), median_ns_per_op, ops_per_second, number, repeats
+    """
+    function()  # Isınma
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds or number >= 1 << 20:
+            break
+        number *= 2
+
+    timings = [elapsed]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append(time.perf_counter() - start)
+
+    per_op = [timing / (number * operations) * 1e9 for timing in timings]
+    best = min(per_op)
+    return {
+        "ns_per_op": round(best, 1),
+        "median_ns_per_op": round(statistics.median(per_op), 1),
+        "ops_per_second": round(1e9 / best, 1),
+        "operations": operations,
+        "number": number,
+        "repeats": repeats,
+    }
+
+
+def angle_benchmarks(landmarks):
+    """
+    Tek açı hesaplama varyantları: ExerciseBase (hypot + acos), Squat.py (sqrt + acos),
+    LumbarSideBendingFlexion.py (atan2 farkı), AngleEngine (vektörel ve skaler yol).
+    """
+    a, b, c = (23, 25, 27)
+    points = as_mediapipe(landmarks[:, [a, b, c]])
+    xy = [[(p.x, p.y) for p in frame] for frame in points]
+    base = ExerciseBase()
+    lumbar = LumbarSideBendingFlexion.__new__(LumbarSideBendingFlexion)
+    squat = Squat.__new__(Squat)
+    n = len(points)
+
+    def exercise_base():
+        for p in points:
+            base.calculate_angle(p[0], p[1], p[2])
+
+    def atan2_lumbar():
+        for p in points:
+            lumbar.calculate_angle(p[0], p[1], p[2])
+
+    def acos_squat():
+        for p in xy:
+            squat.calculate_angle(p[0], p[1], p[2])
+
+    single = AngleEngine([(a, b, c)])
+    every = AngleEngine(spec.landmark_indices for spec in EXERCISE_SPECS.values())
+
+    def engine_single():
+        for frame in landmarks:
+            single.compute(frame)
+
+    def engine_single_scalar():
+        for frame in landmarks:
+            single.compute_scalar(frame)
+
+    def engine_all_exercises():
+        for frame in landmarks:
+            every.compute(frame)
+
+    def engine_batch():
+        every.compute(landmarks)
+
+    return {
+        "angle.exercise_base": measure(exercise_base, n),
+        "angle.atan2_lumbar": measure(atan2_lumbar, n),
+        "angle.acos_squat": measure(acos_squat, n),
+        "angle.angle_engine_single": measure(engine_single, n),
+        "angle.angle_engine_single_scalar": measure(engine_single_scalar, n),
+        "angle.angle_engine_all_exercises": measure(engine_all_exercises, n),
+        "angle.angle_engine_batch_all_exercises": measure(engine_batch, n),
+    }
+
+
+def detection_benchmarks(landmarks, timestamps_ms):
+    """
+    detect_exercises: on egzersizin tamamı (izleme modu), tek abonelik ve tepe/çukur
+    sayımlı veya eklem filtreli tek abonelik.
+    """
+    frames = list(zip(landmarks, timestamps_ms))
+    mediapipe_frames = as_mediapipe(landmarks)
+
+    def run(monitor_all, inputs, filtered=False, **options):
+        def function():
+            if filtered:
+                options.update(landmark_filter=OneEuroFilter(), required_stable_ms=FILTERED_STABLE_MS)
+            exercise_detection = ExerciseDetection(monitor_all=monitor_all, **options)
+            if not monitor_all:
+                exercise_detection.subscribe("squat")
+            for frame, timestamp_ms in inputs:
+                exercise_detection.detect_exercises(frame, timestamp_ms)
+        return function
+
+    return {
+        "detect_exercises.all_ten": measure(run(True, frames), len(frames)),
+        "detect_exercises.all_ten_mediapipe_objects": measure(
+            run(True, list(zip(mediapipe_frames, timestamps_ms))), len(frames)),
+        "detect_exercises.single_subscription": measure(run(False, frames), len(frames)),
+        "detect_exercises.single_mediapipe_objects": measure(
+            run(False, list(zip(mediapipe_frames, timestamps_ms))), len(frames)),
+        "detect_exercises.single_peak_counting": measure(run(False, frames, peak_counting=("squat",)), len(frames)),
+        "detect_exercises.single_landmark_filter": measure(run(False, frames, filtered=True), len(frames)),
+    }
+
+
+def state_machine_benchmarks(landmarks):
+    """
+    Eski ExerciseStateMachine.update_state ile motorun güncellemesi: tek egzersiz ve
+    on egzersiz, skaler hızlı yol (SCALAR_MAX_ROWS) ve vektörel adım.
+    """
+    engine = AngleEngine([(23, 25, 27)])
+    angles = [float(angle) for angle in engine.compute(landmarks)[:, 0]]
+    specs = list(EXERCISE_SPECS.values())
+    all_angles = np.repeat(np.array(angles)[:, None], len(specs), axis=1)
+    timestamps_ms = [i * NOMINAL_FRAME_MS for i in range(len(angles))]
+
+    def legacy():
+        state_machine = ExerciseStateMachine("Squat", "knee", 120, 150)
+        for angle in angles:
+            state_machine.update_state(angle)
+
+    def engine_single():
+        exercise_engine = ExerciseEngine(specs[:1])
+        rows = exercise_engine.active_rows
+        for angle, timestamp_ms in zip(angles, timestamps_ms):
+            exercise_engine.update_angles([angle], rows, timestamp_ms)
+
+    def engine_all_ten():
+        exercise_engine = ExerciseEngine(specs)
+        rows = exercise_engine.active_rows
+        for frame_angles, timestamp_ms in zip(all_angles, timestamps_ms):
+            exercise_engine.update_angles(frame_angles, rows, timestamp_ms)
+
+    def engine_all_ten_vectorized():
+        exercise_engine = ExerciseEngine(specs)
+        rows = exercise_engine.active_rows
+        for frame_angles, timestamp_ms in zip(all_angles, timestamps_ms):
+            advance_state_machines(exercise_engine, rows, rows, frame_angles, timestamp_ms)
+
+    return {
+        "state_machine.exercise_state_machine": measure(legacy, len(angles)),
+        "state_machine.engine_single": measure(engine_single, len(angles)),
+        "state_machine.engine_all_ten": measure(engine_all_ten, len(angles)),
+        "state_machine.engine_all_ten_vectorized": measure(engine_all_ten_vectorized, len(angles)),
+    }
+
+
+def render_benchmarks(landmarks, resolutions=RESOLUTIONS):
+    """
+    İskelet ve ekran yazıları: vektörel çizim + önbellekli katmanlar ile eski
+    eklem başına cv2.circle / cv2.line + cv2.putText döngüsü.
+    """
+    import mediapipe as mp
+    connections = list(mp.solutions.pose.POSE_CONNECTIONS)
+    renderer = SkeletonRenderer(connections)
+    frames = landmarks[:min(len(landmarks), 100)]
+
+    def legacy_draw(frame, landmark_array):
+        height, width = frame.shape[:2]
+        for landmark in landmark_array:
+            cv2.circle(frame, (int(landmark[0] * width), int(landmark[1] * height)), 5, (0, 255, 0), -1)
+        for start_idx, end_idx in connections:
+            start, end = landmark_array[start_idx], landmark_array[end_idx]
+            cv2.line(frame, (int(start[0] * width), int(start[1] * height)),
+                     (int(end[0] * width), int(end[1] * height)), (255, 0, 0), 2)
+        cv2.putText(frame, "Repetitions: 3", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
+        cv2.putText(frame, "Squat: Down (3 reps)", (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
+        cv2.putText(frame, "Selected Exercise: Squat", (20, 180), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 0, 0), 3)
+
+    results = {}
+    for label, (height, width) in resolutions.items():
+        canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        hud = ExerciseHud("Squat")
+
+        def current(canvas=canvas, hud=hud):
+            for landmark_array in frames:
+                renderer.draw(canvas, landmark_array)
+                hud.draw_stats(canvas, 3, "Down (3 reps)")
+
+        def legacy(canvas=canvas):
+            for landmark_array in frames:
+                legacy_draw(canvas, landmark_array)
+
+        results[f"render.{label}"] = measure(current, len(frames))
+        results[f"render.{label}_legacy"] = measure(legacy, len(frames))
+    return results
+
+
+def codec_benchmarks(landmarks, timestamps_ms):
+    """
+    Eklem akışı kodlayıcısı (landmark_codec): kare başına kodlama ve çözme.
+    """
+    encoded = encode_landmark_stream(timestamps_ms, landmarks)
+    return {
+        "codec.encode": measure(lambda: encode_landmark_stream(timestamps_ms, landmarks), len(landmarks)),
+        "codec.decode": measure(lambda: decode_landmark_stream(encoded), len(landmarks)),
+    }
+
+
+SUITES = {
+    "angle": lambda landmarks, timestamps_ms: angle_benchmarks(landmarks),
+    "detection": detection_benchmarks,
+    "state_machine": lambda landmarks, timestamps_ms: state_machine_benchmarks(landmarks),
+    "render": lambda landmarks, timestamps_ms: render_benchmarks(landmarks),
+    "codec": codec_benchmarks,
+}
+
+
+def environment():
+    """
+    Sonuçların karşılaştırılabilmesi için ortam bilgisi.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run_suite(suites=tuple(SUITES), recording=None, frames=1000, seed=0):
+    """
+    Seçili benchmark gruplarını çalıştırır.
+
+    Args:
+        suites: SUITES anahtarları
+        recording: .lmk kayıt dosyası (None ise sentetik veri)
+        frames: Kullanılacak kare sayısı
+        seed: Sentetik veri tohumu
+
+    Returns:
+        dict: "environment", "data" ve "results" alanları
+    """
+    if recording:
+        landmarks, timestamps_ms = recorded_landmarks(recording, frames)
+        data = {"source": recording, "frames": len(landmarks)}
+    else:
+        landmarks, timestamps_ms = synthetic_landmarks(frames, seed)
+        data = {"source": "synthetic", "exercise": "squat", "frames": frames, "seed": seed}
+
+    results = {}
+    for suite in suites:
+        results.update(SUITES[suite](landmarks, timestamps_ms))
+    return {"environment": environment(), "data": data, "results": results}
+
+
+def compare(baseline, candidate, threshold=0.1):
+    """
+    İki sonuç dosyasını karşılaştırır.
+
+    Args:
+        baseline: Temel sonuçlar (run_suite çıktısı)
+        candidate: Karşılaştırılan sonuçlar
+        threshold: Bu orandan fazla yavaşlama gerileme sayılır
+
+    Returns:
+        tuple: (satırlar, gerileme olan benchmark adları)
+    """
+    rows = []
+    regressions = []
+    for name, result in candidate["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            rows.append((name, None, result["ns_per_op"], None))
+            continue
+        ratio = result["ns_per_op"] / base["ns_per_op"]
+        rows.append((name, base["ns_per_op"], result["ns_per_op"], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_results(results):
+    lines = [f"{'benchmark':<46}{'ns/op':>14}{'ops/s':>16}"]
+    for name, result in results["results"].items():
+        lines.append(f"{name:<46}{result['ns_per_op']:>14,.1f}{result['ops_per_second']:>16,.0f}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows):
+    lines = [f"{'benchmark':<46}{'önce ns/op':>14}{'sonra ns/op':>14}{'oran':>8}"]
+    for name, before, after, ratio in rows:
+        before_text = "-" if before is None else f"{before:,.1f}"
+        ratio_text = "yeni" if ratio is None else f"{ratio:.2f}x"
+        lines.append(f"{name:<46}{before_text:>14}{after:>14,.1f}{ratio_text:>8}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Açı hesaplama, durum makinesi ve çizim benchmarkları")
+    parser.add_argument("--suites", nargs="+", choices=list(SUITES), default=list(SUITES))
+    parser.add_argument("--recording", default=None, help="Sentetik veri yerine kullanılacak .lmk kaydı")
+    parser.add_argument("--frames", type=int, default=1000, help="Kullanılacak kare sayısı")
+    parser.add_argument("--seed", type=int, default=0, help="Sentetik veri tohumu")
+    parser.add_argument("--output", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="İki sonuç dosyasını karşılaştır (benchmark çalıştırmaz)")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Karşılaştırmada gerileme sayılacak yavaşlama oranı")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            candidate = json.load(f)
+        rows, regressions = compare(baseline, candidate, args.threshold)
+        print(format_comparison(rows))
+        if regressions:
+            print(f"Gerileme ({args.threshold:.0%} üzeri yavaşlama): {', '.join(regressions)}")
+            return 1
+        return 0
+
+    results = run_suite(args.suites, args.recording, args.frames, args.seed)
+    print(format_results(results), file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+import json
+import sys
+
+
+class JsonLinesWriter:
+    def __init__(self, path="-", flush=True):
+        """
+        Olayları satır başına bir JSON nesnesi olarak yazar.
+
+        Args:
+            path: Çıktı dosyasının yolu ("-" ise standart çıktı)
+            flush: True ise her olaydan sonra tampon boşaltılır (canlı izleme için)
+        """
+        self.path = path
+        self.flush = flush
+        self.stream = sys.stdout if path == "-" else open(path, "a", encoding="utf-8")
+        self.events_written = 0
+
+    def write(self, event):
+        """
+        Tek bir olayı yazar.
+
+        Args:
+            event: JSON'a dönüştürülebilir sözlük
+        """
+        self.stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.events_written += 1
+        if self.flush:
+            self.stream.flush()
+
+    def write_all(self, events):
+        """
+        Olay listesini yazar.
+        """
+        for event in events:
+            self.write(event)
+
+    def close(self):
+        """
+        Dosyayı kapatır (standart çıktı açık bırakılır).
+        """
+        if self.stream is not sys.stdout:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
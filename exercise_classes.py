@@ -1,24 +1,58 @@
-import cv2
-import mediapipe as mp
 import numpy as np
 
+from angle_engine import angle_xy
+from exercise_engine import ExerciseEngine, MAX_ANGULAR_SPEED, MAX_FRAME_GAP_MS, NOMINAL_FRAME_MS, REQUIRED_STABLE_MS
+from exercise_specs import get_spec
+from peak_detector import FSM_COUNTING, PEAK_COUNTING
+
 class ExerciseBase:
+    landmark_indices = None  # Açının hesaplandığı (a, b, c) eklem indeksleri, açı b noktasında
+
     def __init__(self):
         self.keypoints = None
         self.repetition_count = 0
         self.state = "up"  # Başlangıç durumu
         self.confidence_threshold = 0.7  # Güven eşiği
-        self.stable_frames = 0  # Kararlı kare sayısı
-        self.required_stable_frames = 5  # Gerekli kararlı kare sayısı
+        self.stable_ms = 0.0  # Açının kesintisiz kararlı kaldığı süre (ms)
+        self.required_stable_ms = REQUIRED_STABLE_MS  # Gerekli kararlılık süresi (ms)
         self.previous_angle = None  # Önceki açı değeri
+        self.previous_time_ms = None  # Önceki açının zaman damgası (ms)
         self.in_progress = False  # Egzersiz devam ediyor mu?
 
-    def update_state(self, landmarks):
+    def update_state(self, landmarks, timestamp_ms=None):
         """
         Egzersiz durumunu günceller.
         
         Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
+            landmarks: MediaPipe tarafından tespit edilen eklem noktaları veya (33, 4) dizi
+            timestamp_ms: Karenin zaman damgası (ms, isteğe bağlı)
+        """
+        a, b, c = (landmarks[i] for i in self.landmark_indices)
+        if isinstance(landmarks, np.ndarray):
+            angle = self.calculate_angle_xy(a[0], a[1], b[0], b[1], c[0], c[1])
+        else:
+            angle = self.calculate_angle(a, b, c)
+        self.update_angle(self.transform_angle(angle), timestamp_ms)
+
+    def transform_angle(self, angle):
+        """
+        Hesaplanan eklem açısını egzersizin kullandığı açıya dönüştürür.
+        
+        Args:
+            angle: Eklem açısı (derece)
+            
+        Returns:
+            float: Egzersiz açısı (derece)
+        """
+        return angle
+
+    def update_angle(self, angle, timestamp_ms=None):
+        """
+        Egzersiz durumunu önceden hesaplanmış açıya göre günceller.
+        
+        Args:
+            angle: Eklem açısı (derece)
+            timestamp_ms: Karenin zaman damgası (ms, isteğe bağlı)
         """
         # Bu metod alt sınıflar tarafından override edilmelidir
         pass
@@ -51,47 +85,53 @@ class ExerciseBase:
         Returns:
             float: Açı değeri (derece)
         """
-        # Noktaların koordinatlarını al
-        a_x, a_y = a.x, a.y
-        b_x, b_y = b.x, b.y
-        c_x, c_y = c.x, c.y
-        
-        # Vektörleri hesapla
-        ba_x, ba_y = a_x - b_x, a_y - b_y
-        bc_x, bc_y = c_x - b_x, c_y - b_y
-        
-        # Açıyı hesapla
-        cosine_angle = (ba_x * bc_x + ba_y * bc_y) / (np.sqrt(ba_x**2 + ba_y**2) * np.sqrt(bc_x**2 + bc_y**2))
-        angle = np.arccos(np.clip(cosine_angle, -1.0, 1.0))
-        
-        # Radyandan dereceye çevir
-        angle = np.degrees(angle)
-        
-        return angle
+        return self.calculate_angle_xy(a.x, a.y, b.x, b.y, c.x, c.y)
+
+    @staticmethod
+    def calculate_angle_xy(a_x, a_y, b_x, b_y, c_x, c_y):
+        """
+        Koordinatları verilen üç nokta arasındaki açıyı hesaplar (angle_xy).
+
+        Returns:
+            float: Açı değeri (derece), vektörlerden biri sıfır uzunluktaysa NaN
+        """
+        return angle_xy(a_x, a_y, b_x, b_y, c_x, c_y)
     
-    def is_stable(self, current_angle):
+    def is_stable(self, current_angle, timestamp_ms=None):
         """
-        Açının kararlı olup olmadığını kontrol eder.
+        Açının kararlı olup olmadığını kare sayısına değil zamana göre kontrol eder.
+        Açısal hız MAX_ANGULAR_SPEED altında kaldığı sürece kararlılık süresi birikir.
         
         Args:
             current_angle: Mevcut açı değeri
+            timestamp_ms: Karenin zaman damgası (ms). None ise önceki damgaya
+                NOMINAL_FRAME_MS eklenir.
             
         Returns:
-            bool: Açı kararlı ise True, değilse False
+            bool: Açı en az required_stable_ms boyunca kararlı ise True, değilse False
         """
-        if self.previous_angle is None:
+        if timestamp_ms is None:
+            timestamp_ms = (self.previous_time_ms or 0.0) + NOMINAL_FRAME_MS
+
+        elapsed_ms = None if self.previous_time_ms is None else timestamp_ms - self.previous_time_ms
+        # İlk karede, uzun bir boşluktan sonra veya zaman tekrarlandığında / geri gittiğinde baştan başla
+        if self.previous_angle is None or not 0 < elapsed_ms <= MAX_FRAME_GAP_MS:
             self.previous_angle = current_angle
+            self.previous_time_ms = timestamp_ms
+            self.stable_ms = 0.0
             return False
         
-        # Açı değişimi çok küçükse, kararlı kabul et
-        if abs(current_angle - self.previous_angle) < 5:
-            self.stable_frames += 1
+        # Açısal hız küçükse, kararlı kabul et
+        speed = abs(current_angle - self.previous_angle) * 1000.0 / elapsed_ms
+        if speed < MAX_ANGULAR_SPEED:
+            self.stable_ms += elapsed_ms
         else:
-            self.stable_frames = 0
+            self.stable_ms = 0.0
             
         self.previous_angle = current_angle
+        self.previous_time_ms = timestamp_ms
         
-        return self.stable_frames >= self.required_stable_frames
+        return self.stable_ms >= self.required_stable_ms
     
     def get_state(self):
         """
@@ -102,412 +142,152 @@ class ExerciseBase:
         """
         return self.state
 
-class Squat(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 120  # Squat için eşik açısı
-        self.min_angle = 90  # Minimum açı (tam squat)
-        self.max_angle = 170  # Maksimum açı (tam dik)
-        
-    def update_state(self, landmarks):
-        """
-        Squat egzersizi için durumu günceller.
-        
-        Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
-        """
-        # Kalça, diz ve ayak bileği noktalarını al
-        hip = landmarks[23]  # Sol kalça
-        knee = landmarks[25]  # Sol diz
-        ankle = landmarks[27]  # Sol ayak bileği
-        
-        # Diz açısını hesapla
-        angle = self.calculate_angle(hip, knee, ankle)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı dik durumdaysa, egzersizi başlat
-        if not self.in_progress and angle > self.max_angle - 10:
-            self.in_progress = True
-            self.state = "up"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle < self.threshold_angle and self.state == "up":
-                self.state = "down"
-            elif angle > self.max_angle - 20 and self.state == "down":
-                self.state = "up"
-                self.repetition_count += 1
-
-class NeckFlexionExtension(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 150  # Boyun fleksiyon/ekstansiyon için eşik açısı
-        self.min_angle = 130  # Minimum açı (tam fleksiyon)
-        self.max_angle = 170  # Maksimum açı (tam ekstansiyon)
-        
-    def update_state(self, landmarks):
-        """
-        Boyun fleksiyon/ekstansiyon egzersizi için durumu günceller.
-        
-        Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
-        """
-        # Burun, boyun ve omuz noktalarını al
-        nose = landmarks[0]  # Burun
-        neck = landmarks[11]  # Boyun (omuz ortası)
-        shoulder = landmarks[12]  # Sağ omuz
-        
-        # Boyun açısını hesapla
-        angle = self.calculate_angle(nose, neck, shoulder)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı dik durumdaysa, egzersizi başlat
-        if not self.in_progress and angle > self.max_angle - 10:
-            self.in_progress = True
-            self.state = "up"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle < self.threshold_angle and self.state == "up":
-                self.state = "down"
-            elif angle > self.max_angle - 20 and self.state == "down":
-                self.state = "up"
-                self.repetition_count += 1
-
-class ShoulderRegion(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 100  # Omuz bölgesi için eşik açısı
-        self.min_angle = 80  # Minimum açı
-        self.max_angle = 160  # Maksimum açı
-        
-    def update_state(self, landmarks):
-        """
-        Omuz bölgesi egzersizi için durumu günceller.
-        
-        Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
-        """
-        # Omuz, dirsek ve bilek noktalarını al
-        shoulder = landmarks[11]  # Sol omuz
-        elbow = landmarks[13]  # Sol dirsek
-        wrist = landmarks[15]  # Sol bilek
-        
-        # Omuz açısını hesapla
-        angle = self.calculate_angle(shoulder, elbow, wrist)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı kolları aşağıdaysa, egzersizi başlat
-        if not self.in_progress and angle > self.max_angle - 10:
-            self.in_progress = True
-            self.state = "down"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle < self.threshold_angle and self.state == "down":
-                self.state = "up"
-            elif angle > self.max_angle - 20 and self.state == "up":
-                self.state = "down"
-                self.repetition_count += 1
-
-class ArmRaiseLateralFront(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 90  # Kol kaldırma için eşik açısı
-        self.min_angle = 30  # Minimum açı
-        self.max_angle = 150  # Maksimum açı
-        
-    def update_state(self, landmarks):
-        """
-        Kol kaldırma egzersizi için durumu günceller.
-        
-        Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
-        """
-        # Omuz, kalça ve dirsek noktalarını al
-        shoulder = landmarks[11]  # Sol omuz
-        hip = landmarks[23]  # Sol kalça
-        elbow = landmarks[13]  # Sol dirsek
-        
-        # Kol açısını hesapla
-        angle = self.calculate_angle(hip, shoulder, elbow)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı kolları aşağıdaysa, egzersizi başlat
-        if not self.in_progress and angle < self.min_angle + 10:
-            self.in_progress = True
-            self.state = "down"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle > self.threshold_angle and self.state == "down":
-                self.state = "up"
-            elif angle < self.min_angle + 20 and self.state == "up":
-                self.state = "down"
-                self.repetition_count += 1
-
-class ThoracicExtension(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 160  # Torasik ekstansiyon için eşik açısı
-        self.min_angle = 140  # Minimum açı
-        self.max_angle = 180  # Maksimum açı
-        
-    def update_state(self, landmarks):
-        """
-        Torasik ekstansiyon egzersizi için durumu günceller.
-        
-        Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
-        """
-        # Omuz, kalça ve diz noktalarını al
-        shoulder = landmarks[11]  # Sol omuz
-        hip = landmarks[23]  # Sol kalça
-        knee = landmarks[25]  # Sol diz
-        
-        # Sırt açısını hesapla
-        angle = self.calculate_angle(shoulder, hip, knee)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı dik durumdaysa, egzersizi başlat
-        if not self.in_progress and angle > self.max_angle - 10:
-            self.in_progress = True
-            self.state = "up"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle < self.threshold_angle and self.state == "up":
-                self.state = "down"
-            elif angle > self.max_angle - 20 and self.state == "down":
-                self.state = "up"
-                self.repetition_count += 1
-
-class LumbarSideBendingFlexion(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 160  # Lumbar yan eğilme için eşik açısı
-        self.min_angle = 140  # Minimum açı
-        self.max_angle = 180  # Maksimum açı
-        
-    def update_state(self, landmarks):
-        """
-        Lumbar yan eğilme egzersizi için durumu günceller.
-        
-        Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
-        """
-        # Omuz, kalça ve ayak bileği noktalarını al
-        shoulder = landmarks[11]  # Sol omuz
-        hip = landmarks[23]  # Sol kalça
-        ankle = landmarks[27]  # Sol ayak bileği
-        
-        # Yan eğilme açısını hesapla
-        angle = self.calculate_angle(shoulder, hip, ankle)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı dik durumdaysa, egzersizi başlat
-        if not self.in_progress and angle > self.max_angle - 10:
-            self.in_progress = True
-            self.state = "up"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle < self.threshold_angle and self.state == "up":
-                self.state = "down"
-            elif angle > self.max_angle - 20 and self.state == "down":
-                self.state = "up"
-                self.repetition_count += 1
-
-class HipAbduction(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 30  # Kalça abduksiyonu için eşik açısı
-        self.min_angle = 10  # Minimum açı
-        self.max_angle = 45  # Maksimum açı
-        
-    def update_state(self, landmarks):
-        """
-        Kalça abduksiyonu egzersizi için durumu günceller.
-        
-        Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
-        """
-        # Kalça, diz ve ayak bileği noktalarını al
-        hip_left = landmarks[23]  # Sol kalça
-        hip_right = landmarks[24]  # Sağ kalça
-        knee_left = landmarks[25]  # Sol diz
-        
-        # Kalça açısını hesapla
-        angle = self.calculate_angle(hip_right, hip_left, knee_left)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı bacakları kapalıysa, egzersizi başlat
-        if not self.in_progress and angle < self.min_angle + 10:
-            self.in_progress = True
-            self.state = "closed"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle > self.threshold_angle and self.state == "closed":
-                self.state = "open"
-            elif angle < self.min_angle + 10 and self.state == "open":
-                self.state = "closed"
-                self.repetition_count += 1
-
-class KneeFlexionExtension(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 120  # Diz fleksiyon/ekstansiyon için eşik açısı
-        self.min_angle = 90  # Minimum açı
-        self.max_angle = 170  # Maksimum açı
-        
-    def update_state(self, landmarks):
+class SpecExercise(ExerciseBase):
+    spec_name = None  # Alt sınıflar için varsayılan egzersiz tanımı
+
+    def __init__(self, spec=None, engine=None, row=None):
         """
-        Diz fleksiyon/ekstansiyon egzersizi için durumu günceller.
-        
+        Egzersiz tanımıyla (ExerciseSpec) çalışan genel egzersiz sınıfı.
+
+        Durum alanları ExerciseEngine dizilerinde tutulur; bu nesne motordaki bir
+        satırın görünümüdür. Motor verilmezse yalnızca bu egzersiz için bir motor
+        oluşturulur.
+
         Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
-        """
-        # Kalça, diz ve ayak bileği noktalarını al
-        hip = landmarks[23]  # Sol kalça
-        knee = landmarks[25]  # Sol diz
-        ankle = landmarks[27]  # Sol ayak bileği
-        
-        # Diz açısını hesapla
-        angle = self.calculate_angle(hip, knee, ankle)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı bacak düzse, egzersizi başlat
-        if not self.in_progress and angle > self.max_angle - 10:
-            self.in_progress = True
-            self.state = "extended"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle < self.threshold_angle and self.state == "extended":
-                self.state = "flexed"
-            elif angle > self.max_angle - 20 and self.state == "flexed":
-                self.state = "extended"
-                self.repetition_count += 1
-
-class LegRaiseStraightLegRaise(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 45  # Bacak kaldırma için eşik açısı
-        self.min_angle = 10  # Minimum açı
-        self.max_angle = 60  # Maksimum açı
-        
-    def update_state(self, landmarks):
+            spec: ExerciseSpec nesnesi (None ise spec_name ile kayıt defterinden alınır)
+            engine: Paylaşılan ExerciseEngine (isteğe bağlı)
+            row: Egzersizin motordaki satırı (engine verildiyse)
+        """
+        if spec is None:
+            spec = get_spec(self.spec_name) if engine is None else engine.specs[row]
+        if engine is None:
+            engine, row = ExerciseEngine([spec]), 0
+        elif row is None:
+            row = engine.rows[spec.name]
+        self.spec = spec
+        self.engine = engine
+        self.row = row
+        self.peak_detector = None  # Verilirse tekrarları durum makinesi yerine bu algılayıcı sayar
+        self._rows = np.array([row], dtype=np.intp)
+        self.keypoints = None
+        self.confidence_threshold = 0.7  # Güven eşiği
+        self.threshold_angle = spec.threshold_angle
+        self.min_angle = spec.min_angle
+        self.max_angle = spec.max_angle
+
+    @property
+    def landmark_indices(self):
+        return self.spec.landmark_indices
+
+    @property
+    def state(self):
+        return self.engine.get_state(self.row)
+
+    @state.setter
+    def state(self, value):
+        self.engine.set_state(self.row, value)
+
+    @property
+    def counting(self):
+        return FSM_COUNTING if self.peak_detector is None else PEAK_COUNTING
+
+    @property
+    def repetition_count(self):
+        counter = self.engine if self.peak_detector is None else self.peak_detector
+        return int(counter.repetition_count[self.row])
+
+    @repetition_count.setter
+    def repetition_count(self, value):
+        counter = self.engine if self.peak_detector is None else self.peak_detector
+        counter.repetition_count[self.row] = value
+
+    @property
+    def stable_ms(self):
+        return float(self.engine.stable_ms[self.row])
+
+    @stable_ms.setter
+    def stable_ms(self, value):
+        self.engine.stable_ms[self.row] = value
+
+    @property
+    def required_stable_ms(self):
+        return self.engine.required_stable_ms
+
+    @property
+    def previous_time_ms(self):
+        if not self.engine.has_previous[self.row]:
+            return None
+        return float(self.engine.previous_time_ms[self.row])
+
+    @property
+    def previous_angle(self):
+        if not self.engine.has_previous[self.row]:
+            return None
+        return float(self.engine.previous_angle[self.row])
+
+    @previous_angle.setter
+    def previous_angle(self, value):
+        self.engine.has_previous[self.row] = value is not None
+        self.engine.previous_angle[self.row] = 0.0 if value is None else value
+
+    @property
+    def in_progress(self):
+        return bool(self.engine.in_progress[self.row])
+
+    @in_progress.setter
+    def in_progress(self, value):
+        self.engine.in_progress[self.row] = value
+
+    def transform_angle(self, angle):
         """
-        Bacak kaldırma egzersizi için durumu günceller.
-        
-        Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
+        Eklem açısını egzersiz açısına dönüştürür (tanımda invert varsa 180 - açı).
         """
-        # Kalça, diz ve ayak bileği noktalarını al
-        hip = landmarks[23]  # Sol kalça
-        knee = landmarks[25]  # Sol diz
-        ankle = landmarks[27]  # Sol ayak bileği
-        
-        # Bacak açısını hesapla
-        angle = 180 - self.calculate_angle(hip, knee, ankle)  # 180 derece çıkarıyoruz çünkü açı ters yönde
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı bacak aşağıdaysa, egzersizi başlat
-        if not self.in_progress and angle < self.min_angle + 10:
-            self.in_progress = True
-            self.state = "down"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle > self.threshold_angle and self.state == "down":
-                self.state = "up"
-            elif angle < self.min_angle + 10 and self.state == "up":
-                self.state = "down"
-                self.repetition_count += 1
-
-class AbdominalCrunches(ExerciseBase):
-    def __init__(self):
-        super().__init__()
-        self.threshold_angle = 130  # Karın egzersizi için eşik açısı
-        self.min_angle = 100  # Minimum açı
-        self.max_angle = 170  # Maksimum açı
-        
-    def update_state(self, landmarks):
+        return 180 - angle if self.spec.invert else angle
+
+    def update_angle(self, angle, timestamp_ms=None):
         """
-        Karın egzersizi için durumu günceller.
+        Egzersiz durumunu önceden hesaplanmış açıya göre günceller.
         
         Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
+            angle: Egzersiz açısı (derece)
+            timestamp_ms: Karenin zaman damgası (ms, isteğe bağlı)
         """
-        # Omuz, kalça ve diz noktalarını al
-        shoulder = landmarks[11]  # Sol omuz
-        hip = landmarks[23]  # Sol kalça
-        knee = landmarks[25]  # Sol diz
-        
-        # Karın açısını hesapla
-        angle = self.calculate_angle(shoulder, hip, knee)
-        
-        # Açı kararlı mı kontrol et
-        if not self.is_stable(angle):
-            return
-        
-        # Egzersiz başlamadıysa ve kullanıcı düz yatıyorsa, egzersizi başlat
-        if not self.in_progress and angle > self.max_angle - 10:
-            self.in_progress = True
-            self.state = "down"
-            return
-        
-        # Egzersiz devam ediyorsa
-        if self.in_progress:
-            # Durumu güncelle
-            if angle < self.threshold_angle and self.state == "down":
-                self.state = "up"
-            elif angle > self.max_angle - 20 and self.state == "up":
-                self.state = "down"
-                self.repetition_count += 1 
\ No newline at end of file
+        timestamp_ms = self.engine.next_timestamp(timestamp_ms)
+        self.engine.update_angles(np.array([angle], dtype=np.float64), self._rows, timestamp_ms)
+
+class Squat(SpecExercise):
+    spec_name = "squat"
+
+class NeckFlexionExtension(SpecExercise):
+    spec_name = "neck_flexion_extension"
+
+class ShoulderRegion(SpecExercise):
+    spec_name = "shoulder_region"
+
+class ArmRaiseLateralFront(SpecExercise):
+    spec_name = "arm_raise_lateral_front"
+
+class ThoracicExtension(SpecExercise):
+    spec_name = "thoracic_extension"
+
+class LumbarSideBendingFlexion(SpecExercise):
+    spec_name = "lumbar_side_bending_flexion"
+
+class HipAbduction(SpecExercise):
+    spec_name = "hip_abduction"
+
+class KneeFlexionExtension(SpecExercise):
+    spec_name = "knee_flexion_extension"
+
+class LegRaiseStraightLegRaise(SpecExercise):
+    spec_name = "leg_raise_straight_leg_raise"
+
+class AbdominalCrunches(SpecExercise):
+    spec_name = "abdominal_crunches"
+
+# Tanım adından sınıfa eşleme; sınıfı olmayan yeni tanımlar SpecExercise kullanır
+EXERCISE_CLASSES = {cls.spec_name: cls for cls in (
+    Squat, NeckFlexionExtension, ShoulderRegion, ArmRaiseLateralFront, ThoracicExtension,
+    LumbarSideBendingFlexion, HipAbduction, KneeFlexionExtension, LegRaiseStraightLegRaise,
+    AbdominalCrunches
+)}
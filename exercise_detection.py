@@ -1,16 +1,18 @@
 import cv2
 import mediapipe as mp
 import math
-from exercise_classes import (
-    ExerciseBase, Squat, NeckFlexionExtension, ShoulderRegion,
-    ArmRaiseLateralFront, ThoracicExtension, LumbarSideBendingFlexion,
-    HipAbduction, KneeFlexionExtension, LegRaiseStraightLegRaise,
-    AbdominalCrunches
-)
+import time
+import numpy as np
+from exercise_classes import EXERCISE_CLASSES, SpecExercise
+from angle_engine import NUM_LANDMARKS, LANDMARK_FIELDS, landmarks_to_array
+from exercise_engine import REQUIRED_STABLE_MS, ExerciseEngine
+from exercise_specs import EXERCISE_SPECS
+from peak_detector import COUNTING_METHODS, PEAK_COUNTING, PeakDetector
+from pose_estimator import get_pose_estimator
 
 # MediaPipe için gerekli bileşenler
+# Pose modeli içe aktarma sırasında değil, ilk kullanımda paylaşılan PoseEstimator ile yüklenir
 mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
 
 class Exercise:
     def __init__(self):
@@ -25,7 +27,7 @@ class Exercise:
         :return: Tespit edilen eklem noktaları veya None.
         """
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        results = pose.process(image_rgb)
+        results = get_pose_estimator().process(image_rgb)
         if results.pose_landmarks:
             return results.pose_landmarks
         else:
@@ -70,46 +72,193 @@ class Exercise:
         raise NotImplementedError("Bu metot alt sınıflar tarafından uygulanmalıdır.")
 
 class ExerciseDetection:
-    def __init__(self):
+    def __init__(self, monitor_all=True, specs=None, peak_counting=(), landmark_filter=None,
+                 required_stable_ms=REQUIRED_STABLE_MS):
         """
-        ExerciseDetection sınıfını başlatır ve tüm egzersiz sınıflarını oluşturur.
+        ExerciseDetection sınıfını başlatır ve tüm egzersiz tanımlarını tek bir
+        ExerciseEngine içinde derler.
+        
+        Args:
+            monitor_all: True ise her karede tüm egzersizler değerlendirilir (izleme
+                panoları için). False ise yalnızca subscribe() ile seçilenler değerlendirilir.
+            specs: ExerciseSpec listesi (None ise kayıt defterindeki tüm tanımlar)
+            peak_counting: Tekrarları tepe/çukur algılayıcısıyla sayılacak egzersizler
+                (durum etiketleri yine durum makinesinden gelir)
+            landmark_filter: Açılar hesaplanmadan önce her kareye uygulanacak filtre
+                (apply(landmark_array, timestamp_ms) metoduna sahip, örneğin OneEuroFilter)
+            required_stable_ms: Geçişlerden önce gerekli kararlılık süresi (ms); filtre
+                kullanılırken FILTERED_STABLE_MS ile kısaltılabilir
         """
+        specs = list(EXERCISE_SPECS.values()) if specs is None else list(specs)
+        self.engine = ExerciseEngine(specs, required_stable_ms)
+        self.peak_detector = PeakDetector(specs)
+        self.landmark_filter = landmark_filter
         self.exercises = {
-            "squat": Squat(),
-            "neck_flexion_extension": NeckFlexionExtension(),
-            "shoulder_region": ShoulderRegion(),
-            "arm_raise_lateral_front": ArmRaiseLateralFront(),
-            "thoracic_extension": ThoracicExtension(),
-            "lumbar_side_bending_flexion": LumbarSideBendingFlexion(),
-            "hip_abduction": HipAbduction(),
-            "knee_flexion_extension": KneeFlexionExtension(),
-            "leg_raise_straight_leg_raise": LegRaiseStraightLegRaise(),
-            "abdominal_crunches": AbdominalCrunches()
+            spec.name: EXERCISE_CLASSES.get(spec.name, SpecExercise)(spec, self.engine, row)
+            for row, spec in enumerate(specs)
         }
+        for exercise_name in peak_counting:
+            self._check_exercise(exercise_name)
+            self.exercises[exercise_name].peak_detector = self.peak_detector
+
+        self.monitor_all = monitor_all
+        self.metrics = None  # Verilirse açı ve durum güncelleme süreleri kaydedilir (StageMetrics)
+        self.subscriptions = []  # Abone olunan egzersizler (eklenme sırasıyla)
+        # Kareler bu diziye kopyalanır; çağıranın dizisi hiçbir zaman tampon olarak kullanılmaz
+        self._landmark_buffer = np.empty((NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+        self._update_active_rows()
+
+    def _update_active_rows(self):
+        """
+        Etkin egzersizleri motora bildirir. Motor açıları yalnızca bu egzersizlerin
+        eklem üçlüleri için hesaplar; ortak üçlüler (örneğin kalça-diz-ayak bileği)
+        yalnızca bir kez hesaplanır.
+        """
+        self.active_exercises = list(self.exercises) if self.monitor_all else list(self.subscriptions)
+        self.engine.set_active_rows(self.engine.rows[name] for name in self.active_exercises)
+        # Tekrarları tepe/çukur algılayıcısıyla sayılan etkin egzersizlerin konumları ve satırları
+        self._peak_positions = np.array([
+            i for i, name in enumerate(self.active_exercises) if self.exercises[name].counting == PEAK_COUNTING
+        ], dtype=np.intp)
+        self._peak_rows = self.engine.active_rows[self._peak_positions]
+        # Son karenin geçiş maskeleri (active_exercises ile hizalı)
+        self.last_timestamp_ms = None
+        self.last_changed = [False] * len(self.active_exercises)
+        self.last_completed = [False] * len(self.active_exercises)
+
+    def subscribe(self, *exercise_names):
+        """
+        Egzersizleri her karede değerlendirilecekler listesine ekler.
+        
+        Args:
+            *exercise_names: Egzersiz adları
+            
+        Raises:
+            KeyError: Bilinmeyen bir egzersiz adı verilirse
+        """
+        for exercise_name in exercise_names:
+            self._check_exercise(exercise_name)
+        for exercise_name in exercise_names:
+            if exercise_name not in self.subscriptions:
+                self.subscriptions.append(exercise_name)
+        self._update_active_rows()
+
+    def _check_exercise(self, exercise_name):
+        """
+        Raises:
+            KeyError: Egzersiz ExerciseDetection içinde yoksa
+        """
+        if exercise_name not in self.exercises:
+            raise KeyError(f"{exercise_name} egzersizi ExerciseDetection içinde bulunamadı.")
+
+    def set_counting(self, exercise_name, method):
+        """
+        Egzersizin tekrarlarını sayan yöntemi seçer. Durum makinesi her iki
+        yöntemde de çalışmaya devam eder ve durum etiketlerini üretir; PEAK_COUNTING
+        seçildiğinde tekrar sayısı ve "rep" olayları tepe/çukur algılayıcısından gelir.
+        Yöntem değiştiğinde algılayıcının satırı sıfırlanır.
+
+        Args:
+            exercise_name: Egzersiz adı
+            method: FSM_COUNTING veya PEAK_COUNTING
+
+        Raises:
+            KeyError: Bilinmeyen bir egzersiz adı verilirse
+            ValueError: Bilinmeyen bir yöntem verilirse
+        """
+        self._check_exercise(exercise_name)
+        if method not in COUNTING_METHODS:
+            raise ValueError(f"Geçersiz sayma yöntemi: {method}")
+        exercise = self.exercises[exercise_name]
+        if exercise.counting != method:
+            self.peak_detector.reset(exercise.row)
+            exercise.peak_detector = self.peak_detector if method == PEAK_COUNTING else None
+            self._update_active_rows()
+
+    def unsubscribe(self, *exercise_names):
+        """
+        Egzersizleri değerlendirilecekler listesinden çıkarır.
+        
+        Args:
+            *exercise_names: Egzersiz adları
+        """
+        self.subscriptions = [name for name in self.subscriptions if name not in exercise_names]
+        self._update_active_rows()
+
+    def set_monitor_all(self, enabled):
+        """
+        Tüm egzersizlerin her karede değerlendirilmesini açar veya kapatır.
+        
+        Args:
+            enabled: True ise tüm egzersizler, False ise yalnızca abonelikler
+        """
+        self.monitor_all = enabled
+        self._update_active_rows()
         
-    def detect_exercises(self, landmarks):
+    def detect_exercises(self, landmarks, timestamp_ms=None):
         """
-        Tüm egzersizleri tespit eder ve sonuçları döndürür.
+        Etkin egzersizleri (abonelikler veya izleme modunda tümü) her karede bir kez
+        günceller ve sonuçları döndürür.
         
         Args:
-            landmarks: MediaPipe tarafından tespit edilen eklem noktaları
+            landmarks: MediaPipe tarafından tespit edilen eklem noktaları veya (33, 4) dizi
+            timestamp_ms: Karenin zaman damgası (ms). Kararlılık ve geçişler zamana
+                dayandığından, değişken kare hızında gerçek zaman damgası verilmelidir.
+                None ise 30 FPS varsayılır.
             
         Returns:
             dict: Egzersiz adları ve durumları
         """
+        # Kareyi bir kez diziye çevir; tüm etkin egzersizler tek vektörel adımda güncellenir
+        started = time.perf_counter()
+        landmarks_to_array(landmarks, out=self._landmark_buffer)
+        timestamp_ms = self.engine.next_timestamp(timestamp_ms)
+        if self.landmark_filter is not None:
+            self.landmark_filter.apply(self._landmark_buffer, timestamp_ms)
+        angles = self.engine.active_angles(self._landmark_buffer)
+        if self.metrics is not None:
+            started = self.metrics.lap("angles", started)
+        self.last_changed, self.last_completed = self.engine.update_angles(angles, self.engine.active_rows,
+                                                                            timestamp_ms)
+        if self._peak_positions.size:
+            # Bu egzersizlerde tekrarları algılayıcı sayar; tekrar da bir değişiklik olarak bildirilir
+            completed = self.peak_detector.update(angles[self._peak_positions], self._peak_rows, timestamp_ms)
+            self.last_completed[self._peak_positions] = completed
+            self.last_changed[self._peak_positions] |= completed
+        self.last_timestamp_ms = timestamp_ms
+
         results = {}
-        
-        for exercise_name, exercise in self.exercises.items():
-            # Egzersiz durumunu güncelle
-            exercise.update_state(landmarks)
-            
-            # Egzersiz durumunu al
-            state = exercise.get_state()
-                
-            # Tekrar sayısını al
-            repetition_count = exercise.get_repetition_count()
+        for exercise_name in self.active_exercises:
+            exercise = self.exercises[exercise_name]
             
             # Sonuçları kaydet
-            results[exercise_name] = f"{state.capitalize()} ({repetition_count} reps)"
-            
-        return results
\ No newline at end of file
+            results[exercise_name] = f"{exercise.get_state().capitalize()} ({exercise.get_repetition_count()} reps)"
+
+        if self.metrics is not None:
+            self.metrics.lap("state_update", started)
+        return results
+
+    def get_events(self):
+        """
+        Son detect_exercises çağrısında oluşan durum geçişlerini ve tamamlanan
+        tekrarları olay olarak döndürür.
+
+        Returns:
+            list: Olay sözlükleri. Her durum değişikliği için bir "state" olayı,
+                her tamamlanan tekrar için ayrıca bir "rep" olayı üretilir.
+        """
+        events = []
+        for i, exercise_name in enumerate(self.active_exercises):
+            if not self.last_changed[i]:
+                continue
+            exercise = self.exercises[exercise_name]
+            event = {
+                "timestamp_ms": round(self.last_timestamp_ms, 1),
+                "exercise": exercise_name,
+                "state": exercise.get_state(),
+                "repetition_count": exercise.get_repetition_count(),
+            }
+            events.append({"type": "state", **event})
+            if self.last_completed[i]:
+                events.append({"type": "rep", **event})
+        return events
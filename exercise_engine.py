@@ -0,0 +1,312 @@
+import numpy as np
+
+from angle_engine import AngleEngine
+from exercise_specs import DECREASING
+
+INITIAL_STATE = "up"  # Egzersiz başlamadan önce bildirilen durum
+NOMINAL_FRAME_MS = 1000.0 / 30  # Zaman damgası verilmediğinde varsayılan kare aralığı (30 FPS)
+MAX_ANGULAR_SPEED = 150.0  # Kararlı sayılması için maksimum açısal hız (derece/s, 30 FPS'te 5°/kare)
+REQUIRED_STABLE_MS = 150.0  # Geçişlerden önce gerekli kararlılık süresi (30 FPS'te 5 kare)
+MAX_FRAME_GAP_MS = 1000.0  # Daha uzun boşluklarda kararlılık filtresi baştan başlar
+# Bu kadar veya daha az etkin satırda açılar ve durum makineleri satır satır skaler
+# olarak güncellenir; NumPy çağrılarının sabit maliyeti birkaç satırın işinden büyüktür
+SCALAR_MAX_ROWS = 16
+
+# Durum makinesi alanları ve başlangıç değerleri (her iki motor da kullanır)
+STATE_FIELDS = (
+    ("previous_angle", np.float64, 0.0),
+    ("previous_time_ms", np.float64, 0.0),
+    ("has_previous", bool, False),
+    ("stable_ms", np.float64, 0.0),  # Açının kesintisiz kararlı kaldığı süre
+    ("in_progress", bool, False),
+    ("active", bool, False),  # True ise hareket durumu (states[1])
+    ("state_since_ms", np.float64, 0.0),  # Mevcut duruma geçiş zamanı
+    ("repetition_count", np.int64, 0),
+)
+
+
+def advance_state_machines(engine, index, rows, angles, times_ms):
+    """
+    Durum dizilerindeki seçili elemanların durum makinelerini bir adım ilerletir.
+
+    Kararlılık ve geçişler kare sayısına değil zaman damgalarına dayanır: açısal
+    hız MAX_ANGULAR_SPEED altında kaldığı sürece kararlılık süresi birikir ve
+    geçişler ancak bu süre required_stable_ms'e ulaşınca yapılır. Bir durumdan
+    çıkmak için ayrıca tanımdaki min_dwell_ms kadar o durumda kalınmış olmalıdır.
+    Böylece sonuçlar değişken veya düşük kare hızında da aynı kalır. Tekrarlanan
+    veya geri giden zaman damgaları uzun bir boşluk gibi kararlılık filtresini
+    baştan başlatır.
+
+    Tek oturumlu ExerciseEngine (satır indeksleri) ve çok oturumlu motor
+    ((oturum, satır) indeks çiftleri) aynı fonksiyonu kullanır. index içindeki
+    elemanlar tekrarsız olmalıdır.
+
+    Args:
+        engine: Durum dizilerine ve derlenmiş tanım dizilerine sahip motor
+        index: Durum dizileri için NumPy indeksi
+        rows: Seçili elemanların egzersiz satırları
+        angles: Egzersiz açıları (derece), seçili eleman sayısı kadar
+        times_ms: Karelerin zaman damgaları (ms), skaler veya seçili eleman sayısı kadar
+
+    Returns:
+        tuple: (durumu değişen elemanlar, tekrarı tamamlanan elemanlar) bool maskeleri
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    times_ms = np.broadcast_to(np.asarray(times_ms, dtype=np.float64), angles.shape)
+
+    # Kararlılık filtresi: ilk karede, uzun bir boşluktan sonra veya zaman damgası
+    # tekrarlandığında / geri gittiğinde yalnızca önceki açı ve zaman kaydedilir
+    elapsed_ms = times_ms - engine.previous_time_ms[index]
+    has_previous = engine.has_previous[index] & (elapsed_ms > 0.0) & (elapsed_ms <= MAX_FRAME_GAP_MS)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        speed = np.abs(angles - engine.previous_angle[index]) * 1000.0 / elapsed_ms
+    stable_ms = np.where(has_previous & (speed < MAX_ANGULAR_SPEED), engine.stable_ms[index] + elapsed_ms, 0.0)
+    engine.stable_ms[index] = stable_ms
+    engine.previous_angle[index] = angles
+    engine.previous_time_ms[index] = times_ms
+    engine.has_previous[index] = True
+    stable = has_previous & (stable_ms >= engine.required_stable_ms)
+
+    value = engine.sign[rows] * angles
+    in_progress = engine.in_progress[index]
+    active = engine.active[index]
+    # Zaman geri gittiyse mevcut durumun başlangıcı yeni zaman çizgisine çekilir
+    state_since_ms = np.minimum(engine.state_since_ms[index], times_ms)
+    dwelled = times_ms - state_since_ms >= engine.min_dwell_ms[rows]
+
+    # Egzersiz başlamadıysa ve açı dinlenme tarafındaysa egzersizi başlat
+    start = stable & ~in_progress & (value > engine.start_value[rows])
+
+    # Egzersiz devam ediyorsa durumu güncelle
+    running = stable & in_progress & dwelled
+    to_active = running & ~active & (value < engine.threshold_value[rows])
+    to_rest = running & active & (value > engine.return_value[rows])
+    changed = start | to_active | to_rest
+
+    engine.in_progress[index] = in_progress | start
+    engine.active[index] = (active & ~start & ~to_rest) | to_active
+    engine.state_since_ms[index] = np.where(changed, times_ms, state_since_ms)
+    engine.repetition_count[index] += to_rest
+    return changed, to_rest
+
+
+def advance_state_machine(engine, row, angle, time_ms):
+    """
+    advance_state_machines'in tek satırlık skaler karşılığı (ExerciseEngine'in
+    küçük etkin kümeler için hızlı yolu). Aynı karşılaştırmaları aynı sırayla yapar;
+    sonuçlar vektörel adımla aynıdır.
+
+    Args:
+        engine: ExerciseEngine
+        row: Satır indeksi
+        angle: Egzersiz açısı (derece)
+        time_ms: Karenin zaman damgası (ms)
+
+    Returns:
+        tuple: (durum değişti mi, tekrar tamamlandı mı)
+    """
+    elapsed_ms = time_ms - engine.previous_time_ms.item(row)
+    has_previous = engine.has_previous.item(row) and 0.0 < elapsed_ms <= MAX_FRAME_GAP_MS
+    stable_ms = 0.0
+    if has_previous and abs(angle - engine.previous_angle.item(row)) * 1000.0 / elapsed_ms < MAX_ANGULAR_SPEED:
+        stable_ms = engine.stable_ms.item(row) + elapsed_ms
+    engine.stable_ms[row] = stable_ms
+    engine.previous_angle[row] = angle
+    engine.previous_time_ms[row] = time_ms
+    engine.has_previous[row] = True
+    # Zaman geri gittiyse mevcut durumun başlangıcı yeni zaman çizgisine çekilir
+    state_since_ms = min(engine.state_since_ms.item(row), time_ms)
+    engine.state_since_ms[row] = state_since_ms
+    if not (has_previous and stable_ms >= engine.required_stable_ms):
+        return False, False
+
+    value = engine.sign.item(row) * angle
+    if not engine.in_progress.item(row):
+        # Egzersiz başlamadıysa ve açı dinlenme tarafındaysa egzersizi başlat
+        if value > engine.start_value.item(row):
+            engine.in_progress[row] = True
+            engine.active[row] = False
+            engine.state_since_ms[row] = time_ms
+            return True, False
+        return False, False
+    if time_ms - state_since_ms < engine.min_dwell_ms.item(row):
+        return False, False
+    if not engine.active.item(row):
+        if value < engine.threshold_value.item(row):
+            engine.active[row] = True
+            engine.state_since_ms[row] = time_ms
+            return True, False
+    elif value > engine.return_value.item(row):
+        engine.active[row] = False
+        engine.state_since_ms[row] = time_ms
+        engine.repetition_count[row] += 1
+        return True, True
+    return False, False
+
+
+def compile_specs(target, specs):
+    """
+    Egzersiz tanımlarını eşik dizilerine derler ve target nesnesine yazar.
+
+    Açılar sign ile çarpılır; böylece tüm egzersizler "dinlenme tarafı büyük
+    değer" biçiminde karşılaştırılır.
+    """
+    sign = np.array([1.0 if spec.direction == DECREASING else -1.0 for spec in specs])
+    target.sign = sign
+    target.invert = np.array([spec.invert for spec in specs], dtype=bool)
+    target.start_value = sign * np.array([spec.start_angle for spec in specs], dtype=np.float64)
+    target.threshold_value = sign * np.array([spec.threshold_angle for spec in specs], dtype=np.float64)
+    target.return_value = sign * np.array([spec.return_angle for spec in specs], dtype=np.float64)
+    target.min_dwell_ms = np.array([spec.min_dwell_ms for spec in specs], dtype=np.float64)
+    target.state_labels = [(INITIAL_STATE,) + spec.states for spec in specs]
+
+
+class ExerciseEngine:
+    def __init__(self, specs, required_stable_ms=REQUIRED_STABLE_MS):
+        """
+        Egzersiz tanımlarını tek bir genel durum makinesine derler.
+
+        Her egzersiz bir satırdır; durum alanları (kararlılık süresi, önceki açı ve
+        zaman, başlama bayrağı, durum, tekrar sayısı) satır başına dizilerde tutulur
+        ve tüm etkin satırlar her karede tek bir vektörel adımda güncellenir. En fazla
+        SCALAR_MAX_ROWS etkin satırda (tek abonelikli canlı kullanım) aynı adım
+        satır satır skaler olarak yapılır.
+
+        Args:
+            specs: ExerciseSpec listesi (satır sırası)
+            required_stable_ms: Geçişlerden önce gerekli kararlılık süresi (ms)
+        """
+        self.specs = list(specs)
+        self.rows = {spec.name: row for row, spec in enumerate(self.specs)}
+        self.required_stable_ms = required_stable_ms
+        compile_specs(self, self.specs)
+
+        # Durum dizileri
+        for field, dtype, initial in STATE_FIELDS:
+            setattr(self, field, np.full(len(self.specs), initial, dtype=dtype))
+
+        # Zaman damgası verilmeyen kareler için sanal saat
+        self.clock_ms = 0.0
+
+        self.set_active_rows(range(len(self.specs)))
+
+    def set_active_rows(self, rows):
+        """
+        Her karede güncellenecek satırları seçer ve açı motorunu yalnızca
+        bu satırların eklem üçlüleri için oluşturur.
+
+        Args:
+            rows: Satır indeksleri
+        """
+        self.active_rows = np.array(list(rows), dtype=np.intp)
+        triplets = [self.specs[row].landmark_indices for row in self.active_rows]
+        self.angle_engine = AngleEngine(triplets)
+        self.active_slots = np.array([self.angle_engine.slot(t) for t in triplets], dtype=np.intp)
+        self._scalar_rows = list(zip(self.active_slots.tolist(), self.invert[self.active_rows].tolist()))
+
+    def exercise_angles(self, joint_angles, rows):
+        """
+        Eklem açılarını egzersiz açılarına dönüştürür (invert tanımlı ise 180 - açı).
+        """
+        return np.where(self.invert[rows], 180.0 - joint_angles, joint_angles)
+
+    def next_timestamp(self, timestamp_ms=None):
+        """
+        Karenin zaman damgasını döndürür ve sanal saati ilerletir.
+
+        Args:
+            timestamp_ms: Karenin zaman damgası (ms). None ise son damgaya
+                NOMINAL_FRAME_MS eklenir.
+
+        Returns:
+            float: Kullanılacak zaman damgası (ms)
+        """
+        self.clock_ms = self.clock_ms + NOMINAL_FRAME_MS if timestamp_ms is None else float(timestamp_ms)
+        return self.clock_ms
+
+    def update(self, landmark_array, timestamp_ms=None):
+        """
+        Etkin satırların açılarını hesaplar ve durum makinelerini bir adım ilerletir.
+
+        Args:
+            landmark_array: (33, 4) eklem dizisi
+            timestamp_ms: Karenin zaman damgası (ms, isteğe bağlı)
+
+        Returns:
+            tuple: active_rows ile hizalı (durumu değişen, tekrarı tamamlanan) bool maskeleri
+        """
+        timestamp_ms = self.next_timestamp(timestamp_ms)
+        return self.update_angles(self.active_angles(landmark_array), self.active_rows, timestamp_ms)
+
+    def active_angles(self, landmark_array):
+        """
+        Etkin satırların egzersiz açılarını hesaplar (durum makinelerine dokunmaz).
+
+        Args:
+            landmark_array: (33, 4) eklem dizisi
+
+        Returns:
+            np.ndarray: active_rows ile hizalı egzersiz açıları (derece)
+        """
+        if self.active_rows.size == 0:
+            return np.zeros(0, dtype=np.float64)
+        if self.active_rows.size <= SCALAR_MAX_ROWS:
+            joint_angles = self.angle_engine.compute_scalar(landmark_array)
+            return np.array([180.0 - joint_angles[slot] if invert else joint_angles[slot]
+                             for slot, invert in self._scalar_rows], dtype=np.float64)
+        joint_angles = self.angle_engine.compute(landmark_array)[self.active_slots]
+        return self.exercise_angles(joint_angles, self.active_rows)
+
+    def update_angles(self, angles, rows, timestamp_ms=None):
+        """
+        Verilen satırların durum makinelerini egzersiz açılarıyla bir adım ilerletir.
+
+        Args:
+            angles: Egzersiz açıları (derece), rows ile aynı uzunlukta
+            rows: Satır indeksleri
+            timestamp_ms: Karenin zaman damgası (ms). update() içinden çağrıldığında
+                saat zaten ilerletilmiştir; doğrudan çağrılarda None sanal saati ilerletir.
+
+        Returns:
+            tuple: (durumu değişen satırlar, tekrarı tamamlanan satırlar) bool maskeleri
+        """
+        if timestamp_ms is None:
+            timestamp_ms = self.next_timestamp()
+        if len(rows) <= SCALAR_MAX_ROWS:
+            timestamp_ms = float(timestamp_ms)
+            results = [advance_state_machine(self, row, angle, timestamp_ms)
+                       for row, angle in zip(np.asarray(rows).tolist(), np.asarray(angles, dtype=np.float64).tolist())]
+            changed = np.array([result[0] for result in results], dtype=bool)
+            completed = np.array([result[1] for result in results], dtype=bool)
+            return changed, completed
+        return advance_state_machines(self, rows, rows, angles, timestamp_ms)
+
+    def get_state(self, row):
+        """
+        Satırın durum etiketini döndürür.
+        """
+        if not self.in_progress[row]:
+            return INITIAL_STATE
+        return self.state_labels[row][2 if self.active[row] else 1]
+
+    def set_state(self, row, state):
+        """
+        Satırın durumunu etiketle ayarlar. Başlangıç etiketi egzersizi başlamamış yapar.
+        """
+        labels = self.state_labels[row]
+        if state == labels[2]:
+            self.in_progress[row], self.active[row] = True, True
+        elif state == labels[1]:
+            self.in_progress[row], self.active[row] = True, False
+        elif state == INITIAL_STATE:
+            self.in_progress[row], self.active[row] = False, False
+        else:
+            raise ValueError(f"{self.specs[row].name} için geçersiz durum: {state}")
+
+    def reset(self, row=None):
+        """
+        Bir satırın (veya tüm satırların) durumunu sıfırlar.
+        """
+        rows = slice(None) if row is None else row
+        for field, dtype, initial in STATE_FIELDS:
+            getattr(self, field)[rows] = initial
@@ -0,0 +1,123 @@
+DECREASING = "decreasing"  # Hareket sırasında açı küçülür (örneğin squat)
+INCREASING = "increasing"  # Hareket sırasında açı büyür (örneğin kol kaldırma)
+
+
+class ExerciseSpec:
+    def __init__(self, name, display_name, landmark_indices, min_angle, max_angle,
+                 threshold_angle, start_angle, return_angle, direction, states, invert=False,
+                 min_dwell_ms=0.0):
+        """
+        Bir egzersizin veri olarak tanımı. Tüm egzersizler aynı durum makinesini kullanır:
+
+        1. Açı start_angle'ı geçince (dinlenme tarafında) egzersiz başlar, durum states[0] olur.
+        2. Açı threshold_angle'ı hareket yönünde geçince durum states[1] olur.
+        3. Açı return_angle'ı dinlenme yönünde geçince durum states[0] olur ve tekrar sayılır.
+
+        Args:
+            name: Egzersizin anahtarı (örneğin: "squat")
+            display_name: Ekranda gösterilecek ad
+            landmark_indices: Açının hesaplandığı (a, b, c) eklem indeksleri, açı b noktasında
+            min_angle: Hareket aralığının alt sınırı (derece)
+            max_angle: Hareket aralığının üst sınırı (derece)
+            threshold_angle: Hareket durumuna geçiş eşiği
+            start_angle: Egzersizi başlatan dinlenme eşiği
+            return_angle: Dinlenme durumuna dönüş (tekrar) eşiği
+            direction: DECREASING veya INCREASING
+            states: (dinlenme durumu, hareket durumu) etiketleri
+            invert: True ise eklem açısı yerine 180 - açı kullanılır
+            min_dwell_ms: Bir durumdan çıkmadan önce o durumda kalınması gereken
+                minimum süre (ms); hızlı titreşimlerin tekrar sayılmasını önler
+        """
+        if direction not in (DECREASING, INCREASING):
+            raise ValueError(f"Geçersiz hareket yönü: {direction}")
+        self.name = name
+        self.display_name = display_name
+        self.landmark_indices = tuple(landmark_indices)
+        self.min_angle = min_angle
+        self.max_angle = max_angle
+        self.threshold_angle = threshold_angle
+        self.start_angle = start_angle
+        self.return_angle = return_angle
+        self.direction = direction
+        self.states = tuple(states)
+        self.invert = invert
+        self.min_dwell_ms = min_dwell_ms
+
+    def __repr__(self):
+        return f"ExerciseSpec({self.name!r})"
+
+
+EXERCISE_SPECS = {}
+
+
+def register_spec(spec):
+    """
+    Egzersiz tanımını kayıt defterine ekler.
+
+    Args:
+        spec: ExerciseSpec nesnesi
+
+    Returns:
+        ExerciseSpec: Eklenen tanım
+    """
+    if spec.name in EXERCISE_SPECS:
+        raise ValueError(f"{spec.name} egzersizi zaten kayıtlı.")
+    EXERCISE_SPECS[spec.name] = spec
+    return spec
+
+
+def get_spec(name):
+    """
+    Adı verilen egzersiz tanımını döndürür.
+
+    Raises:
+        KeyError: Egzersiz kayıtlı değilse
+    """
+    try:
+        return EXERCISE_SPECS[name]
+    except KeyError:
+        raise KeyError(f"{name} egzersizi tanımlı değil.") from None
+
+
+# Eşikler, önceki sınıflardaki max_angle - 10 / max_angle - 20 ve
+# min_angle + 10 / min_angle + 20 kurallarından türetilmiştir.
+register_spec(ExerciseSpec(
+    "squat", "Squat", (23, 25, 27),  # Sol kalça, sol diz, sol ayak bileği
+    min_angle=90, max_angle=170, threshold_angle=120, start_angle=160, return_angle=150,
+    direction=DECREASING, states=("up", "down")))
+register_spec(ExerciseSpec(
+    "neck_flexion_extension", "Neck Flexion", (0, 11, 12),  # Burun, boyun (omuz ortası), sağ omuz
+    min_angle=130, max_angle=170, threshold_angle=150, start_angle=160, return_angle=150,
+    direction=DECREASING, states=("up", "down")))
+register_spec(ExerciseSpec(
+    "shoulder_region", "Shoulder", (11, 13, 15),  # Sol omuz, sol dirsek, sol bilek
+    min_angle=80, max_angle=160, threshold_angle=100, start_angle=150, return_angle=140,
+    direction=DECREASING, states=("down", "up")))
+register_spec(ExerciseSpec(
+    "arm_raise_lateral_front", "Arm Raise", (23, 11, 13),  # Sol kalça, sol omuz, sol dirsek
+    min_angle=30, max_angle=150, threshold_angle=90, start_angle=40, return_angle=50,
+    direction=INCREASING, states=("down", "up")))
+register_spec(ExerciseSpec(
+    "thoracic_extension", "Thoracic Extension", (11, 23, 25),  # Sol omuz, sol kalça, sol diz
+    min_angle=140, max_angle=180, threshold_angle=160, start_angle=170, return_angle=160,
+    direction=DECREASING, states=("up", "down")))
+register_spec(ExerciseSpec(
+    "lumbar_side_bending_flexion", "Lumbar Side Bending", (11, 23, 27),  # Sol omuz, sol kalça, sol ayak bileği
+    min_angle=140, max_angle=180, threshold_angle=160, start_angle=170, return_angle=160,
+    direction=DECREASING, states=("up", "down")))
+register_spec(ExerciseSpec(
+    "hip_abduction", "Hip Abduction", (24, 23, 25),  # Sağ kalça, sol kalça, sol diz
+    min_angle=10, max_angle=45, threshold_angle=30, start_angle=20, return_angle=20,
+    direction=INCREASING, states=("closed", "open")))
+register_spec(ExerciseSpec(
+    "knee_flexion_extension", "Knee Flexion", (23, 25, 27),  # Sol kalça, sol diz, sol ayak bileği
+    min_angle=90, max_angle=170, threshold_angle=120, start_angle=160, return_angle=150,
+    direction=DECREASING, states=("extended", "flexed")))
+register_spec(ExerciseSpec(
+    "leg_raise_straight_leg_raise", "Leg Raise", (23, 25, 27),  # Sol kalça, sol diz, sol ayak bileği
+    min_angle=10, max_angle=60, threshold_angle=45, start_angle=20, return_angle=20,
+    direction=INCREASING, states=("down", "up"), invert=True))
+register_spec(ExerciseSpec(
+    "abdominal_crunches", "Abdominal Crunches", (11, 23, 25),  # Sol omuz, sol kalça, sol diz
+    min_angle=100, max_angle=170, threshold_angle=130, start_angle=160, return_angle=150,
+    direction=DECREASING, states=("down", "up")))
@@ -0,0 +1,420 @@
+import argparse
+import json
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from exercise_detection import ExerciseDetection
+from exercise_specs import EXERCISE_SPECS
+from pose_estimator import PoseEstimator
+
+RING_TRANSPORT = "ring"  # Kareler paylaşımlı bellekte, kuyruklarda yalnızca yuva indeksleri
+QUEUE_TRANSPORT = "queue"  # Karşılaştırma: BGR diziler kuyruklardan pickle ile geçer
+TRANSPORTS = (RING_TRANSPORT, QUEUE_TRANSPORT)
+DEFAULT_SLOTS = 4
+QUEUE_POLL_SECONDS = 0.1
+
+
+class FrameRing:
+    def __init__(self, slots, shape, name=None):
+        """
+        multiprocessing.shared_memory üzerinde sabit boyutlu kare yuvaları.
+
+        name verilmezse yeni bir bellek bölgesi oluşturulur (yakalama tarafı, sahip);
+        verilirse var olan bölgeye bağlanılır (çıkarım işçileri). Yuvalar
+        (slots, yükseklik, genişlik, 3) uint8 dizisi olarak görünür; kareler doğrudan
+        bu diziye çözülür ve işçilerde kopyalanmadan okunur.
+
+        Args:
+            slots: Yuva sayısı
+            shape: Kare boyutu (yükseklik, genişlik, 3)
+            name: Bağlanılacak bellek bölgesinin adı
+        """
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.owner = name is None
+        size = slots * int(np.prod(self.shape))
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.frames = np.ndarray((slots, *self.shape), dtype=np.uint8, buffer=self.shm.buf)
+
+    def spec(self):
+        """
+        Başka bir süreçte attach() ile bağlanmak için gereken bilgiler.
+        """
+        return self.shm.name, self.slots, self.shape
+
+    @classmethod
+    def attach(cls, spec):
+        name, slots, shape = spec
+        return cls(slots, shape, name=name)
+
+    def close(self):
+        """
+        Bağlantıyı kapatır; sahipse bellek bölgesini de siler.
+        """
+        # Dizi görünümü bellek tamponunu tuttuğu sürece kapatılamaz
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def inference_worker(cameras, ready, free_slots, results, transport, pose_config):
+    """
+    Çıkarım işçisi süreci.
+
+    Kameralar işçilere sabit olarak atanır; böylece her kameranın kareleri sırayla
+    aynı PoseEstimator'a gider ve kareler arası takip korunur.
+
+    Args:
+        cameras: {kamera: FrameRing.spec()} (queue taşımasında değerler kullanılmaz)
+        ready: Bu işçinin kare kuyruğu; None işçiyi durdurur
+        free_slots: {kamera: boş yuva kuyruğu} (ring taşıması)
+        results: Sonuç kuyruğu: (kamera, kare numarası, zaman damgası, yakalanma anı, eklemler)
+        transport: RING_TRANSPORT veya QUEUE_TRANSPORT
+        pose_config: PoseEstimator ayarları; None ise yalnızca renk dönüşümü yapılır
+            (taşıma maliyetini ölçmek için)
+    """
+    rings = {}
+    try:
+        if transport == RING_TRANSPORT:
+            rings = {camera: FrameRing.attach(spec) for camera, spec in cameras.items()}
+        estimators = {}
+        if pose_config is not None:
+            for camera in cameras:
+                estimators[camera] = PoseEstimator(**pose_config)
+                estimators[camera].warmup()
+        results.put(("ready", None, None, None, None))
+
+        while True:
+            item = ready.get()
+            if item is None:
+                break
+            camera, frame, frame_number, timestamp_ms, captured_at = item
+            if transport == RING_TRANSPORT:
+                image_rgb = cv2.cvtColor(rings[camera].frames[frame], cv2.COLOR_BGR2RGB)
+                # Renk dönüşümü yeni bir dizi üretti; yuva hemen yeniden kullanılabilir
+                free_slots[camera].put(frame)
+            else:
+                image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            landmark_array = estimators[camera].estimate(image_rgb, timestamp_ms) if estimators else None
+            results.put((camera, frame_number, timestamp_ms, captured_at, landmark_array))
+    except Exception as e:
+        print(f"Çıkarım işçisinde hata oluştu: {e}")
+        traceback.print_exc()
+    finally:
+        for ring in rings.values():
+            ring.close()
+        results.put(None)
+
+
+class MultiCameraPipeline:
+    def __init__(self, sources, workers=1, transport=RING_TRANSPORT, slots=DEFAULT_SLOTS, pose_config=None,
+                 exercise_names=("squat",), drop_frames=None, max_frames=None):
+        """
+        Birden fazla kameradan kare yakalar ve çıkarımı işçi süreçlerde yapar.
+
+        Her kamera için bir yakalama iş parçacığı cv2.VideoCapture.read() ile
+        kareyi doğrudan kendi FrameRing yuvasına çözer ve işçiye yalnızca
+        (kamera, yuva, kare numarası, zaman damgası) gönderir. İşçi kareyi
+        paylaşımlı bellekten okur ve yuvayı boş yuva kuyruğuna geri verir.
+        Sonuçlar ana süreçte kamera başına ExerciseDetection ile işlenir.
+
+        Boş yuva kalmadığında canlı kameralarda kare atılır (gecikme sınırlı kalır),
+        video dosyalarında yakalama bekler.
+
+        Args:
+            sources: Video dosyası yolları veya kamera indeksleri
+            workers: Çıkarım işçisi süreç sayısı (kameralar sırayla dağıtılır)
+            transport: RING_TRANSPORT veya karşılaştırma için QUEUE_TRANSPORT
+            slots: Kamera başına yuva (queue taşımasında kuyruk) kapasitesi
+            pose_config: PoseEstimator ayarları; None ise çıkarım yapılmaz
+            exercise_names: Her kamerada takip edilecek egzersizler
+            drop_frames: Yer yokken kare atılsın mı (None ise yalnızca canlı kameralarda)
+            max_frames: Kamera başına en fazla okunacak kare sayısı
+        """
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Bilinmeyen taşıma: {transport}")
+        self.sources = [int(source) if str(source).isdigit() else source for source in sources]
+        self.workers = max(1, min(workers, len(self.sources)))
+        self.transport = transport
+        self.slots = slots
+        self.pose_config = pose_config
+        self.exercise_names = list(exercise_names)
+        self.drop_frames = drop_frames
+        self.max_frames = max_frames
+        self.stop_event = threading.Event()
+        self.error = None
+
+        self.cameras = [{
+            "source": source, "captured": 0, "dropped": 0, "processed": 0, "detected": 0,
+            "capture_wait_seconds": 0.0, "events": 0,
+        } for source in self.sources]
+        self.latencies_ms = []
+
+    def _capture_loop(self, camera, cap, first_frame, ring, free_slots, ready):
+        """
+        Kameradan kare okur ve işçisine gönderir.
+        """
+        stats = self.cameras[camera]
+        live = isinstance(self.sources[camera], int)
+        drop = live if self.drop_frames is None else self.drop_frames
+        try:
+            frame = first_frame
+            while not self.stop_event.is_set():
+                if self.max_frames is not None and stats["captured"] >= self.max_frames:
+                    break
+                # Sıradaki karenin hedefi: boş bir yuva (ring) veya yeni bir dizi (queue)
+                slot = None
+                if ring is not None:
+                    waited = time.perf_counter()
+                    while slot is None and not self.stop_event.is_set():
+                        try:
+                            slot = free_slots.get(block=not drop, timeout=None if drop else QUEUE_POLL_SECONDS)
+                        except queue.Empty:
+                            if drop:
+                                break
+                    stats["capture_wait_seconds"] += time.perf_counter() - waited
+                    if slot is None and drop:
+                        # Yer yok: kareyi okuyup at, kamera tamponu dolmasın
+                        ok = frame is not None or cap.grab()
+                        frame = None
+                        if not ok:
+                            break
+                        stats["captured"] += 1
+                        stats["dropped"] += 1
+                        continue
+                    if slot is None:
+                        break
+
+                if frame is not None:
+                    if ring is not None:
+                        ring.frames[slot] = frame
+                    ok = True
+                else:
+                    ok, frame = cap.read(ring.frames[slot]) if ring is not None else cap.read()
+                    if ok and ring is not None and frame.shape != ring.shape:
+                        # Çözünürlük değiştiyse read() yeni dizi döndürür; yuvaya sığdır
+                        cv2.resize(frame, ring.shape[1::-1], dst=ring.frames[slot])
+                if not ok:
+                    if slot is not None:
+                        free_slots.put(slot)
+                    break
+                captured_at = time.perf_counter()
+                timestamp_ms = captured_at * 1000.0 if live else cap.get(cv2.CAP_PROP_POS_MSEC)
+                item = (camera, slot if ring is not None else frame, stats["captured"], timestamp_ms, captured_at)
+                frame = None
+                stats["captured"] += 1
+
+                if ring is not None:
+                    ready.put(item)
+                    continue
+                waited = time.perf_counter()
+                while not self.stop_event.is_set():
+                    try:
+                        ready.put(item, block=not drop, timeout=None if drop else QUEUE_POLL_SECONDS)
+                        break
+                    except queue.Full:
+                        if drop:
+                            stats["dropped"] += 1
+                            break
+                stats["capture_wait_seconds"] += time.perf_counter() - waited
+        except Exception as e:
+            print(f"Kamera {self.sources[camera]} yakalanırken hata oluştu: {e}")
+            traceback.print_exc()
+            self.error = e
+            self.stop_event.set()
+        finally:
+            cap.release()
+
+    @staticmethod
+    def _next_result(results, processes):
+        """
+        Sonuç kuyruğundan sıradaki öğeyi alır. Bir işçi None göndermeden ölürse
+        (ör. sinyalle sonlandırıldıysa) sonsuza kadar beklemek yerine hata verir.
+        """
+        while True:
+            try:
+                return results.get(timeout=QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                pass
+            for process in processes:
+                # İşçi fonksiyonu hatalarını yakalar ve normal çıkar; sıfır dışı kod beklenmedik ölümdür
+                if process.exitcode not in (None, 0):
+                    raise RuntimeError(
+                        f"Çıkarım işçisi beklenmedik şekilde sonlandı (çıkış kodu {process.exitcode}).")
+
+    def run(self, on_event=None):
+        """
+        Tüm kameralar bitene (veya stop_event kurulana) kadar çalışır.
+
+        Args:
+            on_event: Her "state" / "rep" olayı için çağrılır: on_event(kamera, olay)
+
+        Returns:
+            dict: Rapor (kare hızı, gecikme, kamera başına istatistikler)
+        """
+        context = multiprocessing.get_context("spawn")
+        captures, rings, free_queues = [], {}, {}
+        processes, threads = [], []
+        try:
+            for camera, source in enumerate(self.sources):
+                cap = cv2.VideoCapture(source)
+                ok, first_frame = cap.read() if cap.isOpened() else (False, None)
+                if not ok:
+                    cap.release()
+                    raise IOError(f"{source} açılamadı.")
+                captures.append((cap, first_frame))
+                if self.transport == RING_TRANSPORT:
+                    rings[camera] = FrameRing(self.slots, first_frame.shape)
+                    free_queues[camera] = context.Queue()
+                    for slot in range(self.slots):
+                        free_queues[camera].put(slot)
+
+            results = context.Queue()
+            ready_queues = [context.Queue(maxsize=0 if self.transport == RING_TRANSPORT else self.slots)
+                            for _ in range(self.workers)]
+            for worker in range(self.workers):
+                cameras = {camera: rings[camera].spec() if camera in rings else None
+                           for camera in range(worker, len(self.sources), self.workers)}
+                process = context.Process(
+                    target=inference_worker, daemon=True,
+                    args=(cameras, ready_queues[worker], {camera: free_queues[camera] for camera in cameras
+                                                          if camera in free_queues},
+                          results, self.transport, self.pose_config))
+                process.start()
+                processes.append(process)
+            # Model yüklemesi ölçüme katılmasın
+            for _ in range(self.workers):
+                if self._next_result(results, processes) is None:
+                    raise RuntimeError("Çıkarım işçisi başlatılamadı.")
+
+            detections = []
+            for camera in range(len(self.sources)):
+                exercise_detection = ExerciseDetection(monitor_all=False)
+                exercise_detection.subscribe(*self.exercise_names)
+                detections.append(exercise_detection)
+
+            start = time.perf_counter()
+            for camera, (cap, first_frame) in enumerate(captures):
+                thread = threading.Thread(
+                    target=self._capture_loop, name=f"capture-{camera}", daemon=True,
+                    args=(camera, cap, first_frame, rings.get(camera), free_queues.get(camera),
+                          ready_queues[camera % self.workers]))
+                thread.start()
+                threads.append(thread)
+
+            def stop_workers():
+                for thread in threads:
+                    thread.join()
+                for ready in ready_queues:
+                    ready.put(None)
+
+            stopper = threading.Thread(target=stop_workers, name="stop-workers", daemon=True)
+            stopper.start()
+
+            finished = 0
+            while finished < self.workers:
+                item = self._next_result(results, processes)
+                if item is None:
+                    finished += 1
+                    if stopper.is_alive():
+                        # İşçi erken durdu; yakalama iş parçacıkları beklemesin
+                        self.stop_event.set()
+                    continue
+                camera, frame_number, timestamp_ms, captured_at, landmark_array = item
+                stats = self.cameras[camera]
+                stats["processed"] += 1
+                self.latencies_ms.append((time.perf_counter() - captured_at) * 1000.0)
+                if landmark_array is None:
+                    continue
+                stats["detected"] += 1
+                detections[camera].detect_exercises(landmark_array, timestamp_ms)
+                for event in detections[camera].get_events():
+                    stats["events"] += 1
+                    if on_event is not None:
+                        on_event(camera, event)
+            elapsed = time.perf_counter() - start
+            stopper.join()
+        finally:
+            self.stop_event.set()
+            # Yakalama iş parçacıkları yuvalara yazmayı bırakmadan halkalar kapatılmaz
+            for thread in threads:
+                thread.join(timeout=5.0)
+            for process in processes:
+                process.join(timeout=5.0)
+                if process.is_alive():
+                    process.terminate()
+            for ring in rings.values():
+                ring.close()
+        if self.error is not None:
+            raise self.error
+
+        for camera, stats in enumerate(self.cameras):
+            stats["capture_wait_seconds"] = round(stats["capture_wait_seconds"], 3)
+            stats["exercises"] = {name: detections[camera].exercises[name].get_repetition_count()
+                                  for name in self.exercise_names}
+        processed = sum(stats["processed"] for stats in self.cameras)
+        latencies = sorted(self.latencies_ms)
+        return {
+            "transport": self.transport,
+            "workers": self.workers,
+            "inference": self.pose_config is not None,
+            "frames": processed,
+            "elapsed_seconds": round(elapsed, 3),
+            "frames_per_second": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+            "latency_ms_p50": round(latencies[len(latencies) // 2], 2) if latencies else None,
+            "latency_ms_p95": round(latencies[int(len(latencies) * 0.95)], 2) if latencies else None,
+            "cameras": self.cameras,
+        }
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(
+        description="Çok kameralı çıkarım: paylaşımlı bellek halkası ile kuyruk tabanlı taşımayı karşılaştırır")
+    parser.add_argument("sources", nargs="+", help="Video dosyaları veya kamera indeksleri")
+    parser.add_argument("--workers", type=int, default=None, help="Çıkarım süreci sayısı (varsayılan: kamera sayısı)")
+    parser.add_argument("--transport", choices=TRANSPORTS + ("both",), default="both")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS, help="Kamera başına yuva sayısı")
+    parser.add_argument("--max-frames", type=int, default=None, help="Kamera başına en fazla kare")
+    parser.add_argument("--exercises", nargs="+", choices=list(EXERCISE_SPECS), default=["squat"])
+    parser.add_argument("--model-complexity", type=int, default=1, choices=(0, 1, 2))
+    parser.add_argument("--no-inference", action="store_true",
+                        help="Poz tahmini yapma, yalnızca kare taşıma maliyetini ölç")
+    parser.add_argument("--drop-frames", action="store_true", help="Video dosyalarında da yer yokken kare at")
+    parser.add_argument("--print-events", action="store_true", help="Olayları JSON satırları olarak yazdır")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pose_config = None if args.no_inference else {"model_complexity": args.model_complexity}
+
+    def print_event(camera, event):
+        print(json.dumps(dict(event, camera=camera), ensure_ascii=False))
+
+    reports = {}
+    for transport in (TRANSPORTS if args.transport == "both" else (args.transport,)):
+        pipeline = MultiCameraPipeline(args.sources, args.workers or len(args.sources), transport, args.slots,
+                                       pose_config, args.exercises, args.drop_frames or None, args.max_frames)
+        reports[transport] = pipeline.run(print_event if args.print_events else None)
+    if len(reports) == len(TRANSPORTS):
+        ring_fps = reports[RING_TRANSPORT]["frames_per_second"]
+        queue_fps = reports[QUEUE_TRANSPORT]["frames_per_second"]
+        reports["speedup"] = round(ring_fps / queue_fps, 2) if queue_fps else None
+    print(json.dumps(reports, ensure_ascii=False, indent=2), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
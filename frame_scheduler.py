@@ -0,0 +1,284 @@
+import asyncio
+import collections
+import os
+import time
+
+from stage_metrics import QUANTILES, StageMetrics
+
+# Atılan karelerin sonuçları (ScheduledFrame.future bu değerlerden biriyle tamamlanır)
+SUPERSEDED = "superseded"  # Aynı oturumdan daha yeni bir kare geldi
+EXPIRED = "expired"  # İşlenirse son tarihini kaçıracaktı
+CANCELLED = "cancelled"  # Oturum kapandı
+DROP_REASONS = (SUPERSEDED, EXPIRED, CANCELLED)
+
+SERVICE_TIME_ALPHA = 0.2  # İşlem süresi tahmininin üstel ortalama katsayısı
+
+
+class FrameDropped:
+    def __init__(self, reason):
+        """
+        Atılan bir karenin sonucu.
+
+        Args:
+            reason: SUPERSEDED, EXPIRED veya CANCELLED
+        """
+        self.reason = reason
+
+
+class ScheduledFrame:
+    def __init__(self, session, frame_number, timestamp_ms, job, received_at=None):
+        """
+        Zamanlayıcıya verilen kare.
+
+        Args:
+            session: Oturum anahtarı (add_session ile eklenmiş)
+            frame_number: Oturumdaki kare numarası
+            timestamp_ms: Karenin zaman damgası (ms)
+            job: Kareyi işleyecek bilgiler; zamanlayıcının execute fonksiyonuna verilir
+            received_at: Karenin alındığı an (time.perf_counter saniyesi)
+        """
+        self.session = session
+        self.frame_number = frame_number
+        self.timestamp_ms = timestamp_ms
+        self.job = job
+        self.received_at = time.perf_counter() if received_at is None else received_at
+        self.deadline = None  # offer() tarafından atanır (perf_counter saniyesi)
+        self.dispatched_at = None
+        # Sonuç: execute çıktısı, FrameDropped veya istisna
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class SchedulerSession:
+    def __init__(self, key, deadline_ms=None, max_in_flight=2, metrics_window=300):
+        self.key = key
+        self.deadline_ms = deadline_ms
+        self.max_in_flight = max_in_flight
+        self.mailbox = collections.deque()
+        self.in_flight = 0
+        self.queued = False  # Hazır oturumlar kuyruğunda mı
+        self.closed = False
+        self.started_at = time.perf_counter()
+        self.counters = {"received": 0, "processed": 0, "late": 0, "errors": 0}
+        self.counters.update({f"dropped_{reason}": 0 for reason in DROP_REASONS})
+        self.metrics = StageMetrics(window=metrics_window)
+
+
+class FrameScheduler:
+    def __init__(self, execute, capacity, max_in_flight=2, metrics_window=300):
+        """
+        Poz tahmini önündeki son tarih duyarlı kare zamanlayıcısı.
+
+        Her kareye alındığı andan itibaren deadline_ms sonrası bir son tarih verilir.
+        Son tarihli oturumlarda bekleyen en fazla bir kare tutulur: yeni kare gelince
+        eskisi atılır (SUPERSEDED), böylece işçiye her zaman oturumun en güncel karesi
+        gider. İşçiye verilmeden önce, tahmini işlem süresiyle son tarihini
+        kaçıracak kareler de atılır (EXPIRED). Son tarihi olmayan (kayıpsız) oturumların
+        kareleri sırayla bekler; bunların sınırı çağıran tarafın geri basıncıdır.
+
+        İşçi kapasitesi hazır oturumlar arasında sırayla (round-robin) dağıtılır:
+        düğüm aşırı yüklendiğinde her oturumun etkin kare hızı eşit oranda düşer,
+        daha az kare gönderen oturumlar ise tüm karelerini işletir. Son tarih işlem
+        süresine çok yakınsa (iki katından az) yalnızca işçinin boşaldığı ana denk
+        gelen kareler yetişebilir ve paylaşım adilliğini yitirir; son tarih işlem
+        süresinin birkaç katı seçilmelidir.
+
+        Args:
+            execute: execute(job) -> awaitable; kareyi işler (örneğin run_in_executor)
+            capacity: Aynı anda işlenen en fazla kare sayısı (tüm oturumlar)
+            max_in_flight: Oturum başına aynı anda işlenen en fazla kare
+            metrics_window: Gecikme yüzdeliklerinin hesaplandığı kare sayısı
+        """
+        self.execute = execute
+        self.capacity = capacity
+        self.max_in_flight = max_in_flight
+        self.metrics_window = metrics_window
+        self.sessions = {}
+        self.ready = collections.deque()  # Bekleyen karesi olan oturumlar, sırayla
+        self.in_flight = 0
+        self.service_time = None  # İşlem süresinin üstel ortalaması (s)
+        self.totals = collections.Counter()
+
+    def add_session(self, key, deadline_ms=None, max_in_flight=None):
+        """
+        Oturum ekler.
+
+        Args:
+            key: Oturum anahtarı
+            deadline_ms: Karelerin son tarihi (ms, alınma anından itibaren); None ise
+                oturum kayıpsızdır
+            max_in_flight: Oturumun aynı anda işlenen en fazla karesi (None ise varsayılan)
+        """
+        if key in self.sessions:
+            raise KeyError(f"{key} oturumu zaten var.")
+        self.sessions[key] = SchedulerSession(
+            key, deadline_ms, self.max_in_flight if max_in_flight is None else max_in_flight, self.metrics_window)
+
+    def remove_session(self, key):
+        """
+        Oturumu kaldırır; bekleyen kareleri CANCELLED ile tamamlanır.
+
+        Returns:
+            dict: Oturumun son istatistikleri
+        """
+        session = self.sessions.pop(key)
+        session.closed = True
+        while session.mailbox:
+            self._drop(session, session.mailbox.popleft(), CANCELLED)
+        return self._session_stats(session)
+
+    def offer(self, frame):
+        """
+        Kareyi oturumunun kuyruğuna koyar ve uygun işçi kapasitesi varsa dağıtır.
+
+        Returns:
+            ScheduledFrame: frame (future alanı sonucu verir)
+        """
+        session = self.sessions[frame.session]
+        session.counters["received"] += 1
+        if session.deadline_ms is not None:
+            frame.deadline = frame.received_at + session.deadline_ms / 1000.0
+            while session.mailbox:
+                self._drop(session, session.mailbox.popleft(), SUPERSEDED)
+        session.mailbox.append(frame)
+        self._enqueue(session)
+        self._dispatch()
+        return frame
+
+    def _enqueue(self, session):
+        if session.mailbox and not session.queued and not session.closed \
+                and session.in_flight < session.max_in_flight:
+            session.queued = True
+            self.ready.append(session)
+
+    def _drop(self, session, frame, reason):
+        session.counters[f"dropped_{reason}"] += 1
+        self.totals[f"dropped_{reason}"] += 1
+        frame.job = None  # Yükü hemen serbest bırak
+        if not frame.future.done():
+            frame.future.set_result(FrameDropped(reason))
+
+    def _dispatch(self):
+        """
+        Boş kapasiteyi hazır oturumlara sırayla dağıtır.
+        """
+        while self.in_flight < self.capacity and self.ready:
+            session = self.ready.popleft()
+            session.queued = False
+            if session.closed or not session.mailbox:
+                continue
+            frame = session.mailbox.popleft()
+            now = time.perf_counter()
+            if frame.deadline is not None and now + (self.service_time or 0.0) > frame.deadline:
+                self._drop(session, frame, EXPIRED)
+                self._enqueue(session)
+                continue
+
+            frame.dispatched_at = now
+            session.in_flight += 1
+            self.in_flight += 1
+            session.metrics.record("queue_wait", (now - frame.received_at) * 1000.0)
+            try:
+                awaitable = asyncio.ensure_future(self.execute(frame.job))
+            except Exception as e:
+                awaitable = asyncio.get_running_loop().create_future()
+                awaitable.set_exception(e)
+            frame.job = None
+            awaitable.add_done_callback(lambda done, session=session, frame=frame: self._complete(session, frame, done))
+            # Oturumun başka karesi varsa sıranın sonuna geçer
+            self._enqueue(session)
+
+    def _complete(self, session, frame, done):
+        now = time.perf_counter()
+        session.in_flight -= 1
+        self.in_flight -= 1
+        service_time = now - frame.dispatched_at
+        self.service_time = service_time if self.service_time is None else \
+            self.service_time + SERVICE_TIME_ALPHA * (service_time - self.service_time)
+        session.metrics.record("inference", service_time * 1000.0)
+        session.metrics.record("latency", (now - frame.received_at) * 1000.0)
+
+        if done.cancelled():
+            frame.future.cancel()
+        elif done.exception() is not None:
+            session.counters["errors"] += 1
+            self.totals["errors"] += 1
+            if not frame.future.done():
+                frame.future.set_exception(done.exception())
+        else:
+            session.counters["processed"] += 1
+            self.totals["processed"] += 1
+            if frame.deadline is not None and now > frame.deadline:
+                session.counters["late"] += 1
+                self.totals["late"] += 1
+            if not frame.future.done():
+                frame.future.set_result(done.result())
+        self._enqueue(session)
+        self._dispatch()
+
+    def _session_stats(self, session):
+        elapsed = time.perf_counter() - session.started_at
+        stats = {"deadline_ms": session.deadline_ms, **session.counters,
+                 "effective_fps": round(session.counters["processed"] / elapsed, 2) if elapsed > 0 else 0.0}
+        summary = session.metrics.summary()
+        for stage in ("queue_wait", "inference", "latency"):
+            if stage in summary:
+                stats[f"{stage}_ms_p50"] = round(summary[stage]["p50"], 2)
+                stats[f"{stage}_ms_p95"] = round(summary[stage]["p95"], 2)
+        return stats
+
+    def session_stats(self, key):
+        """
+        Oturumun sayaçları (alınan, işlenen, nedene göre atılan, son tarihini kaçıran
+        kareler), etkin kare hızı ve son penceredeki bekleme / işlem / uçtan uca
+        gecikme yüzdelikleri.
+        """
+        return self._session_stats(self.sessions[key])
+
+    def stats(self):
+        """
+        Zamanlayıcı geneli istatistikler.
+        """
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "sessions": len(self.sessions),
+            "service_time_ms": round(self.service_time * 1000.0, 2) if self.service_time is not None else None,
+            **dict(self.totals),
+        }
+
+    def prometheus_text(self, metric_prefix="exercise_validation"):
+        """
+        Oturum başına sayaçları ve gecikme yüzdeliklerini Prometheus metin biçiminde döndürür.
+        """
+        frames_name = f"{metric_prefix}_session_frames_total"
+        latency_name = f"{metric_prefix}_session_latency_ms"
+        lines = [
+            f"# HELP {frames_name} Oturum başına kare sayaçları (sonuca göre).",
+            f"# TYPE {frames_name} counter",
+        ]
+        for key, session in self.sessions.items():
+            for counter, value in session.counters.items():
+                lines.append(f'{frames_name}{{session="{key}",outcome="{counter}"}} {value}')
+        lines += [
+            f"# HELP {latency_name} Karenin alınmasından sonucuna kadar geçen süre (son {self.metrics_window} kare).",
+            f"# TYPE {latency_name} summary",
+        ]
+        for key, session in self.sessions.items():
+            latency = session.metrics.summary().get("latency")
+            if latency is None:
+                continue
+            for quantile in QUANTILES:
+                value = latency[f"p{round(quantile * 100)}"]
+                lines.append(f'{latency_name}{{session="{key}",quantile="{quantile}"}} {value:.4f}')
+            lines.append(f'{latency_name}_sum{{session="{key}"}} {latency["sum_ms"]:.4f}')
+            lines.append(f'{latency_name}_count{{session="{key}"}} {latency["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """
+        Metrikleri dosyaya yazar (geçici dosya + yer değiştirme).
+        """
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temporary_path, path)
@@ -0,0 +1,236 @@
+import math
+import time
+
+import numpy as np
+
+from angle_engine import AngleEngine
+from exercise_specs import EXERCISE_SPECS
+from pose_estimator import PoseEstimator
+
+
+class ConstantVelocityPredictor:
+    def __init__(self, max_extrapolation_ms=500.0):
+        """
+        Son iki çıkarımdan eklem hızlarını tahmin eder ve aradaki kareler için
+        eklem noktalarını sabit hız varsayımıyla öngörür.
+
+        Args:
+            max_extrapolation_ms: Son çıkarımdan sonra en fazla bu kadar ileri tahmin yapılır
+        """
+        self.max_extrapolation_ms = max_extrapolation_ms
+        self.reset()
+
+    def reset(self):
+        """
+        Geçmişi temizler (örneğin kişi kaybolduğunda).
+        """
+        self.last = None
+        self.last_time_ms = None
+        self.velocity = None  # Birim / ms
+
+    def observe(self, landmark_array, timestamp_ms):
+        """
+        Çıkarımla elde edilen eklem noktalarını geçmişe ekler.
+
+        Args:
+            landmark_array: (33, 4) eklem dizisi
+            timestamp_ms: Karenin zaman damgası (ms)
+        """
+        landmark_array = np.array(landmark_array, dtype=np.float32)
+        if self.last is not None and timestamp_ms > self.last_time_ms:
+            self.velocity = (landmark_array - self.last) / np.float32(timestamp_ms - self.last_time_ms)
+            self.velocity[:, 3] = 0.0  # Görünürlük tahmin edilmez
+        self.last = landmark_array
+        self.last_time_ms = timestamp_ms
+
+    def predict(self, timestamp_ms):
+        """
+        Verilen zaman için eklem noktalarını tahmin eder.
+
+        Returns:
+            np.ndarray veya None: (33, 4) tahmin, geçmiş yoksa None
+        """
+        if self.last is None:
+            return None
+        if self.velocity is None:
+            return self.last.copy()
+        elapsed_ms = min(max(timestamp_ms - self.last_time_ms, 0.0), self.max_extrapolation_ms)
+        return self.last + self.velocity * np.float32(elapsed_ms)
+
+
+class AdaptiveInference:
+    def __init__(self, estimator, frame_budget_ms=1000.0 / 30, inference_share=0.5, max_skip=6,
+                 validate_every=0, smoothing=0.2, validation_estimator=None):
+        """
+        MediaPipe çıkarımını yalnızca her k. karede çalıştırır; k ölçülen çıkarım
+        süresine göre uyarlanır. Atlanan karelerde eklem noktaları son çıkarımlardan
+        tahmin edilir, böylece açılar ve durum makineleri ekran hızında güncellenmeye
+        devam eder.
+
+        Args:
+            estimator: estimate(image_rgb, timestamp_ms) metoduna sahip PoseEstimator
+                (veya RoiTracker gibi bir sarmalayıcı)
+            frame_budget_ms: Kare başına süre bütçesi (ms)
+            inference_share: Bütçenin çıkarıma ayrılabilecek ortalama oranı
+            max_skip: k için üst sınır
+            validate_every: 0'dan büyükse her bu kadar atlanan karede bir çıkarım yine
+                çalıştırılır ve tahmin hatası ölçülür (yalnızca raporlama için). Doğrulama
+                validation_estimator ile yapılır; estimator'ın takip durumu (MediaPipe
+                takibi, RoiTracker kutusu) yalnızca çağıranın gördüğü çıkarımlarla ilerler.
+                Doğrulama tahmincisi çıkarım yapılan her kareyi de görür; böylece takip
+                durumu canlı modelinkini izler ve ölçülen hata, canlı model o karede
+                çalışsaydı vereceği sonuca göre tahmin hatasıdır. Doğrulama süresi k
+                hesabına katılır.
+            smoothing: Çıkarım süresi üstel ortalamasının katsayısı
+            validation_estimator: Doğrulama çıkarımlarını yapan, canlı modelle aynı
+                ayarlara sahip ayrı tahminci (None ise gerektiğinde estimator'ın
+                ayarlarıyla bir PoseEstimator oluşturulur). Kırpma yapmaz; estimator bir
+                RoiTracker ise hataya kırpmanın etkisi de karışır.
+        """
+        self.estimator = estimator
+        self.frame_budget_ms = frame_budget_ms
+        self.inference_share = inference_share
+        self.max_skip = max_skip
+        self.validate_every = validate_every
+        self.smoothing = smoothing
+        self.predictor = ConstantVelocityPredictor()
+        if validate_every and validation_estimator is None:
+            # Canlı modelle aynı ayarlarda ayrı model; takip durumu ayrı tutulur
+            validation_estimator = PoseEstimator(**getattr(estimator, "config", {}))
+        self.validation_estimator = validation_estimator
+
+        self.skip_interval = 1  # k
+        self.latency_ms = None  # Çıkarım süresinin üstel ortalaması
+        self.validation_latency_ms = None  # Doğrulama çıkarımı süresinin üstel ortalaması
+        self._frames_since_inference = 0
+
+        # Tahmin hatasını açı cinsinden raporlamak için tüm egzersiz üçlüleri
+        self._angle_engine = AngleEngine(spec.landmark_indices for spec in EXERCISE_SPECS.values())
+
+        # İstatistikler
+        self.frames = 0
+        self.inferred_frames = 0
+        self.predicted_frames = 0
+        self.validated_frames = 0
+        self.landmark_error_sum = 0.0  # Normalleştirilmiş koordinatlarda ortalama eklem hatası toplamı
+        self.angle_error_sum = 0.0  # Ortalama açı hatası toplamı (derece)
+        self.angle_error_max = 0.0
+
+    def _infer(self, image_rgb, timestamp_ms):
+        """
+        Çıkarımı çalıştırır, süresini ölçer ve k değerini günceller.
+        """
+        start = time.perf_counter()
+        landmark_array = self.estimator.estimate(image_rgb, timestamp_ms)
+        self.latency_ms = self._smooth(self.latency_ms, (time.perf_counter() - start) * 1000.0)
+        if self.validate_every:
+            # Doğrulama modeli de aynı kareyi görür ki takip durumu canlı modelinkini izlesin
+            self._infer_validation(image_rgb, timestamp_ms)
+        self._update_skip_interval()
+        return landmark_array
+
+    def _smooth(self, average, value):
+        return value if average is None else average + self.smoothing * (value - average)
+
+    def _update_skip_interval(self):
+        """
+        k değerini çıkarım süresine göre günceller. Doğrulama açıksa doğrulama
+        modeli çıkarım karelerinde de çalıştığı için süresi çıkarım süresine eklenir;
+        atlanan karelerdeki doğrulamaların kare başına payı bütçeden düşülür.
+        """
+        allowed_ms = self.frame_budget_ms * self.inference_share
+        latency_ms = self.latency_ms
+        if self.validation_latency_ms is not None:
+            allowed_ms -= self.validation_latency_ms / self.validate_every
+            latency_ms += self.validation_latency_ms
+        if allowed_ms <= 0:
+            self.skip_interval = self.max_skip
+        else:
+            self.skip_interval = int(min(self.max_skip, max(1, math.ceil(latency_ms / allowed_ms))))
+
+    def process(self, image_rgb, timestamp_ms):
+        """
+        Kareyi işler: gerekiyorsa çıkarım yapar, değilse eklem noktalarını tahmin eder.
+
+        Args:
+            image_rgb: RGB formatındaki görüntü
+            timestamp_ms: Karenin zaman damgası (ms)
+
+        Returns:
+            tuple: ((33, 4) eklem dizisi veya None, çıkarım yapıldı mı)
+        """
+        self.frames += 1
+        prediction = None
+        if self._frames_since_inference + 1 < self.skip_interval:
+            prediction = self.predictor.predict(timestamp_ms)
+
+        if prediction is not None:
+            self._frames_since_inference += 1
+            self.predicted_frames += 1
+            if self.validate_every and self.predicted_frames % self.validate_every == 0:
+                self._validate(image_rgb, timestamp_ms, prediction)
+            return prediction, False
+
+        landmark_array = self._infer(image_rgb, timestamp_ms)
+        self.inferred_frames += 1
+        self._frames_since_inference = 0
+        if landmark_array is None:
+            self.predictor.reset()
+            return None, True
+        self.predictor.observe(landmark_array, timestamp_ms)
+        return landmark_array, True
+
+    def estimate(self, image_rgb, timestamp_ms):
+        """
+        PoseEstimator.estimate ile aynı arayüz: yalnızca eklem dizisini döndürür.
+        """
+        return self.process(image_rgb, timestamp_ms)[0]
+
+    def _infer_validation(self, image_rgb, timestamp_ms):
+        """
+        Doğrulama tahmincisini çalıştırır ve süresini ölçer.
+        """
+        start = time.perf_counter()
+        landmark_array = self.validation_estimator.estimate(image_rgb, timestamp_ms)
+        self.validation_latency_ms = self._smooth(self.validation_latency_ms,
+                                                  (time.perf_counter() - start) * 1000.0)
+        return landmark_array
+
+    def _validate(self, image_rgb, timestamp_ms, prediction):
+        """
+        Atlanan bir karede ayrı tahminciyle çıkarım yapıp tahmin hatasını ölçer.
+        """
+        actual = self._infer_validation(image_rgb, timestamp_ms)
+        self._update_skip_interval()
+        if actual is None:
+            return
+        self.validated_frames += 1
+        self.landmark_error_sum += float(np.linalg.norm(prediction[:, :2] - actual[:, :2], axis=1).mean())
+        angle_error = np.abs(self._angle_engine.compute(prediction) - self._angle_engine.compute(actual))
+        angle_error = angle_error[np.isfinite(angle_error)]
+        if angle_error.size:
+            self.angle_error_sum += float(angle_error.mean())
+            self.angle_error_max = max(self.angle_error_max, float(angle_error.max()))
+
+    def report(self):
+        """
+        Çalışma istatistiklerini döndürür.
+
+        Returns:
+            dict: Kare sayıları, k, ortalama çıkarım süresi ve tahmin hatası
+        """
+        report = {
+            "frames": self.frames,
+            "inferred_frames": self.inferred_frames,
+            "predicted_frames": self.predicted_frames,
+            "skip_interval": self.skip_interval,
+            "inference_latency_ms": round(self.latency_ms or 0.0, 2),
+            "validated_frames": self.validated_frames,
+        }
+        if self.validation_latency_ms is not None:
+            report["validation_latency_ms"] = round(self.validation_latency_ms, 2)
+        if self.validated_frames:
+            report["mean_landmark_error"] = round(self.landmark_error_sum / self.validated_frames, 5)
+            report["mean_angle_error_deg"] = round(self.angle_error_sum / self.validated_frames, 2)
+            report["max_angle_error_deg"] = round(self.angle_error_max, 2)
+        return report
@@ -0,0 +1,118 @@
+import cv2
+import numpy as np
+
+
+class HudLayer:
+    def __init__(self, lines=()):
+        """
+        Bir grup cv2.putText satırını önbelleğe alınmış bir katman olarak çizer.
+
+        Her satır bir kez kendi kutusu boyutunda bir alfa maskesine çizilir ve
+        maskeden (255 - alfa) ile renk * alfa / 255 yamaları hesaplanır. Her karede
+        satırın kutusu cv2.multiply ve cv2.add ile yerinde harmanlanır; sonuç
+        doğrudan cv2.putText'ten piksel başına en fazla 1 farklıdır. Satırlar sırayla
+        uygulandığı için çakışan satırlar putText'teki gibi üst üste biner. Satırlar
+        değişmedikçe metin yeniden çizilmez.
+
+        Args:
+            lines: (metin, (x, y), ölçek, renk, kalınlık) demetleri
+        """
+        self.lines = None
+        self._cache = None  # (kare boyutu, [(satırlar, sütunlar, ters alfa, renk terimi), ...])
+        self.set_lines(lines)
+
+    def set_lines(self, lines):
+        """
+        Katmanın satırlarını değiştirir; satırlar aynıysa önbellek korunur.
+
+        Args:
+            lines: (metin, (x, y), ölçek, renk, kalınlık) demetleri
+        """
+        lines = tuple(tuple(line) for line in lines)
+        if lines != self.lines:
+            self.lines = lines
+            self._cache = None
+
+    def _render(self, frame_size):
+        height, width = frame_size
+        patches = []
+        for text, (x, y), scale, color, thickness in self.lines:
+            # Metni yalnızca kendi kutusu kadar bir maskeye çiz
+            (text_width, text_height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+            left, top = x - thickness, y - text_height - thickness
+            mask = np.zeros((text_height + baseline + 2 * thickness + 1, text_width + 2 * thickness + 1),
+                            dtype=np.uint8)
+            cv2.putText(mask, text, (x - left, y - top), cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+
+            # Kutuyu kare sınırlarına kırp
+            y0, x0 = max(top, 0), max(left, 0)
+            y1, x1 = min(top + mask.shape[0], height), min(left + mask.shape[1], width)
+            if y0 >= y1 or x0 >= x1:
+                continue
+            alpha = cv2.merge([mask[y0 - top:y1 - top, x0 - left:x1 - left]] * 3)
+
+            # yeni = eski * (255 - alfa) / 255 + renk * alfa / 255
+            colors = np.empty(alpha.shape, dtype=np.uint8)
+            colors[:] = color
+            color_term = cv2.multiply(colors, alpha, scale=1.0 / 255)
+            patches.append((slice(y0, y1), slice(x0, x1), cv2.bitwise_not(alpha), color_term))
+        return frame_size, patches
+
+    def draw(self, frame):
+        """
+        Katmanı kareye uygular.
+
+        Args:
+            frame: BGR formatındaki kare (yerinde değiştirilir)
+        """
+        frame_size = frame.shape[:2]
+        if self._cache is None or self._cache[0] != frame_size:
+            self._cache = self._render(frame_size)
+        for rows, columns, inverse_alpha, color_term in self._cache[1]:
+            roi = frame[rows, columns]
+            cv2.multiply(roi, inverse_alpha, dst=roi, scale=1.0 / 255)
+            cv2.add(roi, color_term, dst=roi)
+
+
+class ExerciseHud:
+    def __init__(self, exercise_label):
+        """
+        Egzersiz takibi sırasındaki ekran yazıları. Sabit yazılar bir kez çizilir;
+        tekrar sayısı ve durum yalnızca değerleri değiştiğinde yeniden çizilir.
+
+        Args:
+            exercise_label: Ekranda gösterilecek egzersiz adı
+        """
+        self.exercise_label = exercise_label
+        self.selected_layer = HudLayer([
+            (f"Selected Exercise: {exercise_label}", (20, 180), 1.5, (255, 0, 0), 3),
+        ])
+        self.no_keypoints_layer = HudLayer([
+            ("No keypoints detected", (20, 60), 1.5, (0, 0, 255), 3),
+        ])
+        self.stats_layer = HudLayer()
+        self.error_layer = HudLayer()
+
+    def draw_no_keypoints(self, frame):
+        """
+        Poz bulunamadığında gösterilen uyarıyı çizer.
+        """
+        self.no_keypoints_layer.draw(frame)
+
+    def draw_error(self, frame, error):
+        """
+        Egzersiz güncellenirken oluşan hatayı çizer.
+        """
+        self.error_layer.set_lines([(f"Error: {error}", (20, 60), 1.5, (0, 0, 255), 3)])
+        self.error_layer.draw(frame)
+
+    def draw_stats(self, frame, repetition_count, status):
+        """
+        Tekrar sayısını, durumu ve seçilen egzersizi çizer.
+        """
+        self.stats_layer.set_lines([
+            (f"Repetitions: {repetition_count}", (20, 60), 1.5, (0, 255, 0), 3),
+            (f"{self.exercise_label}: {status}", (20, 120), 1.5, (0, 255, 0), 3),
+        ])
+        self.stats_layer.draw(frame)
+        self.selected_layer.draw(frame)
@@ -0,0 +1,388 @@
+import argparse
+import json
+import math
+import struct
+import sys
+import time
+
+import numpy as np
+
+from angle_engine import NUM_LANDMARKS, LANDMARK_FIELDS, AngleEngine
+from exercise_specs import EXERCISE_SPECS
+
+# Eklem akışı için sıkıştırılmış kodlama.
+#
+# Akış bağımsız bloklardan oluşur; her blok en fazla block_frames kare içerir ve
+# kendi anahtar karesiyle başlar (bir blok kaybolsa veya tek başına okunsa da
+# çözülebilir). Blok içinde:
+#   - x, y, z koordinatları 1/QUANT_SCALE adımla int16'ya nicemlenir,
+#   - ilk poz karesi olduğu gibi, sonraki kareler bir önceki poz karesine göre
+#     fark olarak saklanır; farklar zigzag ile işaretsize çevrilir ve her
+#     (eklem, eksen) sütunu blok içindeki en büyük farkın gerektirdiği kadar bitle paketlenir,
+#   - görünürlük visibility_bits bitle nicemlenir,
+#   - zaman damgaları ilk damgaya göre mikrosaniye farkları olarak paketlenir,
+#   - poz bulunamayan kareler (herhangi bir koordinatı NaN) yalnızca bir maske biti
+#     kaplar ve NaN olarak çözülür.
+#
+# Hata sınırı: koordinat başına en fazla 0.5 / QUANT_SCALE (~3.1e-5). Kollarının
+# uzunluğu L1, L2 olan bir açının hatası en fazla 2·√2·δ·(1/L1 + 1/L2) radyandır;
+# kollar MIN_SEGMENT_LENGTH'ten uzunsa bu 0.5°'nin altında kalır.
+QUANT_SCALE = 16384.0
+QUANT_LIMIT = 32767  # ±2.0 normalize birim; dışındaki değerler kırpılır
+TIME_SCALE = 1000.0  # ms -> mikrosaniye
+DEFAULT_BLOCK_FRAMES = 32
+DEFAULT_VISIBILITY_BITS = 4
+MAX_BLOCK_FRAMES = 65535
+MAX_ANGLE_ERROR_DEG = 0.5
+MIN_SEGMENT_LENGTH = 4 * math.sqrt(2) * (0.5 / QUANT_SCALE) / math.radians(MAX_ANGLE_ERROR_DEG)
+
+# Blok başlığı: blok boyutu (bayt), kare sayısı, poz bulunan kare sayısı,
+# görünürlük bit sayısı, ilk zaman damgası (ms)
+BLOCK_HEADER = struct.Struct("<IHHBd")
+COORDINATES = NUM_LANDMARKS * 3
+
+# Kodlanmamış karşılaştırma boyutları (kare başına bayt)
+FLOAT64_FRAME_SIZE = 8 + NUM_LANDMARKS * LANDMARK_FIELDS * 8  # zaman damgası + 33 × 4 float64
+FLOAT32_FRAME_SIZE = 8 + NUM_LANDMARKS * LANDMARK_FIELDS * 4  # .lmk kaydı
+
+
+def _zigzag(values):
+    """
+    İşaretli tamsayıları işaretsize çevirir (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...).
+    """
+    values = values.astype(np.int64, copy=False)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values):
+    values = values.astype(np.int64, copy=False)
+    return (values >> 1) ^ -(values & 1)
+
+
+def _bit_widths(values):
+    """
+    (satır, sütun) işaretsiz değerler için sütun başına gereken bit sayısı.
+    """
+    if len(values) == 0:
+        return np.zeros(values.shape[1], dtype=np.uint8)
+    return np.frexp(values.max(axis=0).astype(np.float64))[1].astype(np.uint8)
+
+
+def _pack_columns(values, widths):
+    """
+    Her sütunu kendi bit genişliğiyle, satır sırasıyla paketler.
+
+    Args:
+        values: (satır, sütun) işaretsiz tamsayılar
+        widths: (sütun,) bit genişlikleri
+
+    Returns:
+        bytes: Paketlenmiş bitler (küçük uçlu bit sırası)
+    """
+    max_width = int(widths.max()) if len(widths) else 0
+    if len(values) == 0 or max_width == 0:
+        return b""
+    shifts = np.arange(max_width, dtype=np.uint64)
+    bits = ((values[:, :, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    mask = shifts < widths[:, None]
+    return np.packbits(bits[:, mask], bitorder="little").tobytes()
+
+
+def _unpack_columns(buffer, offset, rows, widths):
+    """
+    _pack_columns çıktısını çözer.
+
+    Returns:
+        tuple: ((satır, sütun) uint64 değerler, sonraki konum)
+    """
+    max_width = int(widths.max()) if len(widths) else 0
+    if rows == 0 or max_width == 0:
+        return np.zeros((rows, len(widths)), dtype=np.uint64), offset
+    total_bits = rows * int(widths.sum(dtype=np.int64))
+    size = (total_bits + 7) // 8
+    if offset + size > len(buffer):
+        raise ValueError("Eklem bloğu eksik (paketlenmiş bitler).")
+    bits = np.unpackbits(np.frombuffer(buffer, dtype=np.uint8, count=size, offset=offset),
+                         count=total_bits, bitorder="little").reshape(rows, -1)
+    shifts = np.arange(max_width, dtype=np.uint64)
+    mask = shifts < widths[:, None]
+    expanded = np.zeros((rows, len(widths), max_width), dtype=np.uint64)
+    expanded[:, mask] = bits
+    return (expanded << shifts).sum(axis=-1, dtype=np.uint64), offset + size
+
+
+def detected_frames(landmarks):
+    """
+    Poz bulunan kareleri döndürür. x, y, z koordinatlarından biri NaN olan kare
+    poz bulunamamış sayılır; NaN nicemlenemez ve sonraki karelerin farklarını bozar.
+
+    Args:
+        landmarks: (n, 33, 4) eklem dizileri
+
+    Returns:
+        np.ndarray: (n,) bool maske
+    """
+    return ~np.isnan(np.asarray(landmarks)[:, :, :3]).any(axis=(1, 2))
+
+
+def quantize(landmarks):
+    """
+    x, y, z koordinatlarını int16'ya nicemler.
+
+    Args:
+        landmarks: (..., 33, 4) eklem dizileri
+
+    Returns:
+        np.ndarray: (..., 33, 3) int16
+    """
+    scaled = np.rint(np.asarray(landmarks)[..., :3] * QUANT_SCALE)
+    return np.clip(scaled, -QUANT_LIMIT, QUANT_LIMIT).astype(np.int16)
+
+
+def dequantize(quantized):
+    """
+    Nicemlenmiş koordinatları float32'ye çevirir.
+    """
+    return (quantized / QUANT_SCALE).astype(np.float32)
+
+
+def encode_block(timestamps_ms, landmarks, visibility_bits=DEFAULT_VISIBILITY_BITS):
+    """
+    Kareleri tek bir bloğa kodlar.
+
+    Args:
+        timestamps_ms: (n,) zaman damgaları (ms), n en fazla MAX_BLOCK_FRAMES
+        landmarks: (n, 33, 4) eklem dizileri; poz bulunamayan kareler NaN (koordinatlarından
+            yalnızca biri NaN olan kareler de poz bulunamamış olarak kodlanır)
+        visibility_bits: Görünürlük başına bit sayısı (1-8)
+
+    Returns:
+        bytes: Blok
+    """
+    timestamps_ms = np.asarray(timestamps_ms, dtype=np.float64)
+    landmarks = np.asarray(landmarks)
+    count = len(timestamps_ms)
+    if not 0 < count <= MAX_BLOCK_FRAMES:
+        raise ValueError(f"Blok 1-{MAX_BLOCK_FRAMES} kare içermelidir ({count} verildi).")
+    if not 1 <= visibility_bits <= 8:
+        raise ValueError(f"visibility_bits 1-8 olmalıdır ({visibility_bits} verildi).")
+
+    detected = detected_frames(landmarks)
+    poses = landmarks[detected]
+    parts = [np.packbits(detected, bitorder="little").tobytes()]
+
+    # Zaman damgaları: ilk damgaya göre mikrosaniye, ardışık farklar
+    offsets = np.rint((timestamps_ms - timestamps_ms[0]) * TIME_SCALE).astype(np.int64)
+    time_deltas = _zigzag(np.diff(offsets))[:, None]
+    time_width = _bit_widths(time_deltas)
+    parts += [time_width.tobytes(), _pack_columns(time_deltas, time_width)]
+
+    if len(poses):
+        quantized = quantize(poses).reshape(len(poses), COORDINATES)
+        deltas = _zigzag(np.diff(quantized.astype(np.int32), axis=0))
+        widths = _bit_widths(deltas)
+        levels = (1 << visibility_bits) - 1
+        visibility = np.rint(np.clip(np.nan_to_num(poses[:, :, 3]), 0.0, 1.0) * levels).astype(np.uint64)
+        parts += [quantized[0].astype("<i2").tobytes(), widths.tobytes(), _pack_columns(deltas, widths),
+                  _pack_columns(visibility, np.full(NUM_LANDMARKS, visibility_bits, dtype=np.uint8))]
+
+    body = b"".join(parts)
+    header = BLOCK_HEADER.pack(BLOCK_HEADER.size + len(body), count, len(poses), visibility_bits,
+                               float(timestamps_ms[0]))
+    return header + body
+
+
+def decode_block(buffer, offset=0):
+    """
+    Bir bloğu çözer.
+
+    Args:
+        buffer: Kodlanmış akış (bytes veya memoryview)
+        offset: Bloğun başlangıcı
+
+    Returns:
+        tuple: ((n,) zaman damgaları ms, (n, 33, 4) float32 eklemler, sonraki bloğun konumu)
+
+    Raises:
+        ValueError: Blok eksik veya bozuksa
+    """
+    if offset + BLOCK_HEADER.size > len(buffer):
+        raise ValueError("Eklem bloğu eksik (başlık).")
+    size, count, detected_count, visibility_bits, first_timestamp_ms = BLOCK_HEADER.unpack_from(buffer, offset)
+    end = offset + size
+    if end > len(buffer) or count == 0 or detected_count > count or not 1 <= visibility_bits <= 8:
+        raise ValueError("Eklem bloğu bozuk.")
+    position = offset + BLOCK_HEADER.size
+
+    mask_size = (count + 7) // 8
+    detected = np.unpackbits(np.frombuffer(buffer, dtype=np.uint8, count=mask_size, offset=position),
+                             count=count, bitorder="little").astype(bool)
+    position += mask_size
+    if int(detected.sum()) != detected_count:
+        raise ValueError("Eklem bloğu bozuk (poz maskesi).")
+
+    time_width = np.frombuffer(buffer, dtype=np.uint8, count=1, offset=position)
+    time_deltas, position = _unpack_columns(buffer, position + 1, count - 1, time_width)
+    offsets = np.concatenate(([0], np.cumsum(_unzigzag(time_deltas[:, 0]))))
+    timestamps_ms = first_timestamp_ms + offsets / TIME_SCALE
+
+    landmarks = np.full((count, NUM_LANDMARKS, LANDMARK_FIELDS), np.nan, dtype=np.float32)
+    if detected_count:
+        key_size = COORDINATES * 2
+        if position + key_size + COORDINATES > end:
+            raise ValueError("Eklem bloğu eksik (anahtar kare).")
+        key = np.frombuffer(buffer, dtype="<i2", count=COORDINATES, offset=position).astype(np.int64)
+        widths = np.frombuffer(buffer, dtype=np.uint8, count=COORDINATES, offset=position + key_size)
+        deltas, position = _unpack_columns(buffer, position + key_size + COORDINATES, detected_count - 1, widths)
+        quantized = np.empty((detected_count, COORDINATES), dtype=np.int64)
+        quantized[0] = key
+        np.cumsum(_unzigzag(deltas), axis=0, out=quantized[1:])
+        quantized[1:] += key
+        visibility, position = _unpack_columns(buffer, position, detected_count,
+                                               np.full(NUM_LANDMARKS, visibility_bits, dtype=np.uint8))
+        landmarks[detected, :, :3] = dequantize(quantized.reshape(detected_count, NUM_LANDMARKS, 3))
+        landmarks[detected, :, 3] = visibility / ((1 << visibility_bits) - 1)
+    if position != end:
+        raise ValueError("Eklem bloğu bozuk (boyut uyuşmuyor).")
+    return timestamps_ms, landmarks, end
+
+
+def encode_landmark_stream(timestamps_ms, landmarks, block_frames=DEFAULT_BLOCK_FRAMES,
+                           visibility_bits=DEFAULT_VISIBILITY_BITS):
+    """
+    Eklem karelerini bloklara bölerek kodlar.
+
+    Args:
+        timestamps_ms: (n,) zaman damgaları (ms)
+        landmarks: (n, 33, 4) eklem dizileri; poz bulunamayan kareler NaN
+        block_frames: Blok başına kare sayısı (büyük bloklar daha iyi sıkışır,
+            küçük bloklar daha az gecikmeyle gönderilir)
+        visibility_bits: Görünürlük başına bit sayısı (1-8)
+
+    Returns:
+        bytes: Kodlanmış akış
+    """
+    block_frames = min(block_frames, MAX_BLOCK_FRAMES)
+    return b"".join(encode_block(timestamps_ms[start:start + block_frames], landmarks[start:start + block_frames],
+                                 visibility_bits)
+                    for start in range(0, len(timestamps_ms), block_frames))
+
+
+def decode_landmark_stream(buffer):
+    """
+    encode_landmark_stream çıktısını çözer.
+
+    Returns:
+        tuple: ((n,) zaman damgaları ms, (n, 33, 4) float32 eklemler)
+
+    Raises:
+        ValueError: Akış eksik veya bozuksa
+    """
+    timestamps, landmarks = [], []
+    offset = 0
+    while offset < len(buffer):
+        block_timestamps, block_landmarks, offset = decode_block(buffer, offset)
+        timestamps.append(block_timestamps)
+        landmarks.append(block_landmarks)
+    if not timestamps:
+        return np.zeros(0), np.zeros((0, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+    return np.concatenate(timestamps), np.concatenate(landmarks)
+
+
+def reconstruction_error(landmarks, decoded):
+    """
+    Kod çözme sonrası hatalar.
+
+    Returns:
+        dict: En büyük koordinat ve görünürlük hatası, egzersiz açılarındaki en büyük hata (derece)
+    """
+    detected = detected_frames(landmarks)
+    original, restored = landmarks[detected], decoded[detected]
+    engine = AngleEngine(spec.landmark_indices for spec in EXERCISE_SPECS.values())
+    with np.errstate(invalid="ignore"):
+        angle_error = np.abs(engine.compute(original) - engine.compute(restored))
+    return {
+        "max_coordinate_error": float(np.abs(original[..., :3] - restored[..., :3]).max(initial=0.0)),
+        "max_visibility_error": float(np.abs(original[..., 3] - restored[..., 3]).max(initial=0.0)),
+        "max_angle_error_deg": float(np.nanmax(angle_error, initial=0.0)),
+    }
+
+
+def measure_codec(timestamps_ms, landmarks, block_frames=DEFAULT_BLOCK_FRAMES,
+                  visibility_bits=DEFAULT_VISIBILITY_BITS, repeats=3):
+    """
+    Sıkıştırma oranını, kodlama/çözme hızını ve hatayı ölçer.
+
+    Returns:
+        dict: Ölçüm sonuçları
+    """
+    frames = len(timestamps_ms)
+    encode_seconds = decode_seconds = math.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encoded = encode_landmark_stream(timestamps_ms, landmarks, block_frames, visibility_bits)
+        encode_seconds = min(encode_seconds, time.perf_counter() - start)
+        start = time.perf_counter()
+        decoded_timestamps, decoded = decode_landmark_stream(encoded)
+        decode_seconds = min(decode_seconds, time.perf_counter() - start)
+
+    result = {
+        "frames": frames,
+        "block_frames": block_frames,
+        "visibility_bits": visibility_bits,
+        "encoded_bytes": len(encoded),
+        "bytes_per_frame": round(len(encoded) / frames, 2),
+        "ratio_vs_float64": round(frames * FLOAT64_FRAME_SIZE / len(encoded), 2),
+        "ratio_vs_float32": round(frames * FLOAT32_FRAME_SIZE / len(encoded), 2),
+        "encode_frames_per_second": round(frames / encode_seconds),
+        "decode_frames_per_second": round(frames / decode_seconds),
+        "max_timestamp_error_ms": float(np.abs(decoded_timestamps - timestamps_ms).max()),
+    }
+    result.update(reconstruction_error(landmarks, decoded))
+    return result
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Eklem akışı kodlayıcısının sıkıştırma oranını, hızını ve hatasını ölçer")
+    parser.add_argument("recording", nargs="?", default=None,
+                        help="Ölçülecek .lmk kaydı (verilmezse sentetik egzersizler)")
+    parser.add_argument("--output", default=None, help="Kodlanmış akışın yazılacağı dosya")
+    parser.add_argument("--block-frames", type=int, default=DEFAULT_BLOCK_FRAMES)
+    parser.add_argument("--visibility-bits", type=int, default=DEFAULT_VISIBILITY_BITS, choices=range(1, 9))
+    parser.add_argument("--frames", type=int, default=None, help="Kullanılacak en fazla kare sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.recording:
+        from landmark_recording import LandmarkRecording
+        recording = LandmarkRecording(args.recording)
+        timestamps_ms = np.array(recording.timestamps_ms[:args.frames])
+        landmarks = np.array(recording.landmarks[:args.frames])
+    else:
+        from synthetic_landmarks import synthetic_sessions
+        streams = [session.generate(0, args.frames) for session in
+                   synthetic_sessions(len(EXERCISE_SPECS), seed=args.seed, dropout_rate=0.02, occlusion_rate=0.01)]
+        # Oturumlar art arda eklenir; zaman damgaları artmaya devam etsin
+        timestamps_ms = np.concatenate([timestamps + i * 1e7 for i, (timestamps, _) in enumerate(streams)])
+        landmarks = np.concatenate([frames for _, frames in streams])[:args.frames]
+        timestamps_ms = timestamps_ms[:args.frames]
+    if not len(timestamps_ms):
+        print("Kodlanacak kare yok.", file=sys.stderr)
+        return 1
+
+    result = measure_codec(timestamps_ms, landmarks, args.block_frames, args.visibility_bits)
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(encode_landmark_stream(timestamps_ms, landmarks, args.block_frames, args.visibility_bits))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0 if result["max_angle_error_deg"] < MAX_ANGLE_ERROR_DEG else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+import math
+
+import numpy as np
+
+from angle_engine import NUM_LANDMARKS
+from exercise_engine import MAX_FRAME_GAP_MS
+
+# Eklem grupları (MediaPipe Pose indeksleri)
+FACE = tuple(range(11))
+TORSO = (11, 12, 23, 24)
+ELBOWS_KNEES = (13, 14, 25, 26)
+EXTREMITIES = (15, 16, 17, 18, 19, 20, 21, 22, 27, 28, 29, 30, 31, 32)
+
+# Varsayılan eklem başına parametreler: yavaş hareket eden gövde ve yüz daha
+# güçlü yumuşatılır; hızlı hareket eden el ve ayaklar hıza daha çabuk tepki verir.
+DEFAULT_MIN_CUTOFF = {FACE: 1.0, TORSO: 1.0, ELBOWS_KNEES: 1.5, EXTREMITIES: 2.0}  # Hz
+DEFAULT_BETA = {FACE: 5.0, TORSO: 5.0, ELBOWS_KNEES: 10.0, EXTREMITIES: 15.0}  # Hz / (normalize birim/s)
+DEFAULT_D_CUTOFF = 1.0  # Hz
+
+# Filtre açıkken önerilen kararlılık süresi (ms). Titreşim filtrede bastırıldığı için
+# durum makinesinin REQUIRED_STABLE_MS (150 ms) beklemesi kısaltılabilir.
+FILTERED_STABLE_MS = 60.0
+
+
+def per_joint(values, default=None):
+    """
+    Eklem başına parametre dizisi oluşturur.
+
+    Args:
+        values: Sayı, (33,) dizi veya {eklem indeksleri: değer} sözlüğü
+        default: Sözlükte olmayan eklemler için değer
+
+    Returns:
+        np.ndarray: (33,) float64 dizi
+    """
+    if isinstance(values, dict):
+        result = np.full(NUM_LANDMARKS, np.nan if default is None else default, dtype=np.float64)
+        for joints, value in values.items():
+            result[list(joints)] = value
+        if np.isnan(result).any():
+            raise ValueError("Eklem parametreleri tüm eklemleri kapsamalıdır.")
+        return result
+    return np.broadcast_to(np.asarray(values, dtype=np.float64), (NUM_LANDMARKS,)).copy()
+
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff=None, beta=None, d_cutoff=DEFAULT_D_CUTOFF):
+        """
+        Eklem koordinatları için One-Euro uyarlamalı alçak geçiren filtre.
+
+        Her koordinat hızına göre değişen kesim frekanslı birinci dereceden bir
+        alçak geçiren filtreden geçer: durağan eklemlerde kesim min_cutoff'a iner
+        (titreşim bastırılır), hızlı hareketlerde beta ile orantılı olarak yükselir
+        (gecikme azalır). Hız da d_cutoff ile yumuşatılır.
+
+        Filtre her karede (33, 4) dizinin x, y, z sütunlarına tek vektörel adımda
+        uygulanır; görünürlük değiştirilmez. Kesim ve alfa değerleri zaman
+        damgalarından hesaplandığı için değişken kare hızında da doğru çalışır.
+
+        Args:
+            min_cutoff: Durağan eklemlerde kesim frekansı (Hz); sayı, (33,) dizi
+                veya {eklem indeksleri: değer} sözlüğü. None ise DEFAULT_MIN_CUTOFF.
+            beta: Kesimin hızla artış katsayısı; min_cutoff ile aynı biçimlerde.
+                None ise DEFAULT_BETA.
+            d_cutoff: Hız yumuşatmasının kesim frekansı (Hz)
+        """
+        self.min_cutoff = per_joint(DEFAULT_MIN_CUTOFF if min_cutoff is None else min_cutoff)[:, None]
+        self.beta = per_joint(DEFAULT_BETA if beta is None else beta)[:, None]
+        self.d_cutoff = d_cutoff
+
+        self.previous = np.zeros((NUM_LANDMARKS, 3), dtype=np.float64)
+        self.derivative = np.zeros((NUM_LANDMARKS, 3), dtype=np.float64)
+        self.previous_time_ms = None
+        # Ara sonuçlar için yeniden kullanılan tamponlar
+        self._delta = np.empty((NUM_LANDMARKS, 3), dtype=np.float64)
+        self._cutoff = np.empty((NUM_LANDMARKS, 3), dtype=np.float64)
+
+    def reset(self):
+        """
+        Filtre durumunu sıfırlar; sonraki kare olduğu gibi geçer.
+        """
+        self.previous_time_ms = None
+
+    def apply(self, landmark_array, timestamp_ms):
+        """
+        Kareyi filtreler.
+
+        İlk karede, MAX_FRAME_GAP_MS'ten uzun bir boşluktan sonra veya geçersiz
+        (NaN) koordinatlarda filtre baştan başlar ve kare olduğu gibi kullanılır.
+
+        Args:
+            landmark_array: (33, 4) float32 eklem dizisi (yerinde değiştirilir)
+            timestamp_ms: Karenin zaman damgası (ms)
+
+        Returns:
+            np.ndarray: Filtrelenmiş landmark_array
+        """
+        xyz = landmark_array[:, :3]
+        elapsed_ms = None if self.previous_time_ms is None else timestamp_ms - self.previous_time_ms
+        if elapsed_ms is None or not 0 < elapsed_ms <= MAX_FRAME_GAP_MS or np.isnan(xyz[0, 0]):
+            self.previous[:] = xyz
+            self.derivative[:] = 0.0
+            self.previous_time_ms = None if np.isnan(xyz[0, 0]) else timestamp_ms
+            return landmark_array
+
+        dt = elapsed_ms / 1000.0
+        delta, cutoff = self._delta, self._cutoff
+        np.subtract(xyz, self.previous, out=delta)
+
+        # Hızı yumuşat: alfa = r / (r + 1), r = 2π · kesim · dt
+        r = 2.0 * math.pi * self.d_cutoff * dt
+        self.derivative += (delta / dt - self.derivative) * (r / (r + 1.0))
+
+        # Hıza göre kesim frekansı ve koordinatların yumuşatılması
+        np.abs(self.derivative, out=cutoff)
+        cutoff *= self.beta
+        cutoff += self.min_cutoff
+        cutoff *= 2.0 * math.pi * dt
+        delta *= cutoff / (cutoff + 1.0)
+        self.previous += delta
+
+        xyz[:] = self.previous
+        self.previous_time_ms = timestamp_ms
+        return landmark_array
@@ -0,0 +1,172 @@
+import asyncio
+import time
+
+import numpy as np
+
+from session_engine import MultiSessionEngine
+
+
+class LandmarkIngestService:
+    def __init__(self, specs=None, capacity=1024):
+        """
+        Cihazda hesaplanmış eklem karelerini alan ve yalnızca egzersiz durum
+        makinelerini çalıştıran servis.
+
+        Tüm oturumlar tek bir MultiSessionEngine içindedir (ExerciseDetection ile
+        aynı advance_state_machines adımı). Farklı oturumlardan gelen yığınlar
+        birlikte işlenir: her adımda her oturumun sıradaki karesi tek bir vektörel
+        çağrıyla ilerletilir, böylece kare başına maliyet oturum sayısı arttıkça düşer.
+
+        Args:
+            specs: ExerciseSpec listesi (None ise kayıt defterindeki tüm tanımlar)
+            capacity: Başlangıç oturum kapasitesi
+        """
+        self.engine = MultiSessionEngine(specs, capacity=capacity)
+        self.session_frames = {}  # oturum -> (alınan kare, poz bulunan kare)
+        self.frames_processed = 0
+        self.processing_seconds = 0.0
+        self._queue = []  # (oturum, zaman damgaları, eklemler, future)
+        self._flush_scheduled = False
+
+    def open_session(self, exercise_names):
+        """
+        Yeni bir oturum açar.
+
+        Returns:
+            int: Oturum kimliği
+
+        Raises:
+            KeyError: Bilinmeyen bir egzersiz adı verilirse
+        """
+        session = self.engine.add_session(exercise_names)
+        self.session_frames[session] = [0, 0]
+        return session
+
+    def close_session(self, session):
+        """
+        Oturumu kapatır.
+
+        Returns:
+            dict: Kare sayıları ve egzersiz başına tekrar sayıları
+        """
+        frames, detected_frames = self.session_frames.pop(session)
+        rows = np.nonzero(self.engine.subscribed[session])[0]
+        summary = {
+            "frames": frames,
+            "detected_frames": detected_frames,
+            "exercises": {self.engine.specs[row].name: int(self.engine.repetition_count[session, row])
+                          for row in rows},
+        }
+        self.engine.remove_session(session)
+        return summary
+
+    def ingest_many(self, batches):
+        """
+        Birden fazla oturumun eklem yığınlarını birlikte işler.
+
+        Args:
+            batches: (oturum, (n,) zaman damgaları ms, (n, 33, 4) eklemler) listesi; bir
+                oturum listede bir kez bulunmalıdır. Poz bulunamayan (NaN) kareler atlanır.
+
+        Returns:
+            dict: oturum -> olay listesi (ExerciseDetection.get_events() biçiminde)
+        """
+        started = time.perf_counter()
+        events = {session: [] for session, _, _ in batches}
+        if not batches:
+            return events
+        lengths = np.array([len(timestamps_ms) for _, timestamps_ms, _ in batches], dtype=np.intp)
+        landmarks = np.concatenate([frames for _, _, frames in batches])
+        timestamps_ms = np.concatenate([timestamps for _, timestamps, _ in batches]).astype(np.float64, copy=False)
+        batch_of_frame = np.repeat(np.arange(len(batches)), lengths)
+        sessions = np.array([session for session, _, _ in batches], dtype=np.intp)[batch_of_frame]
+        # Karenin kendi yığınındaki sırası; aynı sıradaki kareler tek adımda işlenir
+        steps = np.arange(len(sessions)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        detected = ~np.isnan(landmarks[:, 0, 0])
+
+        frames = np.nonzero(detected)[0]
+        frames = frames[np.argsort(steps[frames], kind="stable")]
+        boundaries = np.nonzero(np.diff(steps[frames]))[0] + 1
+        for step_frames in np.split(frames, boundaries) if len(frames) else ():
+            changed_sessions, rows, changed, completed = self.engine.step(
+                landmarks[step_frames], sessions[step_frames], timestamps_ms[step_frames])
+            for i in np.nonzero(changed)[0]:
+                session, row = int(changed_sessions[i]), int(rows[i])
+                event = {
+                    "timestamp_ms": round(float(self.engine.session_clock_ms[session]), 1),
+                    "exercise": self.engine.specs[row].name,
+                    "state": self.engine.get_state(session, self.engine.specs[row].name),
+                    "repetition_count": int(self.engine.repetition_count[session, row]),
+                }
+                events[session].append({"type": "state", **event})
+                if completed[i]:
+                    events[session].append({"type": "rep", **event})
+
+        detected_counts = np.bincount(batch_of_frame[detected], minlength=len(batches))
+        for (session, _, _), length, detected_count in zip(batches, lengths, detected_counts):
+            counts = self.session_frames[session]
+            counts[0] += int(length)
+            counts[1] += int(detected_count)
+        self.frames_processed += len(sessions)
+        self.processing_seconds += time.perf_counter() - started
+        return events
+
+    def ingest(self, session, timestamps_ms, landmarks):
+        """
+        Tek bir oturumun eklem yığınını işler.
+
+        Returns:
+            list: Olaylar
+        """
+        return self.ingest_many([(session, timestamps_ms, landmarks)])[session]
+
+    async def submit(self, session, timestamps_ms, landmarks):
+        """
+        Yığını sıraya alır ve olaylarını bekler. Aynı olay döngüsü turunda gelen
+        tüm yığınlar tek bir ingest_many çağrısıyla işlenir; bir oturumun birden
+        fazla yığını varsa sırası korunur.
+
+        Returns:
+            list: Olaylar
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((session, timestamps_ms, landmarks, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        """
+        Sıradaki yığınları işler. Aynı oturumun ikinci yığını sonraki tura kalır.
+        """
+        self._flush_scheduled = False
+        queue, self._queue = self._queue, []
+        batches, seen = [], set()
+        for item in queue:
+            if item[0] in seen:
+                self._queue.append(item)
+            else:
+                seen.add(item[0])
+                batches.append(item)
+        if self._queue:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+        try:
+            events = self.ingest_many([(session, timestamps_ms, landmarks)
+                                       for session, timestamps_ms, landmarks, _ in batches])
+        except Exception as e:
+            for *_, future in batches:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for session, _, _, future in batches:
+            if not future.done():
+                future.set_result(events[session])
+
+    def cost_per_frame_us(self):
+        """
+        Şimdiye kadar işlenen karelerin ortalama sunucu maliyeti (mikrosaniye).
+        """
+        return self.processing_seconds / self.frames_processed * 1e6 if self.frames_processed else 0.0
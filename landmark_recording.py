@@ -0,0 +1,226 @@
+import os
+import struct
+
+import numpy as np
+
+from angle_engine import NUM_LANDMARKS, LANDMARK_FIELDS, landmarks_to_array
+
+# Dosya düzeni: sabit boyutlu başlık + sabit boyutlu kayıtlar (küçük uçlu).
+# Her kayıt bir karedir: zaman damgası (float64, ms) ve (33, 4) float32 eklem bloğu.
+# Poz bulunamayan kareler NaN eklemlerle kaydedilir, böylece zaman çizelgesi korunur.
+MAGIC = b"EDSLMK\x00\x01"
+VERSION = 1
+HEADER_FORMAT = "<8sHHHxxI44x"  # sihirli sayı, sürüm, eklem sayısı, alan sayısı, kayıt boyutu
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_DTYPE = np.dtype([
+    ("timestamp_ms", "<f8"),
+    ("landmarks", "<f4", (NUM_LANDMARKS, LANDMARK_FIELDS)),
+])
+
+
+def _pack_header():
+    return struct.pack(HEADER_FORMAT, MAGIC, VERSION, NUM_LANDMARKS, LANDMARK_FIELDS, RECORD_DTYPE.itemsize)
+
+
+def _check_header(header, path):
+    """
+    Başlığı doğrular.
+
+    Raises:
+        ValueError: Dosya bir eklem kaydı değilse veya düzeni uyumsuzsa
+    """
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"{path} bir eklem kaydı değil (başlık eksik).")
+    magic, version, num_landmarks, num_fields, record_size = struct.unpack(HEADER_FORMAT, header[:HEADER_SIZE])
+    if magic != MAGIC:
+        raise ValueError(f"{path} bir eklem kaydı değil.")
+    if version != VERSION or (num_landmarks, num_fields) != (NUM_LANDMARKS, LANDMARK_FIELDS) \
+            or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} desteklenmeyen kayıt düzeni: sürüm {version}, "
+                         f"({num_landmarks}, {num_fields}), kayıt {record_size} bayt")
+
+
+class LandmarkRecorder:
+    def __init__(self, path, buffer_frames=256, append=True):
+        """
+        Kare başına zaman damgası ve (33, 4) eklem bloğunu dosyaya ekler.
+
+        Kayıtlar bellekte buffer_frames kadar biriktirilip tek yazma işlemiyle
+        eklenir. Dosya varsa kayıtlar sonuna eklenir; yarım kalmış son kayıt
+        (örneğin çökme sonrası) okuyucu tarafından yok sayılır ve ekleme öncesinde
+        kesilir.
+
+        Args:
+            path: Kayıt dosyasının yolu
+            buffer_frames: Diske yazmadan önce biriktirilecek kare sayısı
+            append: False ise var olan dosyanın üzerine yazılır
+        """
+        self.path = path
+        if not append and os.path.exists(path):
+            os.remove(path)
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "r+b") as f:
+                _check_header(f.read(HEADER_SIZE), path)
+                # Yarım kalmış son kaydı at, yeni kayıtlar hizalı eklensin
+                frame_count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+                f.truncate(HEADER_SIZE + frame_count * RECORD_DTYPE.itemsize)
+        self.file = open(path, "ab")
+        if not exists:
+            self.file.write(_pack_header())
+
+        self.buffer = np.zeros(buffer_frames, dtype=RECORD_DTYPE)
+        self.buffered = 0
+        self.frames_written = 0
+
+    def write(self, timestamp_ms, landmarks):
+        """
+        Bir kareyi kaydeder.
+
+        Args:
+            timestamp_ms: Karenin zaman damgası (ms)
+            landmarks: (33, 4) eklem dizisi, MediaPipe eklem listesi veya None (poz yok)
+        """
+        record = self.buffer[self.buffered]
+        record["timestamp_ms"] = timestamp_ms
+        if landmarks is None:
+            record["landmarks"] = np.nan
+        else:
+            landmarks_to_array(landmarks, out=record["landmarks"])
+        self.buffered += 1
+        if self.buffered == len(self.buffer):
+            self.flush()
+
+    def write_batch(self, timestamps_ms, landmarks):
+        """
+        Kare yığınını tek yazma işlemiyle kaydeder (sentetik veya dönüştürülmüş diziler için).
+
+        Args:
+            timestamps_ms: (n,) zaman damgaları (ms)
+            landmarks: (n, 33, 4) eklem dizileri (poz yoksa NaN)
+        """
+        self.flush()
+        records = np.empty(len(timestamps_ms), dtype=RECORD_DTYPE)
+        records["timestamp_ms"] = timestamps_ms
+        records["landmarks"] = landmarks
+        self.file.write(records.tobytes())
+        self.frames_written += len(records)
+
+    def flush(self):
+        """
+        Biriken kayıtları diske yazar.
+        """
+        if self.buffered:
+            self.file.write(self.buffer[:self.buffered].tobytes())
+            self.frames_written += self.buffered
+            self.buffered = 0
+        self.file.flush()
+
+    def close(self):
+        """
+        Kalan kayıtları yazar ve dosyayı kapatır.
+        """
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class LandmarkRecording:
+    def __init__(self, path):
+        """
+        Eklem kaydını np.memmap ile açar. Veriler kopyalanmadan diskten okunur;
+        yalnızca erişilen sayfalar belleğe yüklenir.
+
+        Args:
+            path: Kayıt dosyasının yolu
+
+        Raises:
+            ValueError: Dosya bir eklem kaydı değilse
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            _check_header(f.read(HEADER_SIZE), path)
+        frame_count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if frame_count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(frame_count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        """
+        Kare(ler)i döndürür; dilimler kopyalanmadan görünüm olarak döner.
+        """
+        return self.records[index]
+
+    @property
+    def timestamps_ms(self):
+        """
+        (n,) zaman damgaları (ms).
+        """
+        return self.records["timestamp_ms"]
+
+    @property
+    def landmarks(self):
+        """
+        (n, 33, 4) eklem dizileri; poz bulunamayan karelerde NaN.
+        """
+        return self.records["landmarks"]
+
+    def detected(self):
+        """
+        Poz bulunan kareleri gösteren (n,) bool maske.
+        """
+        return ~np.isnan(self.records["landmarks"][:, 0, 0])
+
+    def time_slice(self, start_ms=None, end_ms=None):
+        """
+        Zaman aralığındaki kareleri döndürür (zaman damgalarının artan olduğu varsayılır).
+
+        Args:
+            start_ms: Başlangıç (dahil, None ise baştan)
+            end_ms: Bitiş (hariç, None ise sona kadar)
+
+        Returns:
+            np.ndarray: Kayıt görünümü
+        """
+        timestamps = self.records["timestamp_ms"]
+        start = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side="left"))
+        end = len(timestamps) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side="left"))
+        return self.records[start:end]
+
+    def duration_ms(self):
+        """
+        Kaydın süresi (ms).
+        """
+        if len(self.records) < 2:
+            return 0.0
+        return float(self.records["timestamp_ms"][-1] - self.records["timestamp_ms"][0])
+
+
+class RecordingEstimator:
+    def __init__(self, estimator, recorder):
+        """
+        estimate() çağrılarının sonuçlarını kaydeden sarmalayıcı. PoseEstimator,
+        RoiTracker veya AdaptiveInference ile aynı arayüze sahiptir; bu nedenle
+        zincirin en dışına eklenerek durum makinesine verilen eklemler kaydedilir.
+
+        Args:
+            estimator: estimate(image_rgb, timestamp_ms) metoduna sahip nesne
+            recorder: LandmarkRecorder nesnesi
+        """
+        self.estimator = estimator
+        self.recorder = recorder
+
+    def estimate(self, image_rgb, timestamp_ms=None):
+        landmark_array = self.estimator.estimate(image_rgb, timestamp_ms)
+        self.recorder.write(timestamp_ms, landmark_array)
+        return landmark_array
@@ -1,19 +1,353 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
 import cv2
 import mediapipe as mp
 import traceback
 from exercise_detection import ExerciseDetection
+from event_stream import JsonLinesWriter
+from exercise_specs import EXERCISE_SPECS
+from frame_skipping import AdaptiveInference
+from hud import ExerciseHud, HudLayer
+from landmark_filter import FILTERED_STABLE_MS, OneEuroFilter
+from landmark_recording import LandmarkRecorder, RecordingEstimator
+from pipeline import PipelinedLoop
+from pose_estimator import PoseEstimator, get_pose_estimator
+from roi_tracker import RoiTracker
+from skeleton_renderer import SkeletonRenderer
+from stage_metrics import StageMetrics
 
-def main():
+# Seçim menüsündeki egzersizler (0-9 tuşları), kayıt defteri sırasıyla
+MENU_EXERCISES = list(EXERCISE_SPECS.values())[:10]
+MENU_KEYS = {ord(str(i)): spec.name for i, spec in enumerate(MENU_EXERCISES)}
+MENU_LINES = [("Select Exercise:", (10, 50), 1.5, (255, 0, 0), 3)] + [
+    (f"{i}: {spec.display_name}", (10, 100 + i * 40), 1.0, (255, 0, 0), 2)
+    for i, spec in enumerate(MENU_EXERCISES)
+]
+
+def analyze_frame(frame, pose, exercise_detection, selected_exercise, timestamp_ms=None, metrics=None):
+    """
+    Karede poz tespiti yapar ve seçilen egzersizin durumunu günceller.
+
+    Args:
+        frame: BGR formatındaki kamera karesi
+        pose: estimate() metoduna sahip PoseEstimator, RoiTracker veya AdaptiveInference
+        exercise_detection: ExerciseDetection nesnesi
+        selected_exercise: Seçilen egzersizin adı
+        timestamp_ms: Karenin yakalanma zamanı (ms); kararlılık ve geçişler bu zamana göre hesaplanır
+        metrics: Verilirse renk dönüşümü ve poz tespiti süreleri kaydedilir (StageMetrics)
+
+    Returns:
+        dict: landmarks, repetition_count, status ve error alanları
+    """
+    analysis = {"landmarks": None, "repetition_count": 0, "status": None, "error": None}
+
+    if timestamp_ms is None:
+        timestamp_ms = time.perf_counter() * 1000.0
+
+    # BGR'yi RGB'ye çeviriyoruz
+    started = time.perf_counter()
+    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if metrics is not None:
+        started = metrics.lap("convert", started)
+    landmarks = pose.estimate(image, timestamp_ms)
+    if metrics is not None:
+        metrics.lap("pose", started)
+
+    # Eğer poz tespit edildiyse (veya atlanan karede tahmin edildiyse)
+    if landmarks is not None:
+        # (33, 4) eklem dizisi: x, y, z, visibility
+        analysis["landmarks"] = landmarks
+
+        # Egzersiz durumunu güncelle
+        try:
+            # Yalnızca abone olunan egzersiz her karede bir kez güncellenir
+            exercise_results = exercise_detection.detect_exercises(landmarks, timestamp_ms)
+            analysis["repetition_count"] = exercise_detection.exercises[selected_exercise].get_repetition_count()
+            analysis["status"] = exercise_results[selected_exercise]
+        except Exception as e:
+            print(f"Egzersiz durumu güncellenirken hata oluştu: {e}")
+            traceback.print_exc()
+            analysis["error"] = str(e)
+
+    return analysis
+
+
+def draw_frame(frame, analysis, renderer, hud):
+    """
+    Analiz sonuçlarını kareye çizer.
+
+    Args:
+        frame: BGR formatındaki kamera karesi (yerinde değiştirilir)
+        analysis: analyze_frame tarafından döndürülen sözlük
+        renderer: SkeletonRenderer nesnesi
+        hud: Seçilen egzersizin ExerciseHud nesnesi
+    """
+    landmarks = analysis["landmarks"]
+    if landmarks is None:
+        hud.draw_no_keypoints(frame)
+        return
+
+    # Eklemleri (yeşil) ve eklemler arası bağlantıları (mavi) çiz
+    renderer.draw(frame, landmarks)
+
+    if analysis["error"] is not None:
+        hud.draw_error(frame, analysis["error"])
+        return
+
+    # Sonuçları ve seçilen egzersizi ekrana yazdır - DAHA BÜYÜK YAZI
+    hud.draw_stats(frame, analysis["repetition_count"], analysis["status"])
+
+
+def run_serial(cap, pose, renderer, exercise_detection, selected_exercise, metrics=None):
+    """
+    Yakalama, çıkarım ve çizimi tek döngüde sırayla çalıştırır.
+    """
+    hud = ExerciseHud(selected_exercise.capitalize())
+    while cap.isOpened():
+        try:
+            started = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                print("Kamera akışında hata.")
+                break
+            if metrics is not None:
+                metrics.lap("capture", started)
+            timestamp_ms = time.perf_counter() * 1000.0
+
+            analysis = analyze_frame(frame, pose, exercise_detection, selected_exercise, timestamp_ms, metrics)
+            started = time.perf_counter()
+            draw_frame(frame, analysis, renderer, hud)
+            if metrics is not None:
+                if metrics.overlay:
+                    metrics.draw_overlay(frame)
+                started = metrics.lap("draw", started)
+
+            # Görüntüyü göster
+            cv2.imshow('Exercise Detection', frame)
+
+            # Kullanıcıdan çıkış tuşu kontrolü
+            key = cv2.waitKey(1) & 0xFF
+            if metrics is not None:
+                metrics.lap("display", started)
+                metrics.end_frame()
+            if key == ord('q'):
+                break
+
+        except Exception as e:
+            print(f"Egzersiz tespiti sırasında hata oluştu: {e}")
+            traceback.print_exc()
+            break
+
+
+def run_pipelined(cap, pose, renderer, exercise_detection, selected_exercise, metrics=None):
+    """
+    Yakalama, çıkarım ve çizimi sınırlı kuyruklarla bağlı ayrı aşamalarda çalıştırır.
+    Çıkarım geride kaldığında eski kareler atılır.
+    """
+    hud = ExerciseHud(selected_exercise.capitalize())
+
+    def process(frame, timestamp_ms):
+        return analyze_frame(frame, pose, exercise_detection, selected_exercise, timestamp_ms, metrics)
+
+    def render(frame, analysis):
+        started = time.perf_counter()
+        draw_frame(frame, analysis, renderer, hud)
+        if metrics is not None:
+            if metrics.overlay:
+                metrics.draw_overlay(frame)
+            started = metrics.lap("draw", started)
+        cv2.imshow('Exercise Detection', frame)
+        # Kullanıcıdan çıkış tuşu kontrolü
+        key = cv2.waitKey(1) & 0xFF
+        if metrics is not None:
+            metrics.lap("display", started)
+        return key != ord('q')
+
+    try:
+        loop = PipelinedLoop(cap, process, render, metrics=metrics).run()
+        print(f"İşlenen kare: {loop.processed_frames}, atılan kare: {loop.dropped_capture}, "
+              f"ortalama gecikme: {loop.get_average_latency_ms():.1f} ms")
+    except Exception as e:
+        print(f"Egzersiz tespiti sırasında hata oluştu: {e}")
+        traceback.print_exc()
+
+
+def run_headless(cap, pose, exercise_detection, selected_exercise, writer, pipelined=False, video_time=False,
+                 metrics=None):
+    """
+    Pencere açmadan ve çizim yapmadan çalışır; kare süresi yalnızca yakalama, çıkarım
+    ve durum makinesine harcanır. Durum geçişleri ve tekrarlar JSON satırları olarak yazılır.
+
+    Args:
+        cap: cv2.VideoCapture nesnesi
+        pose: estimate() metoduna sahip PoseEstimator, RoiTracker veya AdaptiveInference
+        exercise_detection: Seçilen egzersize abone ExerciseDetection nesnesi
+        selected_exercise: Seçilen egzersizin adı
+        writer: JsonLinesWriter nesnesi
+        pipelined: True ise yakalama ve çıkarım ayrı iş parçacıklarında çalışır
+        video_time: True ise zaman damgası olarak video konumu kullanılır ve boru hattında
+            kare atılmaz (video dosyaları için)
+        metrics: Verilirse aşama süreleri kaydedilir (StageMetrics)
+    """
+    def process(frame, timestamp_ms):
+        analysis = analyze_frame(frame, pose, exercise_detection, selected_exercise, timestamp_ms, metrics)
+        # Poz bulunamayan karelerde durum makinesi ilerlemez, olay da yoktur
+        if analysis["landmarks"] is None:
+            return []
+        return exercise_detection.get_events()
+
+    writer.write({"type": "start", "exercise": selected_exercise})
+    frames = 0
     try:
-        # MediaPipe Pose modelini başlat
+        if pipelined:
+            def render(frame, events):
+                writer.write_all(events)
+                return True
+
+            # Video dosyalarında kare atılmaz ve video konumu kullanılır; tekrar sayıları
+            # makine hızına bağlı olmaz. Canlı kaynaklarda yalnızca kareler atılır, olaylar
+            # taşıyan sonuçlar atılmaz
+            loop = PipelinedLoop(cap, process, render, metrics=metrics, video_time=video_time, keep_results=True)
+            loop.run()
+            frames = loop.processed_frames
+        else:
+            while cap.isOpened():
+                started = time.perf_counter()
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if metrics is not None:
+                    metrics.lap("capture", started)
+                timestamp_ms = cap.get(cv2.CAP_PROP_POS_MSEC) if video_time else time.perf_counter() * 1000.0
+                writer.write_all(process(frame, timestamp_ms))
+                frames += 1
+                if metrics is not None:
+                    metrics.end_frame()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Egzersiz tespiti sırasında hata oluştu: {e}", file=sys.stderr)
+        traceback.print_exc()
+
+    exercise = exercise_detection.exercises[selected_exercise]
+    writer.write({"type": "end", "exercise": selected_exercise, "state": exercise.get_state(),
+                  "repetition_count": exercise.get_repetition_count(), "frames": frames})
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Egzersiz doğrulama sistemi")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Yakalama, çıkarım ve çizimi ayrı iş parçacıklarında çalıştır")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=(0, 1, 2),
+                        help="MediaPipe Pose model karmaşıklığı")
+    parser.add_argument("--no-smoothing", action="store_true", help="Kareler arası eklem yumuşatmasını kapat")
+    parser.add_argument("--min-detection-confidence", type=float, default=0.5, help="Minimum tespit güveni")
+    parser.add_argument("--min-tracking-confidence", type=float, default=0.5, help="Minimum takip güveni")
+    parser.add_argument("--warmup", action="store_true", help="Modeli başlangıçta boş bir kare ile ısıt")
+    parser.add_argument("--roi", action="store_true",
+                        help="Çıkarımı önceki karedeki kişinin etrafındaki bölgede çalıştır")
+    parser.add_argument("--roi-max-side", type=int, default=None,
+                        help="Modele verilen bölgenin uzun kenarını bu piksel boyutuna küçült")
+    parser.add_argument("--adaptive-skip", action="store_true",
+                        help="Çıkarımı her k. karede çalıştır (k çıkarım süresine göre uyarlanır), "
+                             "aradaki karelerde eklem noktalarını tahmin et")
+    parser.add_argument("--validate-every", type=int, default=0,
+                        help="Uyarlamalı atlamada her N tahmin edilen karede tahmin hatasını ölç")
+    parser.add_argument("--monitor-all", action="store_true",
+                        help="Seçilen egzersizin yanında tüm egzersizleri de her karede değerlendir")
+    parser.add_argument("--peak-counting", nargs="+", choices=list(EXERCISE_SPECS), default=[],
+                        help="Tekrarları eşikli durum makinesi yerine tepe/çukur algılayıcısıyla sayılacak egzersizler")
+    parser.add_argument("--landmark-filter", action="store_true",
+                        help="Açılardan önce eklemlere One-Euro filtresi uygula ve kararlılık beklemesini kısalt")
+    parser.add_argument("--record", default=None,
+                        help="Her karenin zaman damgasını ve eklemlerini bu dosyaya kaydet")
+    parser.add_argument("--metrics-overlay", action="store_true",
+                        help="Aşama sürelerinin p50/p95/p99 değerlerini ekranda göster")
+    parser.add_argument("--metrics-file", default=None,
+                        help="Aşama metriklerini Prometheus metin biçiminde bu dosyaya periyodik olarak yaz")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="Metrik dosyasının yazılma aralığı (s)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Pencere ve çizim olmadan çalış; olayları JSON satırları olarak yaz")
+    parser.add_argument("--exercise", choices=list(EXERCISE_SPECS),
+                        help="Headless modda takip edilecek egzersiz (menü yerine)")
+    parser.add_argument("--events", default="-",
+                        help="Headless modda olayların yazılacağı dosya (\"-\" ise standart çıktı)")
+    parser.add_argument("--source", default="0",
+                        help="Kamera indeksi veya video dosyası yolu")
+    args = parser.parse_args(argv)
+    if args.headless and args.exercise is None:
+        parser.error("--headless için --exercise gereklidir")
+    return args
+
+
+def is_video_file(source):
+    """
+    Kaynağın mevcut bir video dosyası olup olmadığını döndürür; kamera indeksleri
+    ve RTSP/HTTP adresleri canlı kaynaktır.
+    """
+    return isinstance(source, str) and os.path.isfile(source)
+
+
+def create_exercise_detection(monitor_all=False, peak_counting=(), landmark_filter=False):
+    """
+    Komut satırı seçenekleriyle ExerciseDetection oluşturur.
+
+    Args:
+        monitor_all: Tüm egzersizleri her karede değerlendir
+        peak_counting: Tekrarları tepe/çukur algılayıcısıyla sayılacak egzersizler
+        landmark_filter: True ise eklemlere One-Euro filtresi uygulanır ve
+            kararlılık beklemesi FILTERED_STABLE_MS'e kısaltılır
+    """
+    if landmark_filter:
+        return ExerciseDetection(monitor_all=monitor_all, peak_counting=peak_counting,
+                                 landmark_filter=OneEuroFilter(), required_stable_ms=FILTERED_STABLE_MS)
+    return ExerciseDetection(monitor_all=monitor_all, peak_counting=peak_counting)
+
+
+def main(pipelined=False, pose_config=None, warmup=False, monitor_all=False, adaptive_skip=False,
+         validate_every=0, roi=False, roi_max_side=None, headless=False, exercise=None, events_path="-",
+         source=0, record_path=None, metrics=None, peak_counting=(), landmark_filter=False):
+    if headless:
+        # Olaylar standart çıktıya yazılabildiğinden tanı mesajları stderr'e gider
+        with JsonLinesWriter(events_path) as writer, contextlib.redirect_stdout(sys.stderr):
+            main_headless(writer, pipelined, pose_config, warmup, monitor_all, adaptive_skip, validate_every,
+                          roi, roi_max_side, exercise, source, record_path, metrics, peak_counting,
+                          landmark_filter)
+        return
+
+    try:
+        # Paylaşılan MediaPipe Pose modelini al (model ilk kullanımda yüklenir)
         mp_pose = mp.solutions.pose
-        pose = mp_pose.Pose(static_image_mode=False, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        renderer = SkeletonRenderer(mp_pose.POSE_CONNECTIONS)
+        pose = get_pose_estimator(static_image_mode=False, **(pose_config or {}))
+        if warmup:
+            pose.warmup()
+        if roi:
+            pose = roi_tracker = RoiTracker(pose, max_side=roi_max_side)
+        if adaptive_skip:
+            # Doğrulama çıkarımları canlı modelle aynı ayarlardaki ayrı bir modelde
+            # yapılır; canlı modelin takip durumu etkilenmez
+            validation_estimator = PoseEstimator(**dict(pose_config or {}, static_image_mode=False)) \
+                if validate_every else None
+            pose = adaptive_inference = AdaptiveInference(pose, validate_every=validate_every,
+                                                          validation_estimator=validation_estimator)
+        recorder = None
+        if record_path:
+            recorder = LandmarkRecorder(record_path)
+            pose = RecordingEstimator(pose, recorder)
 
-        cap = cv2.VideoCapture(0)  # Kamerayı aç
+        cap = cv2.VideoCapture(source)  # Kamerayı (veya videoyu) aç
         
         # ExerciseDetection sınıfını başlat
         try:
-            exercise_detection = ExerciseDetection()
+            exercise_detection = create_exercise_detection(monitor_all, peak_counting, landmark_filter)
             print("ExerciseDetection başarıyla başlatıldı.")
         except Exception as e:
             print(f"ExerciseDetection başlatılırken hata oluştu: {e}")
@@ -23,6 +357,7 @@ def main():
         print("Kamera açıldı. Egzersiz Seçimi:")
         
         selected_exercise = None
+        menu_layer = HudLayer(MENU_LINES)
 
         # Kullanıcıdan egzersiz seçimi
         while selected_exercise is None:
@@ -31,38 +366,21 @@ def main():
                 print("Kamera açılmadı.")
                 break
 
-            # Seçim yapılmadıysa ekranda talimatları göster
-            cv2.putText(frame, "Select Exercise:", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 0, 0), 3)
-
-            # Egzersiz seçeneklerini dikey olarak göster
-            exercises = ["Squat", "Neck Flexion", "Shoulder", "Arm Raise", 
-                        "Thoracic Extension", "Lumbar Side Bending", 
-                        "Hip Abduction", "Knee Flexion", "Leg Raise", 
-                        "Abdominal Crunches"]
-            
-            for i, exercise in enumerate(exercises):
-                cv2.putText(frame, f"{i}: {exercise}", (10, 100 + i * 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 0, 0), 2)
+            # Seçim yapılmadıysa ekranda talimatları ve egzersiz seçeneklerini göster
+            menu_layer.draw(frame)
 
             # Kullanıcıdan egzersiz seçimi
             key = cv2.waitKey(1) & 0xFF
-            if key in [ord(str(i)) for i in range(10)]:  # 0-9 arası tuşlar
-                exercise_names = ["squat", "neck_flexion_extension", "shoulder_region", 
-                                "arm_raise_lateral_front", "thoracic_extension", 
-                                "lumbar_side_bending_flexion", "hip_abduction", 
-                                "knee_flexion_extension", "leg_raise_straight_leg_raise", 
-                                "abdominal_crunches"]
-                
-                selected_index = key - ord('0')
-                if selected_index < len(exercise_names):
-                    selected_exercise = exercise_names[selected_index]
-                    print(f"Selected exercise: {selected_exercise}")  # Seçilen egzersizi yazdır
-                    
-                    # Seçilen egzersizin ExerciseDetection içinde var olduğunu kontrol et
-                    if selected_exercise not in exercise_detection.exercises:
-                        print(f"Hata: {selected_exercise} egzersizi ExerciseDetection içinde bulunamadı.")
-                        print(f"Mevcut egzersizler: {list(exercise_detection.exercises.keys())}")
-                        selected_exercise = None  # Seçimi sıfırla
-                        continue
+            if key in MENU_KEYS:  # 0-9 arası tuşlar
+                selected_exercise = MENU_KEYS[key]
+                print(f"Selected exercise: {selected_exercise}")  # Seçilen egzersizi yazdır
+
+                # Seçilen egzersizin ExerciseDetection içinde var olduğunu kontrol et
+                if selected_exercise not in exercise_detection.exercises:
+                    print(f"Hata: {selected_exercise} egzersizi ExerciseDetection içinde bulunamadı.")
+                    print(f"Mevcut egzersizler: {list(exercise_detection.exercises.keys())}")
+                    selected_exercise = None  # Seçimi sıfırla
+                    continue
 
             # Görüntüyü göster
             cv2.imshow('Exercise Selection', frame)
@@ -74,68 +392,22 @@ def main():
         cv2.destroyWindow('Exercise Selection')
 
         # Egzersiz seçimi yapıldıktan sonra
-        while cap.isOpened() and selected_exercise is not None:
-            try:
-                ret, frame = cap.read()
-                if not ret:
-                    print("Kamera akışında hata.")
-                    break
-
-                # BGR'yi RGB'ye çeviriyoruz
-                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = pose.process(image)
-
-                # Eğer poz tespit edildiyse
-                if results.pose_landmarks:
-                    # Landmark nesnelerini doğrudan kullan, tuple'a dönüştürme
-                    landmarks = results.pose_landmarks.landmark
-                    
-                    # Eklemleri çiz
-                    for i, landmark in enumerate(landmarks):
-                        x, y = int(landmark.x * frame.shape[1]), int(landmark.y * frame.shape[0])
-                        cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)  # Eklemleri yeşil daire ile çiz
-
-                    # Eklemler arası bağlantıları çiz
-                    connections = mp_pose.POSE_CONNECTIONS
-                    for connection in connections:
-                        start_idx, end_idx = connection
-                        start_point = landmarks[start_idx]
-                        end_point = landmarks[end_idx]
-                        cv2.line(frame, (int(start_point.x * frame.shape[1]), int(start_point.y * frame.shape[0])),
-                                (int(end_point.x * frame.shape[1]), int(end_point.y * frame.shape[0])), (255, 0, 0), 2)
-
-                    # Egzersiz durumunu güncelle
-                    try:
-                        # Landmark nesnelerini doğrudan kullan
-                        exercise_detection.exercises[selected_exercise].update_state(landmarks)
-                        repetition_count = exercise_detection.exercises[selected_exercise].get_repetition_count()
-                        exercise_results = exercise_detection.detect_exercises(landmarks)
-                        
-                        # Sonuçları ekrana yazdır - DAHA BÜYÜK YAZI
-                        cv2.putText(frame, f"Repetitions: {repetition_count}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-                        cv2.putText(frame, f"{selected_exercise.capitalize()}: {exercise_results[selected_exercise]}", (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-                        
-                        # Egzersiz adını ekrana yazdır - DAHA BÜYÜK YAZI
-                        cv2.putText(frame, f"Selected Exercise: {selected_exercise.capitalize()}", (20, 180), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 0, 0), 3)
-                    except Exception as e:
-                        print(f"Egzersiz durumu güncellenirken hata oluştu: {e}")
-                        traceback.print_exc()
-                        cv2.putText(frame, f"Error: {str(e)}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
-
-                else:
-                    cv2.putText(frame, "No keypoints detected", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
-
-                # Görüntüyü göster
-                cv2.imshow('Exercise Detection', frame)
-
-                # Kullanıcıdan çıkış tuşu kontrolü
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
-                    
-            except Exception as e:
-                print(f"Egzersiz tespiti sırasında hata oluştu: {e}")
-                traceback.print_exc()
-                break
+        if selected_exercise is not None:
+            exercise_detection.subscribe(selected_exercise)
+            exercise_detection.metrics = metrics
+            if pipelined:
+                run_pipelined(cap, pose, renderer, exercise_detection, selected_exercise, metrics)
+            else:
+                run_serial(cap, pose, renderer, exercise_detection, selected_exercise, metrics)
+            if adaptive_skip:
+                print(f"Uyarlamalı çıkarım: {adaptive_inference.report()}")
+            if roi:
+                print(f"Bölge takibi: {roi_tracker.report()}")
+        if recorder is not None:
+            recorder.close()
+            print(f"{recorder.frames_written} kare kaydedildi: {record_path}")
+        if metrics is not None and metrics.dump_path:
+            metrics.dump()
 
         cap.release()
         cv2.destroyAllWindows()
@@ -144,5 +416,79 @@ def main():
         print(f"Program çalışırken beklenmeyen bir hata oluştu: {e}")
         traceback.print_exc()
 
+def main_headless(writer, pipelined, pose_config, warmup, monitor_all, adaptive_skip, validate_every, roi,
+                  roi_max_side, exercise, source, record_path=None, metrics=None, peak_counting=(),
+                  landmark_filter=False):
+    """
+    main() fonksiyonunun pencere açmayan karşılığı: egzersiz argümandan alınır,
+    olaylar writer'a yazılır.
+    """
+    try:
+        pose = get_pose_estimator(static_image_mode=False, **(pose_config or {}))
+        if warmup:
+            pose.warmup()
+        if roi:
+            pose = roi_tracker = RoiTracker(pose, max_side=roi_max_side)
+        if adaptive_skip:
+            # Doğrulama çıkarımları canlı modelle aynı ayarlardaki ayrı bir modelde
+            # yapılır; canlı modelin takip durumu etkilenmez
+            validation_estimator = PoseEstimator(**dict(pose_config or {}, static_image_mode=False)) \
+                if validate_every else None
+            pose = adaptive_inference = AdaptiveInference(pose, validate_every=validate_every,
+                                                          validation_estimator=validation_estimator)
+        recorder = None
+        if record_path:
+            recorder = LandmarkRecorder(record_path)
+            pose = RecordingEstimator(pose, recorder)
+
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            print(f"Kaynak açılamadı: {source}")
+            return
+
+        exercise_detection = create_exercise_detection(monitor_all, peak_counting, landmark_filter)
+        exercise_detection.subscribe(exercise)
+        exercise_detection.metrics = metrics
+        run_headless(cap, pose, exercise_detection, exercise, writer, pipelined=pipelined,
+                     video_time=is_video_file(source), metrics=metrics)
+        if adaptive_skip:
+            print(f"Uyarlamalı çıkarım: {adaptive_inference.report()}")
+        if roi:
+            print(f"Bölge takibi: {roi_tracker.report()}")
+        if recorder is not None:
+            recorder.close()
+            print(f"{recorder.frames_written} kare kaydedildi: {record_path}")
+        if metrics is not None and metrics.dump_path:
+            metrics.dump()
+
+        cap.release()
+
+    except Exception as e:
+        print(f"Program çalışırken beklenmeyen bir hata oluştu: {e}")
+        traceback.print_exc()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    main(pipelined=args.pipeline,
+         pose_config={
+             "model_complexity": args.model_complexity,
+             "smooth_landmarks": not args.no_smoothing,
+             "min_detection_confidence": args.min_detection_confidence,
+             "min_tracking_confidence": args.min_tracking_confidence,
+         },
+         warmup=args.warmup,
+         monitor_all=args.monitor_all,
+         adaptive_skip=args.adaptive_skip,
+         validate_every=args.validate_every,
+         roi=args.roi,
+         roi_max_side=args.roi_max_side,
+         headless=args.headless,
+         exercise=args.exercise,
+         events_path=args.events,
+         source=int(args.source) if args.source.isdigit() else args.source,
+         record_path=args.record,
+         peak_counting=args.peak_counting,
+         landmark_filter=args.landmark_filter,
+         metrics=StageMetrics(dump_path=args.metrics_file, dump_interval_s=args.metrics_interval,
+                              overlay=args.metrics_overlay)
+         if args.metrics_overlay or args.metrics_file else None)
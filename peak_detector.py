@@ -0,0 +1,186 @@
+import numpy as np
+
+from exercise_engine import SCALAR_MAX_ROWS
+from exercise_specs import DECREASING
+
+FSM_COUNTING = "fsm"  # Eşikli durum makinesi (ExerciseEngine) tekrarları sayar
+PEAK_COUNTING = "peak"  # Tepe/çukur algılayıcı (PeakDetector) tekrarları sayar
+COUNTING_METHODS = (FSM_COUNTING, PEAK_COUNTING)
+
+MIN_DURATION_MS = 200.0  # Dinlenme tepesinden hareket ucuna en kısa süre (ms)
+
+# Algılayıcı alanları ve başlangıç değerleri (satır başına sabit bellek)
+PEAK_FIELDS = (
+    ("has_extreme", bool, False),  # İlk geçerli örnek görüldü mü?
+    ("seeking_valley", bool, True),  # True ise hareket ucu (çukur), değilse dinlenme tepesi aranıyor
+    ("extreme_value", np.float64, 0.0),  # Aranan yöndeki en uç değer
+    ("extreme_time_ms", np.float64, 0.0),  # En uç değerin zamanı
+    ("peak_time_ms", np.float64, 0.0),  # Son onaylanan dinlenme tepesinin zamanı
+    ("valley_time_ms", np.float64, 0.0),  # Son sayılan tekrarın en alt noktasının zamanı
+    ("repetition_count", np.int64, 0),
+)
+
+
+def advance_peak_detector(detector, row, angle, time_ms):
+    """
+    PeakDetector.update'in tek satırlık skaler karşılığı (az satırlı güncellemeler
+    için hızlı yol). Aynı karşılaştırmaları aynı sırayla yapar; sonuçlar vektörel
+    adımla aynıdır.
+
+    Args:
+        detector: PeakDetector
+        row: Satır indeksi
+        angle: Egzersiz açısı (derece); NaN ise satır değişmez
+        time_ms: Karenin zaman damgası (ms)
+
+    Returns:
+        bool: Tekrar tamamlandı mı
+    """
+    value = detector.sign.item(row) * angle
+    if value != value:
+        return False
+    if not detector.has_extreme.item(row):
+        # İlk geçerli örnek hem aranan uç hem de referans dinlenme tepesidir
+        detector.has_extreme[row] = True
+        detector.extreme_value[row] = value
+        detector.extreme_time_ms[row] = time_ms
+        detector.peak_time_ms[row] = time_ms
+        return False
+
+    seeking_valley = detector.seeking_valley.item(row)
+    extreme_value = detector.extreme_value.item(row)
+    if value < extreme_value if seeking_valley else value > extreme_value:
+        extreme_value = value
+        detector.extreme_value[row] = value
+        detector.extreme_time_ms[row] = time_ms
+
+    prominence = detector.prominence.item(row)
+    if seeking_valley:
+        if value < extreme_value + prominence:
+            return False
+    elif value > extreme_value - prominence:
+        return False
+
+    # Uç onaylandı; arama yönü değişir
+    extreme_time_ms = detector.extreme_time_ms.item(row)
+    completed = False
+    if not seeking_valley:
+        detector.peak_time_ms[row] = extreme_time_ms
+    elif extreme_time_ms - detector.peak_time_ms.item(row) >= detector.min_duration_ms:
+        detector.valley_time_ms[row] = extreme_time_ms
+        detector.repetition_count[row] += 1
+        completed = True
+    detector.seeking_valley[row] = not seeking_valley
+    detector.extreme_value[row] = value
+    detector.extreme_time_ms[row] = time_ms
+    return completed
+
+
+class PeakDetector:
+    def __init__(self, specs, prominence=None, min_duration_ms=MIN_DURATION_MS):
+        """
+        Egzersiz açısı sinyalinde akan (streaming) tepe/çukur algılayıcısı.
+
+        Açılar tanımdaki yönle çarpılarak "dinlenme tarafı büyük değer" biçimine
+        getirilir; böylece her tekrar bir dinlenme tepesi ve bir hareket çukurudur.
+        Algılayıcı aranan yöndeki en uç değeri izler; sinyal bu uçtan prominence
+        kadar geri döndüğünde uç onaylanır ve arama yönü değişir (histerezis).
+        Onaylanan her çukur, önceki dinlenme tepesinden en az min_duration_ms
+        sonra geldiyse bir tekrar sayılır.
+
+        Eşik durum makinesinden farklı olarak kararlılık penceresi yoktur: tek bir
+        gürültülü kare ne tekrarı kaçırtır ne de prominence'dan küçük olduğu
+        sürece fazladan tekrar saydırır. Her örnek O(1) işlem ve satır başına
+        sabit bellek kullanır; tüm satırlar tek vektörel adımda güncellenir. En
+        fazla SCALAR_MAX_ROWS satırlık güncellemeler satır satır skaler yapılır.
+
+        Args:
+            specs: ExerciseSpec listesi (satır sırası, ExerciseEngine ile aynı)
+            prominence: Tepe ve çukur arasındaki en küçük açı farkı (derece). Sayı,
+                {egzersiz adı: değer} sözlüğü veya None. None (veya sözlükte olmayan
+                egzersizler) için default_prominence kullanılır.
+            min_duration_ms: Dinlenme tepesinden hareket ucuna en kısa süre (ms)
+        """
+        self.specs = list(specs)
+        self.rows = {spec.name: row for row, spec in enumerate(self.specs)}
+        self.sign = np.array([1.0 if spec.direction == DECREASING else -1.0 for spec in self.specs])
+
+        overrides = prominence if isinstance(prominence, dict) else {}
+        default = None if isinstance(prominence, dict) else prominence
+        self.prominence = np.array([
+            overrides.get(spec.name, default if default is not None else self.default_prominence(spec))
+            for spec in self.specs
+        ], dtype=np.float64)
+        self.min_duration_ms = min_duration_ms
+
+        for field, dtype, initial in PEAK_FIELDS:
+            setattr(self, field, np.full(len(self.specs), initial, dtype=dtype))
+
+    @staticmethod
+    def default_prominence(spec):
+        """
+        Tanımdan türetilen belirginlik: hareket aralığının yarısı ile başlama ve
+        hareket eşikleri arasındaki farktan büyüğü (derece).
+        """
+        return max((spec.max_angle - spec.min_angle) / 2.0, abs(spec.start_angle - spec.threshold_angle))
+
+    def update(self, angles, rows, timestamp_ms):
+        """
+        Verilen satırların algılayıcılarını egzersiz açılarıyla bir adım ilerletir.
+
+        Args:
+            angles: Egzersiz açıları (derece), rows ile aynı uzunlukta; NaN açılar atlanır
+            rows: Satır indeksleri (tekrarsız)
+            timestamp_ms: Karenin zaman damgası (ms)
+
+        Returns:
+            np.ndarray: rows ile hizalı, tekrarı tamamlanan satırların bool maskesi
+        """
+        if len(rows) <= SCALAR_MAX_ROWS:
+            timestamp_ms = float(timestamp_ms)
+            return np.array([advance_peak_detector(self, row, angle, timestamp_ms)
+                             for row, angle in zip(np.asarray(rows).tolist(),
+                                                   np.asarray(angles, dtype=np.float64).tolist())], dtype=bool)
+        values = self.sign[rows] * np.asarray(angles, dtype=np.float64)
+        valid = ~np.isnan(values)
+        has_extreme = self.has_extreme[rows]
+        seeking_valley = self.seeking_valley[rows]
+        extreme_value = self.extreme_value[rows]
+        extreme_time_ms = self.extreme_time_ms[rows]
+        peak_time_ms = self.peak_time_ms[rows]
+
+        # İlk geçerli örnek hem aranan uç hem de referans dinlenme tepesidir
+        first = valid & ~has_extreme
+        extreme_value = np.where(first, values, extreme_value)
+        extreme_time_ms = np.where(first, timestamp_ms, extreme_time_ms)
+        peak_time_ms = np.where(first, timestamp_ms, peak_time_ms)
+
+        # Aranan yöndeki en uç değeri izle
+        running = valid & has_extreme
+        better = running & np.where(seeking_valley, values < extreme_value, values > extreme_value)
+        extreme_value = np.where(better, values, extreme_value)
+        extreme_time_ms = np.where(better, timestamp_ms, extreme_time_ms)
+
+        # Sinyal uçtan prominence kadar geri döndüyse uç onaylanır
+        prominence = self.prominence[rows]
+        reversal = running & np.where(seeking_valley, values >= extreme_value + prominence,
+                                      values <= extreme_value - prominence)
+        valley = reversal & seeking_valley
+        completed = valley & (extreme_time_ms - peak_time_ms >= self.min_duration_ms)
+
+        self.peak_time_ms[rows] = np.where(reversal & ~seeking_valley, extreme_time_ms, peak_time_ms)
+        self.valley_time_ms[rows] = np.where(completed, extreme_time_ms, self.valley_time_ms[rows])
+        self.repetition_count[rows] += completed
+        self.seeking_valley[rows] = seeking_valley ^ reversal
+        self.extreme_value[rows] = np.where(reversal, values, extreme_value)
+        self.extreme_time_ms[rows] = np.where(reversal, timestamp_ms, extreme_time_ms)
+        self.has_extreme[rows] = has_extreme | valid
+        return completed
+
+    def reset(self, row=None):
+        """
+        Bir satırın (veya tüm satırların) durumunu sıfırlar.
+        """
+        rows = slice(None) if row is None else row
+        for field, dtype, initial in PEAK_FIELDS:
+            getattr(self, field)[rows] = initial
@@ -0,0 +1,204 @@
+import queue
+import threading
+import time
+
+import cv2
+
+QUEUE_POLL_SECONDS = 0.1
+
+
+def put_latest(q, item):
+    """
+    Öğeyi sınırlı kuyruğa koyar; kuyruk doluysa en eski öğeyi atar.
+
+    Args:
+        q: queue.Queue (maxsize > 0)
+        item: Kuyruğa konulacak öğe
+
+    Returns:
+        int: Yer açmak için atılan eski öğe sayısı
+    """
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+
+def put_blocking(q, item, stop_event):
+    """
+    Öğeyi kuyrukta yer açılana kadar bekleyerek koyar; stop_event ayarlanırsa vazgeçer.
+
+    Returns:
+        int: Atılan öğe sayısı (her zaman 0, put_latest ile aynı arayüz için)
+    """
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=QUEUE_POLL_SECONDS)
+            break
+        except queue.Full:
+            continue
+    return 0
+
+
+class PipelinedLoop:
+    def __init__(self, cap, process_fn, render_fn, queue_size=1, metrics=None, video_time=False,
+                 keep_results=False):
+        """
+        Yakalama, çıkarım ve çizim aşamalarını ayrı iş parçacıklarında çalıştırır.
+
+        Aşamalar sınırlı kuyruklarla birbirine bağlanır. Canlı kaynaklarda çıkarım
+        geride kaldığında eski kareler atılır, böylece uçtan uca gecikme sınırlı kalır
+        ve FPS en yavaş aşama tarafından belirlenir. video_time ile (video dosyaları)
+        hiçbir kare atılmaz, yakalama çıkarımı bekler ve zaman damgası video
+        konumudur; sonuçlar makine hızından bağımsız olarak her çalıştırmada aynıdır.
+
+        Args:
+            cap: cv2.VideoCapture benzeri nesne (read() metodu olmalı)
+            process_fn: Çıkarım aşaması, process_fn(frame, timestamp_ms) -> sonuç;
+                timestamp_ms karenin yakalandığı an (time.perf_counter, ms) veya
+                video_time ile video konumu (CAP_PROP_POS_MSEC)
+            render_fn: Çizim aşaması, render_fn(frame, sonuç) -> devam edilsin mi (bool).
+                Ana iş parçacığında çağrılır (cv2.imshow ana iş parçacığı ister).
+            queue_size: Aşamalar arası kuyruk kapasitesi
+            metrics: Verilirse yakalama süreleri, uçtan uca gecikme ve kare hızı
+                kaydedilir (StageMetrics)
+            video_time: True ise kare atılmaz ve video konumu zaman damgası olarak kullanılır
+            keep_results: True ise canlı kaynaklarda da çıkarım sonuçları atılmaz; çizim
+                kuyruğu yer açılmasını bekler ve akış bittiğinde kuyruktaki sonuçlar da
+                çizilir. Yalnızca yakalama kuyruğundaki kareler atılır (olay akışları için).
+        """
+        self.cap = cap
+        self.process_fn = process_fn
+        self.render_fn = render_fn
+        self.capture_queue = queue.Queue(maxsize=queue_size)
+        self.render_queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.error = None
+        self.metrics = metrics
+        self.video_time = video_time
+        self.keep_results = keep_results
+
+        # İstatistikler
+        self.captured_frames = 0
+        self.processed_frames = 0
+        self.rendered_frames = 0
+        self.dropped_capture = 0  # Çıkarım yetişemediği için atılan kareler
+        self.dropped_render = 0  # Çizim yetişemediği için atılan sonuçlar
+        self.total_latency = 0.0  # Yakalamadan çizime kadar geçen toplam süre (s)
+
+    def _put(self, q, item, lossless=False):
+        if self.video_time or lossless:
+            return put_blocking(q, item, self.stop_event)
+        return put_latest(q, item)
+
+    def _capture_loop(self):
+        """
+        Kameradan sürekli kare okur ve kareyi çıkarım kuyruğuna koyar (canlı
+        kaynaklarda en güncel kare kalır).
+        """
+        end_queued = False
+        try:
+            while not self.stop_event.is_set():
+                started = time.perf_counter()
+                ret, frame = self.cap.read()
+                if not ret:
+                    print("Kamera akışında hata.")
+                    break
+                if self.metrics is not None:
+                    self.metrics.lap("capture", started)
+                self.captured_frames += 1
+                captured_at = time.perf_counter()
+                timestamp_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC) if self.video_time else captured_at * 1000.0
+                self.dropped_capture += self._put(self.capture_queue, (captured_at, timestamp_ms, frame))
+            if (self.video_time or self.keep_results) and not self.stop_event.is_set():
+                # Kuyruktaki kareler de işlensin; akışın sonu None ile bildirilir
+                put_blocking(self.capture_queue, None, self.stop_event)
+                end_queued = True
+        except Exception as e:
+            self.error = e
+        finally:
+            if not end_queued:
+                self.stop_event.set()
+
+    def _inference_loop(self):
+        """
+        Çıkarım kuyruğundaki kareleri işler ve sonuçları çizim kuyruğuna koyar.
+        """
+        end_queued = False
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    item = self.capture_queue.get(timeout=QUEUE_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    put_blocking(self.render_queue, None, self.stop_event)
+                    end_queued = True
+                    break
+                captured_at, timestamp_ms, frame = item
+                result = self.process_fn(frame, timestamp_ms)
+                self.processed_frames += 1
+                self.dropped_render += self._put(self.render_queue, (captured_at, frame, result), self.keep_results)
+        except Exception as e:
+            self.error = e
+        finally:
+            if not end_queued:
+                self.stop_event.set()
+
+    def run(self):
+        """
+        Boru hattını başlatır ve çizim aşamasını çağıran iş parçacığında çalıştırır.
+
+        Returns:
+            PipelinedLoop: İstatistikleri okumak için kendisi
+        """
+        workers = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    item = self.render_queue.get(timeout=QUEUE_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    break
+                captured_at, frame, result = item
+                keep_running = self.render_fn(frame, result)
+                self.rendered_frames += 1
+                self.total_latency += time.perf_counter() - captured_at
+                if self.metrics is not None:
+                    self.metrics.lap("latency", captured_at)
+                    self.metrics.end_frame()
+                if not keep_running:
+                    break
+        finally:
+            self.stop_event.set()
+            for worker in workers:
+                worker.join(timeout=1.0)
+
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def get_average_latency_ms(self):
+        """
+        Ortalama uçtan uca gecikmeyi döndürür.
+
+        Returns:
+            float: Milisaniye cinsinden ortalama gecikme
+        """
+        if self.rendered_frames == 0:
+            return 0.0
+        return 1000.0 * self.total_latency / self.rendered_frames
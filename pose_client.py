@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import cv2
+
+from exercise_specs import EXERCISE_SPECS
+from landmark_recording import LandmarkRecording
+from pose_protocol import (
+    ACK, BYE, DELTA, ERROR, FLOAT32, FRAME, HELLO, JPEG, LANDMARK_SOURCE, LANDMARKS, RAW, SUMMARY, VIDEO_SOURCE, WELCOME,
+    encode_landmarks, read_message, write_message
+)
+from synthetic_landmarks import synthetic_sessions
+
+
+def load_frames(source, max_frames=None, width=None, encoding=JPEG, jpeg_quality=80):
+    """
+    Videodaki kareleri gönderilmeye hazır hale getirir (bir kez kodlanır, tüm
+    istemciler aynı baytları kullanır).
+
+    Args:
+        source: Video dosyası yolu
+        max_frames: En fazla okunacak kare sayısı
+        width: Verilirse kareler bu genişliğe ölçeklenir
+        encoding: JPEG veya RAW
+        jpeg_quality: JPEG kalitesi
+
+    Returns:
+        tuple: (kare listesi [(zaman damgası ms, başlık, yük)], FPS)
+    """
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"{source} açılamadı.")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    try:
+        while max_frames is None or len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if width and frame.shape[1] != width:
+                frame = cv2.resize(frame, (width, round(frame.shape[0] * width / frame.shape[1])))
+            timestamp_ms = len(frames) * 1000.0 / fps
+            header = {"type": FRAME, "timestamp_ms": timestamp_ms, "encoding": encoding}
+            if encoding == JPEG:
+                ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+                payload = data.tobytes()
+            else:
+                header["shape"] = list(frame.shape)
+                payload = frame.tobytes()
+            frames.append((timestamp_ms, header, payload))
+    finally:
+        cap.release()
+    return frames, fps
+
+
+def load_landmarks(source=None, clients=1, exercise_names=None, max_frames=None, seed=0):
+    """
+    Eklem kaynağıyla gönderilecek kareleri hazırlar.
+
+    Args:
+        source: .lmk kaydı (tüm istemciler aynı kareleri gönderir); None ise her
+            istemci için farklı tempo ve gürültüde sentetik bir egzersiz üretilir
+        clients: İstemci sayısı
+        exercise_names: Sentetik oturumlara sırayla dağıtılacak egzersizler
+        max_frames: İstemci başına en fazla kare sayısı
+        seed: Sentetik veri tohumu
+
+    Returns:
+        list: İstemci başına (zaman damgaları ms, (n, 33, 4) eklemler)
+    """
+    if source is not None:
+        recording = LandmarkRecording(source)
+        stream = (recording.timestamps_ms[:max_frames], recording.landmarks[:max_frames])
+        return [stream] * clients
+    return [session.generate(0, max_frames)
+            for session in synthetic_sessions(clients, exercise_names, seed=seed)]
+
+
+def video_messages(frames, loops=1):
+    """
+    load_frames çıktısından FRAME mesajları üretir.
+
+    Yields:
+        tuple: (başlık, yük, kare sayısı)
+    """
+    duration_ms = frames[-1][0] + (frames[1][0] - frames[0][0] if len(frames) > 1 else 33.3) if frames else 0.0
+    for loop in range(loops):
+        for timestamp_ms, header, payload in frames:
+            # Tekrarlanan döngülerde zaman damgaları artmaya devam etsin
+            yield dict(header, timestamp_ms=timestamp_ms + loop * duration_ms), payload, 1
+
+
+def landmark_messages(timestamps_ms, landmarks, loops=1, batch=30, encoding=FLOAT32):
+    """
+    Eklem karelerinden en fazla batch karelik LANDMARKS mesajları üretir.
+
+    Yields:
+        tuple: (başlık, yük, kare sayısı)
+    """
+    step_ms = timestamps_ms[1] - timestamps_ms[0] if len(timestamps_ms) > 1 else 33.3
+    duration_ms = timestamps_ms[-1] - timestamps_ms[0] + step_ms if len(timestamps_ms) else 0.0
+    for loop in range(loops):
+        for start in range(0, len(timestamps_ms), batch):
+            count = len(timestamps_ms[start:start + batch])
+            payload = encode_landmarks(timestamps_ms[start:start + batch] + loop * duration_ms,
+                                       landmarks[start:start + batch], encoding)
+            yield {"type": LANDMARKS, "count": count, "encoding": encoding}, payload, count
+
+
+async def open_connection(host, port, unix_path=None):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def run_client(messages, exercise_names, host="127.0.0.1", port=8765, unix_path=None, realtime_fps=None,
+                     source=VIDEO_SOURCE, peak_counting=(), landmark_filter=False, on_event=None, deadline_ms=None):
+    """
+    Bir oturum açar, kareleri gönderir ve sunucudan gelen olayları toplar.
+
+    Args:
+        messages: video_messages veya landmark_messages çıktısı
+        exercise_names: Takip edilecek egzersizler
+        host, port, unix_path: Sunucu adresi
+        realtime_fps: Verilirse kareler bu hızda gönderilir (kamera benzetimi);
+            None ise sunucunun geri basıncının izin verdiği en yüksek hızda
+        source: VIDEO_SOURCE veya LANDMARK_SOURCE (messages ile uyumlu)
+        peak_counting: Tekrarları tepe/çukur algılayıcısıyla sayılacak egzersizler
+        landmark_filter: Sunucuda One-Euro filtresi uygulansın mı
+        on_event: Her "state" / "rep" olayı için çağrılacak fonksiyon
+        deadline_ms: Verilirse sunucu kareleri bu son tarihle zamanlar (geç kalacakları atar)
+
+    Returns:
+        dict: Oturum özeti, olay sayıları ve gecikme istatistikleri
+    """
+    reader, writer = await open_connection(host, port, unix_path)
+    hello = {"type": HELLO, "exercises": list(exercise_names), "source": source,
+             "peak_counting": list(peak_counting), "landmark_filter": landmark_filter, "acks": True}
+    if deadline_ms is not None:
+        hello["deadline_ms"] = deadline_ms
+    await write_message(writer, hello)
+    welcome, _ = await read_message(reader)
+    if welcome is None or welcome["type"] != WELCOME:
+        writer.close()
+        raise ConnectionError(f"Sunucu oturumu açmadı: {welcome}")
+
+    result = {"session": welcome["session"], "events": 0, "reps": 0, "errors": 0, "dropped": 0,
+              "latencies_ms": [], "e2e_latencies_ms": []}
+    sent_at = []  # Video karelerinin gönderilme anları (kare numarasına göre)
+
+    async def receive():
+        while True:
+            header, _ = await read_message(reader)
+            if header is None:
+                return
+            if header["type"] == ACK:
+                if "dropped" in header:
+                    result["dropped"] += 1
+                    continue
+                result["latencies_ms"].append(header["latency_ms"])
+                if "frame" in header:
+                    # Gönderimden sonuca: sunucuya varmadan soket tamponlarında beklenen süre dahil
+                    result["e2e_latencies_ms"].append((time.perf_counter() - sent_at[header["frame"]]) * 1000.0)
+            elif header["type"] == SUMMARY:
+                result["summary"] = header
+                return
+            elif header["type"] == ERROR:
+                result["errors"] += 1
+                print(f"Sunucu hatası: {header.get('message')}", file=sys.stderr)
+            else:
+                result["events"] += 1
+                result["reps"] += header["type"] == "rep"
+                if on_event is not None:
+                    on_event(welcome["session"], header)
+
+    receiver = asyncio.create_task(receive())
+    start = time.perf_counter()
+    sent = 0
+    for header, payload, count in messages:
+        if realtime_fps:
+            delay = start + sent / realtime_fps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if source == VIDEO_SOURCE:
+            sent_at.append(time.perf_counter())
+        await write_message(writer, header, payload)
+        sent += count
+    await write_message(writer, {"type": BYE})
+    await receiver
+    writer.close()
+
+    result["elapsed_seconds"] = time.perf_counter() - start
+    result["frames_sent"] = sent
+    return result
+
+
+async def run_clients(args, frames=None, streams=None):
+    """
+    args.clients oturumu eşzamanlı çalıştırır.
+
+    Args:
+        args: parse_args çıktısı
+        frames: Video kaynağı için load_frames çıktısı
+        streams: Eklem kaynağı için load_landmarks çıktısı
+    """
+    def print_event(session, event):
+        print(json.dumps(dict(event, session=session), ensure_ascii=False))
+
+    on_event = print_event if args.print_events else None
+    start = time.perf_counter()
+    if streams is not None:
+        encoding = DELTA if args.compress else FLOAT32
+        sources = [(landmark_messages(timestamps_ms, landmarks, args.loops, args.batch, encoding), LANDMARK_SOURCE)
+                   for timestamps_ms, landmarks in streams]
+    else:
+        sources = [(video_messages(frames, args.loops), VIDEO_SOURCE) for _ in range(args.clients)]
+    results = await asyncio.gather(*(
+        run_client(messages, args.exercises, args.host, args.port, args.unix, args.realtime, source,
+                   args.peak_counting, args.landmark_filter, on_event, args.deadline_ms)
+        for messages, source in sources
+    ))
+    elapsed = time.perf_counter() - start
+
+    frames_sent = sum(result["frames_sent"] for result in results)
+    latencies = sorted(latency for result in results for latency in result["latencies_ms"])
+    e2e_latencies = sorted(latency for result in results for latency in result["e2e_latencies_ms"])
+    report = {
+        "clients": args.clients,
+        "frames": frames_sent,
+        "elapsed_seconds": round(elapsed, 3),
+        "frames_per_second": round(frames_sent / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms_p50": latencies[len(latencies) // 2] if latencies else None,
+        "latency_ms_p95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        "e2e_latency_ms_p50": round(e2e_latencies[len(e2e_latencies) // 2], 2) if e2e_latencies else None,
+        "e2e_latency_ms_p95": round(e2e_latencies[int(len(e2e_latencies) * 0.95)], 2) if e2e_latencies else None,
+        "frames_dropped": sum(result["dropped"] for result in results),
+        "sessions": [{"session": result["session"], "reps": result["reps"], "errors": result["errors"],
+                      "dropped": result["dropped"], "summary": result.get("summary")} for result in results],
+    }
+    return report
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Poz sunucusu için test istemcisi (bir veya çok oturum)")
+    parser.add_argument("source", nargs="?", default=None,
+                        help="Gönderilecek video dosyası (--landmarks ile .lmk kaydı; verilmezse sentetik veri)")
+    parser.add_argument("--exercises", nargs="+", choices=list(EXERCISE_SPECS), default=["squat"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="TCP yerine bu Unix soketine bağlan")
+    parser.add_argument("--clients", type=int, default=1, help="Eşzamanlı oturum sayısı")
+    parser.add_argument("--loops", type=int, default=1, help="Video veya eklem verisi kaç kez gönderilecek")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--width", type=int, default=640, help="Karelerin gönderim genişliği")
+    parser.add_argument("--raw", action="store_true", help="JPEG yerine ham BGR kareler gönder")
+    parser.add_argument("--landmarks", action="store_true",
+                        help="Kareler yerine cihazda hesaplanmış eklemleri gönder (sunucu poz tahmini yapmaz)")
+    parser.add_argument("--batch", type=int, default=30, help="LANDMARKS mesajı başına kare sayısı")
+    parser.add_argument("--compress", action="store_true",
+                        help="Eklemleri nicemlenmiş fark kodlamasıyla gönder (landmark_codec)")
+    parser.add_argument("--seed", type=int, default=0, help="Sentetik eklem verisi tohumu")
+    parser.add_argument("--realtime", type=float, default=None, metavar="FPS",
+                        help="Kareleri bu hızda gönder (varsayılan: olabildiğince hızlı)")
+    parser.add_argument("--deadline-ms", type=float, default=None,
+                        help="Kare son tarihi (ms): sunucu en güncel kareyi işler, geç kalacakları atar")
+    parser.add_argument("--peak-counting", nargs="+", choices=list(EXERCISE_SPECS), default=[])
+    parser.add_argument("--landmark-filter", action="store_true")
+    parser.add_argument("--print-events", action="store_true", help="Olayları JSON satırları olarak yazdır")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.landmarks:
+        streams = load_landmarks(args.source, args.clients, args.exercises, args.max_frames, args.seed)
+        report = asyncio.run(run_clients(args, streams=streams))
+    else:
+        if args.source is None:
+            print("Video dosyası verilmedi.", file=sys.stderr)
+            return 1
+        frames, _ = load_frames(args.source, args.max_frames, args.width, RAW if args.raw else JPEG)
+        if not frames:
+            print(f"{args.source} içinde kare yok.", file=sys.stderr)
+            return 1
+        report = asyncio.run(run_clients(args, frames))
+    print(json.dumps(report, ensure_ascii=False, indent=2), file=sys.stderr)
+    return 1 if any(session["errors"] for session in report["sessions"]) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
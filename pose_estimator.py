@@ -0,0 +1,137 @@
+import threading
+
+import numpy as np
+
+from angle_engine import landmarks_to_array
+
+
+class PoseEstimator:
+    def __init__(self, static_image_mode=False, model_complexity=1, smooth_landmarks=True,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        """
+        MediaPipe Pose modelini ilk kullanımda oluşturan sarmalayıcı.
+
+        Model içe aktarma sırasında değil, ilk process() veya warmup() çağrısında
+        yüklenir; böylece modülü içe aktarmak ucuz kalır.
+
+        Args:
+            static_image_mode: Her kareyi bağımsız görüntü olarak işle
+            model_complexity: Model karmaşıklığı (0, 1 veya 2)
+            smooth_landmarks: Kareler arası eklem yumuşatması
+            min_detection_confidence: Minimum tespit güveni
+            min_tracking_confidence: Minimum takip güveni
+        """
+        self.config = {
+            "static_image_mode": static_image_mode,
+            "model_complexity": model_complexity,
+            "smooth_landmarks": smooth_landmarks,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+        }
+        self._pose = None
+        self._lock = threading.Lock()
+
+    @property
+    def pose(self):
+        """
+        Alttaki MediaPipe Pose nesnesi; gerekirse oluşturulur.
+        """
+        if self._pose is None:
+            with self._lock:
+                if self._pose is None:
+                    import mediapipe as mp
+                    self._pose = mp.solutions.pose.Pose(**self.config)
+        return self._pose
+
+    def is_loaded(self):
+        """
+        Modelin yüklenip yüklenmediğini döndürür.
+
+        Returns:
+            bool: Model yüklendiyse True
+        """
+        return self._pose is not None
+
+    def process(self, image_rgb):
+        """
+        RGB görüntüde poz tespiti yapar.
+
+        Args:
+            image_rgb: RGB formatındaki görüntü
+
+        Returns:
+            MediaPipe sonuç nesnesi (pose_landmarks alanı ile)
+        """
+        return self.pose.process(image_rgb)
+
+    def estimate(self, image_rgb, timestamp_ms=None):
+        """
+        RGB görüntüde poz tespiti yapar ve eklem noktalarını dizi olarak döndürür.
+
+        Args:
+            image_rgb: RGB formatındaki görüntü
+            timestamp_ms: Karenin zaman damgası (ms); bu sınıfta kullanılmaz, tahmin
+                yapan sarmalayıcılarla aynı arayüz için vardır
+
+        Returns:
+            np.ndarray veya None: (33, 4) eklem dizisi, poz bulunamazsa None
+        """
+        results = self.process(image_rgb)
+        if not results.pose_landmarks:
+            return None
+        return landmarks_to_array(results.pose_landmarks.landmark)
+
+    def warmup(self, height=256, width=256):
+        """
+        Modeli boş bir kare ile çalıştırarak ilk karedeki gecikmeyi önceden öder.
+        """
+        self.process(np.zeros((height, width, 3), dtype=np.uint8))
+        self.reset()
+
+    def reset(self):
+        """
+        Kareler arası takip durumunu sıfırlar (yeni bir video başlarken).
+        """
+        if self._pose is not None and hasattr(self._pose, "reset"):
+            self._pose.reset()
+
+    def close(self):
+        """
+        Modeli serbest bırakır. Sonraki process() çağrısı modeli yeniden yükler.
+        """
+        with self._lock:
+            if self._pose is not None:
+                self._pose.close()
+                self._pose = None
+
+
+_shared_estimator = None
+_shared_lock = threading.Lock()
+
+
+def get_pose_estimator(**config):
+    """
+    Süreç genelinde paylaşılan PoseEstimator nesnesini döndürür.
+
+    İlk çağrı nesneyi verilen ayarlarla oluşturur. Sonraki bir çağrı farklı ayarlar
+    verirse mevcut model kapatılır ve yeni ayarlarla yeniden (tembel olarak) yüklenir.
+
+    Args:
+        **config: PoseEstimator ayarları (model_complexity, smooth_landmarks, ...)
+
+    Returns:
+        PoseEstimator: Paylaşılan nesne
+    """
+    global _shared_estimator
+    with _shared_lock:
+        if _shared_estimator is None:
+            _shared_estimator = PoseEstimator(**config)
+        elif config:
+            unknown = set(config) - set(_shared_estimator.config)
+            if unknown:
+                raise TypeError(f"Bilinmeyen PoseEstimator ayarları: {sorted(unknown)}")
+            new_config = dict(_shared_estimator.config, **config)
+            if new_config != _shared_estimator.config:
+                _shared_estimator.close()
+                _shared_estimator.config = new_config
+        return _shared_estimator
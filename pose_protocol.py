@@ -0,0 +1,156 @@
+import asyncio
+import json
+import struct
+
+import numpy as np
+
+from angle_engine import NUM_LANDMARKS, LANDMARK_FIELDS
+from landmark_codec import decode_landmark_stream, encode_landmark_stream
+
+# Mesaj çerçevesi: 8 baytlık önek (başlık uzunluğu, yük uzunluğu; büyük uçlu),
+# ardından UTF-8 JSON başlık ve isteğe bağlı ikili yük (örneğin JPEG kare).
+PREFIX_FORMAT = ">II"
+PREFIX_SIZE = struct.calcsize(PREFIX_FORMAT)
+MAX_HEADER_SIZE = 64 * 1024
+MAX_PAYLOAD_SIZE = 32 * 1024 * 1024
+
+# İstemci -> sunucu
+# Oturum açar: {"exercises": [...], "source": "video" | "landmarks", "peak_counting": [...],
+# "landmark_filter": bool, "acks": bool}
+HELLO = "hello"
+FRAME = "frame"  # Kare: {"timestamp_ms", "encoding": "jpeg" | "raw", "shape": [h, w, 3]} + yük
+LANDMARKS = "landmarks"  # Cihazda hesaplanmış eklem kareleri: {"count", "encoding"} + encode_landmarks yükü
+BYE = "bye"  # Oturumu kapatır; sunucu "summary" ile yanıt verir
+
+# Sunucu -> istemci
+WELCOME = "welcome"  # {"session", "exercises"}
+# İsteğe bağlı sonuç: kare için {"frame", "detected", "latency_ms"},
+# eklem yığını için {"frames", "detected", "latency_ms"}
+ACK = "ack"
+SUMMARY = "summary"  # {"frames", "detected_frames", "exercises": {ad: tekrar sayısı}}
+ERROR = "error"  # {"message"}; işçide hata veren kare için ayrıca {"frame"} (o kare için "ack" gelmez)
+# Egzersiz olayları ExerciseDetection.get_events() ile aynı biçimdedir ("state" ve "rep")
+
+JPEG = "jpeg"
+RAW = "raw"  # BGR uint8, shape başlıkta verilir
+
+# Oturum kaynakları: sunucu poz tahmini yapar veya yalnızca eklemleri alır
+VIDEO_SOURCE = "video"
+LANDMARK_SOURCE = "landmarks"
+
+# Eklem yükü kodlamaları. FLOAT32: count adet <f8 zaman damgası (ms), ardından count adet
+# (33, 4) <f4 eklem bloğu (.lmk kayıtlarıyla aynı sayı biçimi; poz bulunamayan kareler NaN).
+# DELTA: landmark_codec akışı (int16 nicemleme + kareler arası fark, ~8 kat daha küçük).
+FLOAT32 = "float32"
+DELTA = "delta"
+TIMESTAMP_DTYPE = np.dtype("<f8")
+LANDMARK_DTYPE = np.dtype("<f4")
+LANDMARK_FRAME_SIZE = NUM_LANDMARKS * LANDMARK_FIELDS * LANDMARK_DTYPE.itemsize
+
+
+class ProtocolError(Exception):
+    """
+    Geçersiz veya sınırları aşan mesaj.
+    """
+
+
+def encode_landmarks(timestamps_ms, landmarks, encoding=FLOAT32):
+    """
+    Eklem karelerini LANDMARKS mesajı yüküne çevirir.
+
+    Args:
+        timestamps_ms: (n,) zaman damgaları (ms)
+        landmarks: (n, 33, 4) eklem dizileri
+        encoding: FLOAT32 veya DELTA
+
+    Returns:
+        bytes: Yük
+    """
+    if encoding == DELTA:
+        return encode_landmark_stream(timestamps_ms, landmarks)
+    return (np.ascontiguousarray(timestamps_ms, dtype=TIMESTAMP_DTYPE).tobytes()
+            + np.ascontiguousarray(landmarks, dtype=LANDMARK_DTYPE).tobytes())
+
+
+def decode_landmarks(count, payload, encoding=FLOAT32):
+    """
+    LANDMARKS mesajı yükünü dizilere çevirir (FLOAT32 yükü kopyalanmaz).
+
+    Returns:
+        tuple: ((n,) zaman damgaları ms, (n, 33, 4) float32 eklemler)
+
+    Raises:
+        ProtocolError: Yük bozuksa veya kare sayısıyla uyuşmuyorsa
+    """
+    if encoding == DELTA:
+        try:
+            timestamps_ms, landmarks = decode_landmark_stream(payload)
+        except ValueError as e:
+            raise ProtocolError(str(e)) from None
+        if len(timestamps_ms) != count:
+            raise ProtocolError(f"Eklem yükü {count} kare ile uyuşmuyor ({len(timestamps_ms)} kare).")
+        return timestamps_ms, landmarks
+    if encoding != FLOAT32:
+        raise ProtocolError(f"Bilinmeyen eklem kodlaması: {encoding}")
+    timestamps_size = count * TIMESTAMP_DTYPE.itemsize
+    if count < 0 or len(payload) != timestamps_size + count * LANDMARK_FRAME_SIZE:
+        raise ProtocolError(f"Eklem yükü {count} kare ile uyuşmuyor ({len(payload)} bayt).")
+    timestamps_ms = np.frombuffer(payload, dtype=TIMESTAMP_DTYPE, count=count)
+    landmarks = np.frombuffer(payload, dtype=LANDMARK_DTYPE, offset=timestamps_size).reshape(
+        count, NUM_LANDMARKS, LANDMARK_FIELDS)
+    return timestamps_ms, landmarks
+
+
+def encode_message(header, payload=b""):
+    """
+    Mesajı çerçeveler.
+
+    Args:
+        header: JSON'a dönüştürülebilir sözlük ("type" alanı ile)
+        payload: İkili yük
+
+    Returns:
+        bytes: Önek + başlık + yük
+    """
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return struct.pack(PREFIX_FORMAT, len(header_bytes), len(payload)) + header_bytes + payload
+
+
+async def read_message(reader):
+    """
+    Akıştan bir mesaj okur.
+
+    Args:
+        reader: asyncio.StreamReader
+
+    Returns:
+        tuple: (başlık sözlüğü, yük baytları) veya bağlantı kapandıysa (None, b"")
+
+    Raises:
+        ProtocolError: Mesaj sınırları aşıyorsa veya başlık geçersizse
+    """
+    try:
+        prefix = await reader.readexactly(PREFIX_SIZE)
+    except asyncio.IncompleteReadError:
+        return None, b""
+    header_size, payload_size = struct.unpack(PREFIX_FORMAT, prefix)
+    if header_size > MAX_HEADER_SIZE or payload_size > MAX_PAYLOAD_SIZE:
+        raise ProtocolError(f"Mesaj çok büyük: başlık {header_size} bayt, yük {payload_size} bayt")
+    try:
+        header = json.loads(await reader.readexactly(header_size))
+        payload = await reader.readexactly(payload_size) if payload_size else b""
+    except asyncio.IncompleteReadError:
+        raise ProtocolError("Bağlantı mesajın ortasında kapandı.") from None
+    except ValueError as e:
+        raise ProtocolError(f"Geçersiz başlık: {e}") from None
+    if not isinstance(header, dict) or "type" not in header:
+        raise ProtocolError("Başlıkta type alanı yok.")
+    return header, payload
+
+
+async def write_message(writer, header, payload=b""):
+    """
+    Mesajı yazar ve gönderim tamponu boşalana kadar bekler (geri basınç).
+    """
+    writer.write(encode_message(header, payload))
+    await writer.drain()
@@ -0,0 +1,496 @@
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import time
+import traceback
+
+import cv2
+import numpy as np
+
+from exercise_detection import ExerciseDetection
+from exercise_specs import EXERCISE_SPECS
+from frame_scheduler import FrameDropped, FrameScheduler, ScheduledFrame
+from landmark_filter import FILTERED_STABLE_MS, OneEuroFilter
+from landmark_ingest import LandmarkIngestService
+from pose_estimator import PoseEstimator
+from pose_protocol import (
+    ACK, BYE, ERROR, FLOAT32, FRAME, HELLO, JPEG, LANDMARK_SOURCE, LANDMARKS, RAW, SUMMARY, VIDEO_SOURCE, WELCOME,
+    ProtocolError, decode_landmarks, read_message, write_message
+)
+
+# Her işçi sürecin kendi PoseEstimator nesnesi (init_worker ile oluşturulur)
+_worker_pose = None
+
+
+def init_worker(pose_config):
+    """
+    İşçi süreç başlatıcısı: her süreç için bir PoseEstimator oluşturur ve ısıtır.
+
+    Kareler oturumlardan karışık sırayla geldiği için model kareler arası takip
+    yapmadan (static_image_mode) çalışır; böylece herhangi bir kare herhangi bir
+    işçiye gidebilir.
+    """
+    global _worker_pose
+    _worker_pose = PoseEstimator(**dict(pose_config, static_image_mode=True))
+    _worker_pose.warmup()
+
+
+def estimate_frame(payload, encoding, shape=None):
+    """
+    İşçi süreçte bir kareyi çözer ve eklem noktalarını tahmin eder.
+
+    Args:
+        payload: JPEG baytları veya ham BGR baytları
+        encoding: JPEG veya RAW
+        shape: RAW için (yükseklik, genişlik, 3)
+
+    Returns:
+        np.ndarray veya None: (33, 4) eklem dizisi, poz bulunamazsa None
+
+    Raises:
+        ValueError: Kare çözülemezse
+    """
+    if encoding == JPEG:
+        frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("JPEG kare çözülemedi.")
+    elif encoding == RAW:
+        frame = np.frombuffer(payload, dtype=np.uint8).reshape(shape)
+    else:
+        raise ValueError(f"Bilinmeyen kare kodlaması: {encoding}")
+    return _worker_pose.estimate(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+
+class ServerSession:
+    def __init__(self, session_id, exercise_names, peak_counting=(), landmark_filter=False, acks=False,
+                 in_flight=2, source=VIDEO_SOURCE, ingest=None, deadline_ms=None):
+        """
+        Bir istemci bağlantısının durumu: kendi ExerciseDetection nesnesi ve
+        işçilere gönderilmiş, sonucu beklenen kareler.
+
+        ingest verilirse oturumun durum makineleri ExerciseDetection yerine
+        paylaşılan LandmarkIngestService içinde tutulur (eklem kaynağı için).
+
+        Args:
+            session_id: Oturum kimliği
+            exercise_names: Takip edilecek egzersizler
+            peak_counting: Tekrarları tepe/çukur algılayıcısıyla sayılacak egzersizler
+            landmark_filter: True ise eklemlere One-Euro filtresi uygulanır
+            acks: True ise her kare için "ack" mesajı gönderilir
+            in_flight: Oturumun aynı anda işçilerde bulunabilecek kare sayısı
+            source: VIDEO_SOURCE veya LANDMARK_SOURCE
+            ingest: Eklem oturumları için LandmarkIngestService
+            deadline_ms: Karelerin son tarihi (ms); None ise kayıpsız (tüm kareler sırayla
+                işlenir, sınıra gelince bağlantıdan okuma durur)
+
+        Raises:
+            KeyError: Bilinmeyen bir egzersiz adı verilirse
+        """
+        self.session_id = session_id
+        self.source = source
+        self.ingest = ingest
+        if ingest is not None:
+            self.ingest_session = ingest.open_session(exercise_names)
+            self.exercise_detection = None
+        else:
+            self.ingest_session = None
+            options = {"landmark_filter": OneEuroFilter(), "required_stable_ms": FILTERED_STABLE_MS} \
+                if landmark_filter else {}
+            self.exercise_detection = ExerciseDetection(monitor_all=False, peak_counting=peak_counting, **options)
+            self.exercise_detection.subscribe(*exercise_names)
+        self.exercise_names = list(exercise_names)
+        self.acks = acks
+        self.deadline_ms = deadline_ms
+        # Kayıpsız oturumlarda okuma tarafının geri basıncı; son tarihli oturumlar hiç beklemez
+        self.slots = asyncio.Semaphore(in_flight) if deadline_ms is None else None
+        self.pending = asyncio.Queue()  # ScheduledFrame nesneleri, alınma sırasıyla
+        self.started_at = time.perf_counter()
+        self.frames = 0
+        self.detected_frames = 0
+        self.scheduler_stats = None  # Oturum kapanırken FrameScheduler istatistikleri
+        self.disconnected = False  # Bağlantı koptuysa olaylar artık yazılmaz
+
+    def repetition_count(self, exercise_name):
+        if self.ingest_session is not None:
+            return self.ingest.engine.get_repetition_count(self.ingest_session, exercise_name)
+        return self.exercise_detection.exercises[exercise_name].get_repetition_count()
+
+    def summary(self):
+        summary = {
+            "type": SUMMARY,
+            "session": self.session_id,
+            "frames": self.frames,
+            "detected_frames": self.detected_frames,
+            "exercises": {name: self.repetition_count(name) for name in self.exercise_names},
+        }
+        if self.scheduler_stats is not None:
+            summary["scheduler"] = self.scheduler_stats
+        return summary
+
+    def close(self):
+        """
+        Paylaşılan servisteki oturumu serbest bırakır.
+        """
+        if self.ingest_session is not None:
+            self.ingest.close_session(self.ingest_session)
+            self.ingest_session = None
+
+
+class PoseServer:
+    def __init__(self, host="127.0.0.1", port=8765, unix_path=None, workers=None, pose_config=None, in_flight=2,
+                 deadline_ms=None):
+        """
+        Birçok istemciden eşzamanlı video akışı kabul eden asyncio sunucusu.
+
+        Kareler sabit sayıda işçi süreçteki PoseEstimator nesnelerine dağıtılır;
+        her bağlantı kendi ExerciseDetection durumuna sahiptir ve olaylar
+        ("state", "rep") aynı bağlantıdan geri gönderilir. Verim bağlantı sayısıyla
+        değil işçi (çekirdek) sayısıyla ölçeklenir: bağlantılar yalnızca kare
+        kuyruklarını ve küçük durum makinelerini tutar.
+
+        Kareler işçilere FrameScheduler üzerinden gider: boş işçi kapasitesi
+        oturumlar arasında sırayla paylaştırılır, böylece düğüm aşırı yüklendiğinde
+        her oturumun kare hızı eşit oranda düşer. Son tarihli oturumlarda (deadline_ms)
+        yalnızca en güncel kare bekler ve son tarihini kaçıracak kareler atılır;
+        gecikme yükten bağımsız olarak sınırlı kalır. Kayıpsız oturumların
+        işçilerdeki kare sayısı in_flight ile sınırlıdır; sınır dolduğunda
+        bağlantıdan okuma durur ve TCP geri basıncı istemciyi yavaşlatır.
+
+        Poz tahminini cihazda yapan istemciler "source": "landmarks" ile bağlanıp
+        eklem yığınları gönderir. Bu oturumlar işçi süreçlere hiç uğramaz: tümü
+        tek bir LandmarkIngestService içinde tutulur ve aynı olay döngüsü turunda
+        gelen yığınlar birlikte, vektörel olarak işlenir. Tepe/çukur sayımı veya
+        filtre isteyen eklem oturumları kendi ExerciseDetection nesneleriyle çalışır.
+
+        Args:
+            host: Dinlenecek adres (TCP)
+            port: Dinlenecek port (TCP)
+            unix_path: Verilirse TCP yerine bu Unix soketinde dinlenir
+            workers: İşçi süreç sayısı (None ise çekirdek sayısı, 0 ise yalnızca eklem oturumları)
+            pose_config: PoseEstimator ayarları (model_complexity, ...)
+            in_flight: Oturum başına işçilerde bulunabilecek kare sayısı
+            deadline_ms: Oturumların varsayılan kare son tarihi (ms); None ise kayıpsız.
+                İstemci "hello" mesajındaki "deadline_ms" ile değiştirebilir.
+        """
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.pose_config = dict(pose_config or {})
+        self.in_flight = in_flight
+        self.deadline_ms = deadline_ms
+        self.executor = None
+        self.scheduler = None
+        self.server = None
+        self.sessions = {}
+        self.ingest = LandmarkIngestService()
+        self._session_ids = itertools.count(1)
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.frames_failed = 0  # İşçide hata veren kareler
+        self.sessions_served = 0
+
+    async def start(self):
+        """
+        İşçi havuzunu başlatır ve bağlantıları kabul etmeye başlar.
+        """
+        if self.workers:
+            # MediaPipe grafikleri fork sonrası güvenli değil, işçileri spawn ile başlat
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker, initargs=(self.pose_config,))
+            loop = asyncio.get_running_loop()
+            # İşçi başına bir kare: fazlası havuzun kuyruğunda FIFO bekler ve zamanlamayı bozar
+            self.scheduler = FrameScheduler(
+                lambda job: loop.run_in_executor(self.executor, estimate_frame, *job),
+                capacity=self.workers, max_in_flight=self.in_flight)
+        if self.unix_path:
+            self.server = await asyncio.start_unix_server(self._handle_client, self.unix_path)
+        else:
+            self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # İşçileri şimdi başlat; ilk istemci model yükleme süresini beklemesin
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)))
+
+    def address(self):
+        """
+        Dinlenen adres (Unix soket yolu veya (host, port)).
+        """
+        if self.unix_path:
+            return self.unix_path
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    async def close(self):
+        """
+        Yeni bağlantıları kabul etmeyi bırakır ve işçi havuzunu kapatır.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    def report(self):
+        """
+        Sunucu istatistikleri.
+        """
+        return {"workers": self.workers, "active_sessions": len(self.sessions),
+                "sessions_served": self.sessions_served, "frames_processed": self.frames_processed,
+                "frames_dropped": self.frames_dropped, "frames_failed": self.frames_failed,
+                "scheduler": self.scheduler.stats() if self.scheduler is not None else None,
+                "landmark_frames_ingested": self.ingest.frames_processed,
+                "ingest_us_per_frame": round(self.ingest.cost_per_frame_us(), 3)}
+
+    def _open_session(self, header):
+        """
+        "hello" mesajından oturum oluşturur.
+
+        Raises:
+            ProtocolError: Egzersiz listesi veya kaynak geçersizse
+        """
+        exercise_names = header.get("exercises") or ([header["exercise"]] if header.get("exercise") else [])
+        unknown = [name for name in exercise_names if name not in EXERCISE_SPECS]
+        if not exercise_names or unknown:
+            raise ProtocolError(f"Geçersiz egzersiz listesi: {exercise_names}")
+        source = header.get("source", VIDEO_SOURCE)
+        if source not in (VIDEO_SOURCE, LANDMARK_SOURCE):
+            raise ProtocolError(f"Geçersiz kaynak: {source}")
+        if source == VIDEO_SOURCE and self.executor is None:
+            raise ProtocolError("Sunucuda poz işçisi yok; yalnızca eklem oturumları kabul edilir.")
+        peak_counting = [name for name in header.get("peak_counting", ()) if name in exercise_names]
+        landmark_filter = bool(header.get("landmark_filter"))
+        # Paylaşılan servis yalnızca durum makinelerini çalıştırır
+        shared = source == LANDMARK_SOURCE and not peak_counting and not landmark_filter
+        deadline_ms = header.get("deadline_ms", self.deadline_ms)
+        if deadline_ms is not None and (not isinstance(deadline_ms, (int, float)) or deadline_ms <= 0):
+            raise ProtocolError(f"Geçersiz deadline_ms: {deadline_ms}")
+        session = ServerSession(next(self._session_ids), exercise_names, peak_counting=peak_counting,
+                                landmark_filter=landmark_filter, acks=bool(header.get("acks")),
+                                in_flight=self.in_flight, source=source, ingest=self.ingest if shared else None,
+                                deadline_ms=deadline_ms)
+        if source == VIDEO_SOURCE:
+            self.scheduler.add_session(session.session_id, deadline_ms)
+        self.sessions[session.session_id] = session
+        self.sessions_served += 1
+        return session
+
+    async def _handle_client(self, reader, writer):
+        """
+        Bir bağlantıyı yönetir: kareleri okuyup işçilere gönderir; sonuçları
+        sırayla işleyen görev olayları geri yazar.
+        """
+        session = None
+        results_task = None
+        try:
+            header, _ = await read_message(reader)
+            if header is None:
+                return
+            if header["type"] != HELLO:
+                raise ProtocolError("İlk mesaj hello olmalıdır.")
+            session = self._open_session(header)
+            await write_message(writer, {"type": WELCOME, "session": session.session_id,
+                                         "exercises": session.exercise_names})
+            if session.source == LANDMARK_SOURCE:
+                await self._receive_landmarks(session, reader, writer)
+                await write_message(writer, session.summary())
+                return
+            results_task = asyncio.create_task(self._send_results(session, writer))
+
+            while True:
+                header, payload = await read_message(reader)
+                if header is None or header["type"] == BYE:
+                    break
+                if header["type"] != FRAME:
+                    raise ProtocolError(f"Beklenmeyen mesaj: {header['type']}")
+                if session.slots is not None:
+                    # Kayıpsız oturumun işçilerdeki kare sınırı doluysa okumayı durdur (geri basınç)
+                    await session.slots.acquire()
+                received_at = time.perf_counter()
+                timestamp_ms = header.get("timestamp_ms")
+                if timestamp_ms is None:
+                    timestamp_ms = (received_at - session.started_at) * 1000.0
+                shape = tuple(header["shape"]) if header.get("shape") else None
+                frame = ScheduledFrame(session.session_id, session.frames, timestamp_ms,
+                                       (payload, header.get("encoding", JPEG), shape), received_at)
+                await session.pending.put(self.scheduler.offer(frame))
+                session.frames += 1
+
+            # Kalan kareler işlensin, ardından özet gönderilsin
+            await session.pending.put(None)
+            await results_task
+            session.scheduler_stats = self.scheduler.session_stats(session.session_id)
+            await write_message(writer, session.summary())
+        except ProtocolError as e:
+            await self._send_error(writer, str(e))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            print(f"Oturum işlenirken hata oluştu: {e}")
+            traceback.print_exc()
+            await self._send_error(writer, str(e))
+        finally:
+            if results_task is not None and not results_task.done():
+                results_task.cancel()
+            if session is not None:
+                session.close()
+                if self.scheduler is not None and session.session_id in self.scheduler.sessions:
+                    self.scheduler.remove_session(session.session_id)
+                self.sessions.pop(session.session_id, None)
+            writer.close()
+
+    async def _receive_landmarks(self, session, reader, writer):
+        """
+        Eklem kaynaklı oturumun mesajlarını işler: her LANDMARKS yığınının
+        olaylarını ve isteğe bağlı "ack" mesajını gönderir. Bir sonraki yığın
+        ancak olaylar yazıldıktan sonra okunur (geri basınç).
+        """
+        while True:
+            header, payload = await read_message(reader)
+            if header is None or header["type"] == BYE:
+                return
+            if header["type"] != LANDMARKS:
+                raise ProtocolError(f"Beklenmeyen mesaj: {header['type']}")
+            received_at = time.perf_counter()
+            timestamps_ms, landmarks = decode_landmarks(int(header.get("count", 0)), payload,
+                                                        header.get("encoding", FLOAT32))
+            detected = ~np.isnan(landmarks[:, 0, 0])
+            if session.ingest_session is not None:
+                events = await self.ingest.submit(session.ingest_session, timestamps_ms, landmarks)
+            else:
+                events = []
+                for timestamp_ms, landmark_array in zip(timestamps_ms[detected], landmarks[detected]):
+                    # detect_exercises kareyi kendi tamponuna kopyalar; salt okunur yük doğrudan verilebilir
+                    session.exercise_detection.detect_exercises(landmark_array, float(timestamp_ms))
+                    events.extend(session.exercise_detection.get_events())
+            session.frames += len(timestamps_ms)
+            session.detected_frames += int(detected.sum())
+
+            for event in events:
+                await write_message(writer, event)
+            if session.acks:
+                await write_message(writer, {
+                    "type": ACK, "frames": len(timestamps_ms), "detected": int(detected.sum()),
+                    "latency_ms": round((time.perf_counter() - received_at) * 1000.0, 2),
+                })
+
+    async def _send_results(self, session, writer):
+        """
+        İşçi sonuçlarını gönderim sırasıyla bekler, oturumun durum makinelerini
+        ilerletir ve olayları istemciye yazar. Zamanlayıcının attığı kareler
+        yalnızca "ack" ile, işçide hata veren kareler "error" ile bildirilir
+        (poz bulunamadı olarak sayılmaz). Bağlantı koparsa yazmayı bırakır
+        ama kalan kareleri tüketmeye devam eder; böylece okuma döngüsü kare
+        sınırında takılı kalmaz.
+        """
+        async def send(message):
+            if not session.disconnected:
+                try:
+                    await write_message(writer, message)
+                except ConnectionError:
+                    session.disconnected = True
+
+        while True:
+            frame = await session.pending.get()
+            if frame is None:
+                return
+            try:
+                landmark_array = await frame.future
+            except Exception as e:
+                self.frames_failed += 1
+                await send({"type": ERROR, "frame": frame.frame_number, "message": str(e)})
+                continue
+            finally:
+                if session.slots is not None:
+                    session.slots.release()
+            if isinstance(landmark_array, FrameDropped):
+                self.frames_dropped += 1
+                if session.acks:
+                    await send({"type": ACK, "frame": frame.frame_number, "dropped": landmark_array.reason})
+                continue
+            self.frames_processed += 1
+
+            if landmark_array is not None:
+                session.detected_frames += 1
+                session.exercise_detection.detect_exercises(landmark_array, frame.timestamp_ms)
+                for event in session.exercise_detection.get_events():
+                    await send(event)
+            if session.acks:
+                await send({
+                    "type": ACK, "frame": frame.frame_number, "detected": landmark_array is not None,
+                    "latency_ms": round((time.perf_counter() - frame.received_at) * 1000.0, 2),
+                })
+
+    async def _send_error(self, writer, message):
+        try:
+            await write_message(writer, {"type": ERROR, "message": message})
+        except ConnectionError:
+            pass
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Çok oturumlu poz ve egzersiz sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="TCP yerine bu Unix soketinde dinle")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="İşçi süreç sayısı (varsayılan: çekirdek sayısı; 0: yalnızca eklem oturumları)")
+    parser.add_argument("--in-flight", type=int, default=2, help="Oturum başına işçilerdeki en fazla kare")
+    parser.add_argument("--deadline-ms", type=float, default=None,
+                        help="Kare son tarihi (ms): oturum başına en güncel kare işlenir, geç kalacaklar atılır "
+                             "(varsayılan: kayıpsız)")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=(0, 1, 2))
+    parser.add_argument("--metrics-file", default=None,
+                        help="Oturum başına kare sayaçlarını ve gecikmeleri Prometheus metin biçiminde bu dosyaya yaz")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Metrik dosyasının yazılma aralığı (s)")
+    return parser.parse_args(argv)
+
+
+async def dump_metrics(server, path, interval_s):
+    """
+    Zamanlayıcı metriklerini periyodik olarak dosyaya yazar.
+    """
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            server.scheduler.dump(path)
+        except OSError as e:
+            print(f"Metrik dosyası yazılırken hata oluştu: {e}")
+
+
+async def serve(args):
+    server = PoseServer(args.host, args.port, args.unix, args.workers,
+                        {"model_complexity": args.model_complexity}, args.in_flight, args.deadline_ms)
+    await server.start()
+    print(f"Sunucu dinliyor: {server.address()} ({server.workers} işçi)")
+    metrics_task = None
+    if args.metrics_file and server.scheduler is not None:
+        metrics_task = asyncio.create_task(dump_metrics(server, args.metrics_file, args.metrics_interval))
+    try:
+        await server.serve_forever()
+    finally:
+        if metrics_task is not None:
+            metrics_task.cancel()
+        await server.close()
+        print(f"Sunucu kapandı: {server.report()}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
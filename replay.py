@@ -0,0 +1,210 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from exercise_classes import EXERCISE_CLASSES, SpecExercise
+from exercise_detection import ExerciseDetection
+from exercise_specs import EXERCISE_SPECS, get_spec
+from landmark_filter import FILTERED_STABLE_MS, OneEuroFilter
+from landmark_recording import LandmarkRecording
+
+ENGINE = "engine"  # ExerciseDetection: tüm egzersizler tek vektörel adımda
+CLASSES = "classes"  # Her egzersiz sınıfı kendi update_state çağrısıyla (skaler yol)
+
+
+def _timeline_entry(frame, timestamp_ms, exercise):
+    return {"frame": frame, "timestamp_ms": round(float(timestamp_ms), 1),
+            "state": exercise.get_state(), "repetition_count": exercise.get_repetition_count()}
+
+
+def replay_engine(timestamps_ms, landmarks, exercise_names, peak_counting=(), landmark_filter=False):
+    """
+    Kaydı ExerciseDetection üzerinden oynatır.
+
+    Args:
+        timestamps_ms: (n,) zaman damgaları
+        landmarks: (n, 33, 4) eklem dizileri (poz yoksa NaN)
+        exercise_names: Değerlendirilecek egzersizler
+        peak_counting: Tekrarları tepe/çukur algılayıcısıyla sayılacak egzersizler
+        landmark_filter: True ise eklemlere One-Euro filtresi uygulanır ve kararlılık
+            beklemesi FILTERED_STABLE_MS'e kısaltılır (canlı döngüdeki --landmark-filter)
+
+    Returns:
+        tuple: ({egzersiz: (tekrar sayısı, zaman çizelgesi)}, işlenen kare sayısı)
+    """
+    options = {"landmark_filter": OneEuroFilter(), "required_stable_ms": FILTERED_STABLE_MS} if landmark_filter else {}
+    exercise_detection = ExerciseDetection(monitor_all=False, peak_counting=peak_counting, **options)
+    exercise_detection.subscribe(*exercise_names)
+    timelines = {name: [] for name in exercise_names}
+    last = {name: (exercise_detection.exercises[name].get_state(), 0) for name in exercise_names}
+
+    detected_frames = 0
+    for frame, (timestamp_ms, landmark_array) in enumerate(zip(timestamps_ms, landmarks)):
+        # Canlı döngüde olduğu gibi poz bulunamayan karelerde durum makinesi ilerlemez
+        if np.isnan(landmark_array[0, 0]):
+            continue
+        detected_frames += 1
+        exercise_detection.detect_exercises(landmark_array, timestamp_ms)
+        # Yalnızca geçiş olan egzersizlere bakılır; zaman çizelgesine etiket veya
+        # tekrar sayısı değiştiğinde eklenir (CLASSES yolu ile aynı kural)
+        for event in exercise_detection.get_events():
+            name = event["exercise"]
+            current = (event["state"], event["repetition_count"])
+            if event["type"] == "state" and current != last[name]:
+                timelines[name].append(_timeline_entry(frame, timestamp_ms, exercise_detection.exercises[name]))
+                last[name] = current
+
+    results = {
+        name: (exercise_detection.exercises[name].get_repetition_count(), timelines[name])
+        for name in exercise_names
+    }
+    return results, detected_frames
+
+
+def replay_classes(timestamps_ms, landmarks, exercise_names):
+    """
+    Kaydı her egzersiz sınıfının kendi update_state metoduyla oynatır.
+
+    Returns:
+        tuple: ({egzersiz: (tekrar sayısı, zaman çizelgesi)}, işlenen kare sayısı)
+    """
+    exercises = {name: EXERCISE_CLASSES.get(name, SpecExercise)(get_spec(name)) for name in exercise_names}
+    timelines = {name: [] for name in exercise_names}
+    last = {name: (exercise.get_state(), 0) for name, exercise in exercises.items()}
+
+    detected_frames = 0
+    for frame, (timestamp_ms, landmark_array) in enumerate(zip(timestamps_ms, landmarks)):
+        if np.isnan(landmark_array[0, 0]):
+            continue
+        detected_frames += 1
+        for name, exercise in exercises.items():
+            exercise.update_state(landmark_array, timestamp_ms)
+            current = (exercise.get_state(), exercise.get_repetition_count())
+            if current != last[name]:
+                timelines[name].append(_timeline_entry(frame, timestamp_ms, exercise))
+                last[name] = current
+
+    results = {name: (exercise.get_repetition_count(), timelines[name]) for name, exercise in exercises.items()}
+    return results, detected_frames
+
+
+def replay_recording(path, exercise_names=None, mode=ENGINE, peak_counting=(), landmark_filter=False):
+    """
+    Kaydedilmiş eklem akışını kamera ve MediaPipe olmadan, CPU'nun izin verdiği
+    en yüksek hızda durum makinelerinden geçirir.
+
+    Args:
+        path: .lmk kayıt dosyası
+        exercise_names: Değerlendirilecek egzersizler (None ise tümü)
+        mode: ENGINE veya CLASSES
+        peak_counting: ENGINE modunda tekrarları tepe/çukur algılayıcısıyla sayılacak egzersizler
+        landmark_filter: ENGINE modunda eklemlere One-Euro filtresi uygula
+
+    Returns:
+        dict: Egzersiz başına tekrar sayısı ve zaman çizelgesi, kare sayıları ve kare/s
+    """
+    exercise_names = list(EXERCISE_SPECS) if exercise_names is None else list(exercise_names)
+    recording = LandmarkRecording(path)
+    # memmap alt sınıfı olmadan görünüm: satır erişimi daha ucuz
+    timestamps_ms = np.asarray(recording.timestamps_ms)
+    landmarks = np.asarray(recording.landmarks)
+
+    start = time.perf_counter()
+    if mode == ENGINE:
+        results, detected_frames = replay_engine(timestamps_ms, landmarks, exercise_names, peak_counting,
+                                                 landmark_filter)
+    else:
+        results, detected_frames = replay_classes(timestamps_ms, landmarks, exercise_names)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "recording": path,
+        "mode": mode,
+        "peak_counting": sorted(peak_counting) if mode == ENGINE else [],
+        "landmark_filter": landmark_filter and mode == ENGINE,
+        "frames": len(recording),
+        "detected_frames": detected_frames,
+        "duration_ms": round(recording.duration_ms(), 1),
+        "elapsed_seconds": round(elapsed, 4),
+        "frames_per_second": round(detected_frames / elapsed, 1) if elapsed > 0 else 0.0,
+        "exercises": {
+            name: {"repetition_count": count, "timeline": timeline}
+            for name, (count, timeline) in results.items()
+        },
+    }
+
+
+def compare_results(first, second):
+    """
+    İki oynatma sonucundaki tekrar sayılarını ve zaman çizelgelerini karşılaştırır.
+
+    Returns:
+        list: Farklı sonuç veren egzersiz adları
+    """
+    return [
+        name for name in first["exercises"]
+        if first["exercises"][name] != second["exercises"].get(name)
+    ]
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Kaydedilmiş eklem akışlarını en yüksek hızda oynatır")
+    parser.add_argument("recordings", nargs="+", help=".lmk kayıt dosyaları")
+    parser.add_argument("--exercises", nargs="+", choices=list(EXERCISE_SPECS), default=None,
+                        help="Değerlendirilecek egzersizler (varsayılan: tümü)")
+    parser.add_argument("--mode", choices=(ENGINE, CLASSES, "both"), default=ENGINE,
+                        help="Durum makinesi yolu; both ise iki yol da çalıştırılıp karşılaştırılır")
+    parser.add_argument("--peak-counting", nargs="+", choices=list(EXERCISE_SPECS), default=[],
+                        help="engine yolunda tekrarları tepe/çukur algılayıcısıyla sayılacak egzersizler")
+    parser.add_argument("--landmark-filter", action="store_true",
+                        help="engine yolunda eklemlere One-Euro filtresi uygula ve kararlılık beklemesini kısalt")
+    parser.add_argument("--output", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--summary", action="store_true", help="Zaman çizelgeleri olmadan yalnızca özet yaz")
+    args = parser.parse_args(argv)
+    # Sınıf yolu bu seçenekleri uygulayamaz; both ile yollar farklı sayar ve yanlış fark raporlanır
+    if args.mode != ENGINE and (args.peak_counting or args.landmark_filter):
+        parser.error("--peak-counting ve --landmark-filter yalnızca --mode engine ile kullanılabilir")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    modes = (ENGINE, CLASSES) if args.mode == "both" else (args.mode,)
+
+    reports = []
+    mismatched = False
+    for path in args.recordings:
+        runs = [replay_recording(path, args.exercises, mode, args.peak_counting, args.landmark_filter)
+                for mode in modes]
+        for run in runs:
+            counts = {name: result["repetition_count"] for name, result in run["exercises"].items()}
+            print(f"{path} [{run['mode']}]: {run['detected_frames']} kare, "
+                  f"{run['frames_per_second']:,.0f} kare/s, tekrarlar: {counts}", file=sys.stderr)
+        if len(runs) == 2:
+            differences = compare_results(*runs)
+            if differences:
+                mismatched = True
+                print(f"{path}: yollar arasında fark: {differences}", file=sys.stderr)
+        if args.summary:
+            for run in runs:
+                for result in run["exercises"].values():
+                    result.pop("timeline")
+        reports.extend(runs)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(reports, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
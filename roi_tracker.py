@@ -0,0 +1,171 @@
+import cv2
+import numpy as np
+
+
+class RoiTracker:
+    def __init__(self, estimator, padding=0.3, max_side=None, min_visibility=0.5, min_visible_landmarks=8,
+                 min_box_fraction=0.2, full_frame_fraction=0.85):
+        """
+        Önceki karenin eklem noktalarından kişinin etrafında genişletilmiş bir kutu
+        çıkarır ve çıkarımı yalnızca bu bölgede (isteğe bağlı olarak küçültülmüş)
+        çalıştırır. Eklem noktaları tam kare koordinatlarına geri dönüştürülür.
+
+        Kutu, kişi kutunun iç bölgesinde kaldığı sürece sabit tutulur; böylece
+        MediaPipe'ın kareler arası takibi her karede kayan bir görüntü görmez.
+        Kişi kaybolursa aynı karede tam kare ile yeniden denenir.
+
+        Args:
+            estimator: estimate(image_rgb, timestamp_ms) metoduna sahip PoseEstimator
+            padding: Eklem kutusunun her yönde genişletilme oranı (kutu boyutuna göre)
+            max_side: Kırpılan bölgenin uzun kenarı bundan büyükse bu boyuta küçültülür
+                (piksel, None ise küçültme yapılmaz). Tam kare geçişlerine de uygulanır.
+            min_visibility: Kutu hesabına katılacak eklemlerin minimum görünürlüğü
+            min_visible_landmarks: Bundan az görünür eklem varsa takip kaybedilmiş sayılır
+            min_box_fraction: Kutunun kenarı karenin bu oranından küçük olamaz
+            full_frame_fraction: Kutu karenin bu oranından büyük alan kaplıyorsa kırpma yapılmaz
+        """
+        self.estimator = estimator
+        self.padding = padding
+        self.max_side = max_side
+        self.min_visibility = min_visibility
+        self.min_visible_landmarks = min_visible_landmarks
+        self.min_box_fraction = min_box_fraction
+        self.full_frame_fraction = full_frame_fraction
+
+        self.box = None  # (x0, y0, x1, y1) piksel, None ise tam kare
+
+        # İstatistikler
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost_frames = 0  # Bölgede kişi bulunamayıp tam kareye dönülen kareler
+        self.input_pixels = 0  # Modele verilen toplam piksel sayısı
+        self.frame_pixels = 0  # Tam karelerin toplam piksel sayısı
+
+    def reset(self):
+        """
+        Takibi bırakır; sonraki kare tam kare olarak işlenir.
+        """
+        self.box = None
+        if hasattr(self.estimator, "reset"):
+            self.estimator.reset()
+
+    def _prepare(self, image_rgb, box):
+        """
+        Görüntüyü kutuya göre kırpar ve gerekirse küçültür.
+
+        Returns:
+            tuple: (modele verilecek görüntü, (x0, y0, genişlik, yükseklik) piksel)
+        """
+        height, width = image_rgb.shape[:2]
+        x0, y0, x1, y1 = (0, 0, width, height) if box is None else box
+        region = image_rgb[y0:y1, x0:x1]
+        region_width, region_height = x1 - x0, y1 - y0
+
+        long_side = max(region_width, region_height)
+        if self.max_side is not None and long_side > self.max_side:
+            scale = self.max_side / long_side
+            size = (max(1, round(region_width * scale)), max(1, round(region_height * scale)))
+            region = cv2.resize(region, size, interpolation=cv2.INTER_AREA)
+        elif box is not None:
+            region = np.ascontiguousarray(region)
+        return region, (x0, y0, region_width, region_height)
+
+    @staticmethod
+    def _to_full_frame(landmark_array, region, width, height):
+        """
+        Bölgeye göre normalleştirilmiş eklem noktalarını tam kareye göre normalleştirir.
+        """
+        x0, y0, region_width, region_height = region
+        full = landmark_array.copy()
+        full[:, 0] = (landmark_array[:, 0] * region_width + x0) / width
+        full[:, 1] = (landmark_array[:, 1] * region_height + y0) / height
+        full[:, 2] = landmark_array[:, 2] * region_width / width  # z, x ile aynı ölçektedir
+        return full
+
+    def _next_box(self, landmark_array, width, height):
+        """
+        Eklem noktalarından bir sonraki karenin kutusunu hesaplar.
+
+        Returns:
+            tuple veya None: (x0, y0, x1, y1) piksel, takip kaybedildiyse veya kutu
+                neredeyse tüm kareyi kaplıyorsa None
+        """
+        visible = landmark_array[landmark_array[:, 3] >= self.min_visibility, :2]
+        if len(visible) < self.min_visible_landmarks:
+            return None
+
+        points = np.clip(visible, 0.0, 1.0) * (width, height)
+        (px0, py0), (px1, py1) = points.min(axis=0), points.max(axis=0)
+
+        # Kişi mevcut kutunun iç bölgesinde kalıyorsa kutuyu değiştirme
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            margin_x = (x1 - x0) * self.padding / (1 + 2 * self.padding) / 2
+            margin_y = (y1 - y0) * self.padding / (1 + 2 * self.padding) / 2
+            if px0 >= x0 + margin_x and px1 <= x1 - margin_x and py0 >= y0 + margin_y and py1 <= y1 - margin_y:
+                return self.box
+
+        min_side = self.min_box_fraction * min(width, height)
+        box_width = max((px1 - px0) * (1 + 2 * self.padding), min_side)
+        box_height = max((py1 - py0) * (1 + 2 * self.padding), min_side)
+        if box_width * box_height >= self.full_frame_fraction * width * height:
+            return None
+
+        center_x, center_y = (px0 + px1) / 2, (py0 + py1) / 2
+        x0 = int(max(0, center_x - box_width / 2))
+        y0 = int(max(0, center_y - box_height / 2))
+        x1 = int(min(width, center_x + box_width / 2))
+        y1 = int(min(height, center_y + box_height / 2))
+        return x0, y0, x1, y1
+
+    def _run(self, image_rgb, timestamp_ms, box):
+        region_image, region = self._prepare(image_rgb, box)
+        self.input_pixels += region_image.shape[0] * region_image.shape[1]
+        landmark_array = self.estimator.estimate(region_image, timestamp_ms)
+        if landmark_array is None:
+            return None
+        height, width = image_rgb.shape[:2]
+        return self._to_full_frame(landmark_array, region, width, height)
+
+    def estimate(self, image_rgb, timestamp_ms=None):
+        """
+        Poz tespitini takip edilen bölgede yapar; kişi bulunamazsa tam kareye döner.
+
+        Args:
+            image_rgb: RGB formatındaki tam kare
+            timestamp_ms: Karenin zaman damgası (ms)
+
+        Returns:
+            np.ndarray veya None: Tam kareye göre normalleştirilmiş (33, 4) eklem dizisi
+        """
+        height, width = image_rgb.shape[:2]
+        self.frame_pixels += width * height
+
+        landmark_array = None
+        if self.box is not None:
+            self.roi_frames += 1
+            landmark_array = self._run(image_rgb, timestamp_ms, self.box)
+            if landmark_array is None:
+                self.lost_frames += 1
+                self.box = None
+
+        if self.box is None and landmark_array is None:
+            self.full_frames += 1
+            landmark_array = self._run(image_rgb, timestamp_ms, None)
+
+        self.box = None if landmark_array is None else self._next_box(landmark_array, width, height)
+        return landmark_array
+
+    def report(self):
+        """
+        Çalışma istatistiklerini döndürür.
+
+        Returns:
+            dict: Bölge/tam kare geçiş sayıları ve modele verilen piksel oranı
+        """
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "lost_frames": self.lost_frames,
+            "pixel_ratio": round(self.input_pixels / self.frame_pixels, 3) if self.frame_pixels else 0.0,
+        }
@@ -0,0 +1,283 @@
+import argparse
+import time
+
+import numpy as np
+
+from angle_engine import LANDMARK_FIELDS, NUM_LANDMARKS, AngleEngine
+from exercise_engine import (
+    INITIAL_STATE, NOMINAL_FRAME_MS, REQUIRED_STABLE_MS, STATE_FIELDS, advance_state_machines, compile_specs
+)
+from exercise_specs import EXERCISE_SPECS
+from synthetic_landmarks import BLOCK_FRAMES, synthetic_sessions
+
+THROUGHPUT_CHUNK_BYTES = 64 * 1024 * 1024  # Verim ölçümünde aynı anda bellekte tutulan kare verisi
+
+
+class MultiSessionEngine:
+    def __init__(self, specs=None, capacity=64, required_stable_ms=REQUIRED_STABLE_MS):
+        """
+        Birçok oturumun (hastanın) egzersiz durum makinelerini yapı-dizisi
+        (struct-of-arrays) biçiminde tutar.
+
+        Durum alanları (oturum, egzersiz) boyutlu NumPy dizileridir; her tikte
+        tüm oturumların kararlılık filtreleri ve geçişleri tek bir vektörel adımda
+        ilerletilir. Oturum başına Python nesnesi yoktur.
+
+        Args:
+            specs: ExerciseSpec listesi (None ise kayıt defterindeki tüm tanımlar)
+            capacity: Başlangıç oturum kapasitesi (gerektiğinde iki katına çıkar)
+            required_stable_ms: Geçişlerden önce gerekli kararlılık süresi (ms)
+        """
+        self.specs = list(EXERCISE_SPECS.values()) if specs is None else list(specs)
+        self.rows = {spec.name: row for row, spec in enumerate(self.specs)}
+        self.required_stable_ms = required_stable_ms
+        compile_specs(self, self.specs)
+
+        # Tüm tanımların eklem üçlüleri; ortak üçlüler tek yuvayı paylaşır
+        angle_engine = AngleEngine(spec.landmark_indices for spec in self.specs)
+        self.triplets = angle_engine.triplets
+        self.spec_slots = np.array([angle_engine.slot(spec.landmark_indices) for spec in self.specs], dtype=np.intp)
+
+        self.capacity = 0
+        self.session_clock_ms = np.zeros(0, dtype=np.float64)  # Zaman damgası verilmeyen oturumlar için sanal saat
+        self.session_used = np.zeros(0, dtype=bool)
+        self.subscribed = np.zeros((0, len(self.specs)), dtype=bool)
+        self._free_sessions = []
+        self._pairs_dirty = True
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """
+        Durum dizilerini verilen oturum kapasitesine genişletir.
+        """
+        n_specs = len(self.specs)
+
+        def extend(array, fill, dtype):
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=dtype)
+            grown[:array.shape[0]] = array
+            return grown
+
+        for field, dtype, initial in STATE_FIELDS:
+            if self.capacity == 0:
+                setattr(self, field, np.zeros((0, n_specs), dtype=dtype))
+            setattr(self, field, extend(getattr(self, field), initial, dtype))
+        self.session_clock_ms = extend(self.session_clock_ms, 0.0, np.float64)
+        self.session_used = extend(self.session_used, False, bool)
+        self.subscribed = extend(self.subscribed, False, bool)
+
+        # Yeni oturum kimlikleri küçükten büyüğe verilsin diye ters sırada eklenir
+        self._free_sessions.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def add_session(self, exercise_names):
+        """
+        Yeni bir oturum açar.
+
+        Args:
+            exercise_names: Oturumda takip edilecek egzersiz adları
+
+        Returns:
+            int: Oturum kimliği
+
+        Raises:
+            KeyError: Bilinmeyen bir egzersiz adı verilirse
+        """
+        rows = [self._row(name) for name in exercise_names]
+        if not self._free_sessions:
+            self._grow(max(1, self.capacity * 2))
+        session = self._free_sessions.pop()
+        self.reset_session(session)
+        self.session_used[session] = True
+        self.subscribed[session, rows] = True
+        self._pairs_dirty = True
+        return session
+
+    def remove_session(self, session):
+        """
+        Oturumu kapatır; kimlik sonraki add_session çağrılarında yeniden kullanılır.
+        """
+        if not self.session_used[session]:
+            raise KeyError(f"{session} oturumu açık değil.")
+        self.session_used[session] = False
+        self.subscribed[session] = False
+        self._free_sessions.append(session)
+        self._pairs_dirty = True
+
+    def reset_session(self, session):
+        """
+        Oturumun tüm egzersiz durumlarını sıfırlar.
+        """
+        for field, dtype, initial in STATE_FIELDS:
+            getattr(self, field)[session] = initial
+        self.session_clock_ms[session] = 0.0
+
+    def _row(self, exercise_name):
+        try:
+            return self.rows[exercise_name]
+        except KeyError:
+            raise KeyError(f"{exercise_name} egzersizi tanımlı değil.") from None
+
+    def _refresh_pairs(self):
+        """
+        Abone olunan (oturum, egzersiz) çiftlerinin indeks dizilerini yeniden oluşturur.
+        """
+        self.pair_sessions, self.pair_rows = np.nonzero(self.subscribed)
+        self._pairs_dirty = False
+
+    def step(self, landmarks, session_ids=None, timestamps_ms=None):
+        """
+        Bir tikte gelen karelerle oturumların durum makinelerini ilerletir.
+
+        Args:
+            landmarks: (k, 33, 4) eklem dizisi yığını
+            session_ids: landmarks ile hizalı k oturum kimliği (tekrarsız). None ise
+                landmarks tüm kapasiteyi kapsar ve i. kare i. oturuma aittir.
+            timestamps_ms: Karelerin zaman damgaları (ms), skaler veya landmarks ile
+                hizalı k değer. None ise her oturumun saati NOMINAL_FRAME_MS ilerler.
+
+        Returns:
+            tuple: (oturumlar, egzersiz satırları, durumu değişenler, tekrarı tamamlananlar);
+                ilk ikisi bu tikte güncellenen çiftlerdir, son ikisi onlarla hizalı bool maskeler
+        """
+        if self._pairs_dirty:
+            self._refresh_pairs()
+
+        landmarks = np.asarray(landmarks)
+        batch_sessions = np.arange(self.capacity) if session_ids is None else np.asarray(session_ids, dtype=np.intp)
+        if timestamps_ms is None:
+            self.session_clock_ms[batch_sessions] += NOMINAL_FRAME_MS
+        else:
+            self.session_clock_ms[batch_sessions] = timestamps_ms
+        batch_times = self.session_clock_ms[batch_sessions]
+
+        if session_ids is None:
+            sessions, rows = self.pair_sessions, self.pair_rows
+            positions = sessions
+        else:
+            # Oturum kimliğinden yığındaki sıraya eşleme
+            position_of = np.full(self.capacity, -1, dtype=np.intp)
+            position_of[batch_sessions] = np.arange(len(batch_sessions))
+            positions = position_of[self.pair_sessions]
+            selected = positions >= 0
+            sessions, rows, positions = self.pair_sessions[selected], self.pair_rows[selected], positions[selected]
+
+        # Her çift için kendi üçlüsünün noktalarını topla ve açıyı hesapla
+        triplets = self.triplets[self.spec_slots[rows]]
+        xy = landmarks[..., :2].astype(np.float64, copy=False)
+        a = xy[positions, triplets[:, 0]]
+        b = xy[positions, triplets[:, 1]]
+        c = xy[positions, triplets[:, 2]]
+        ba = a - b
+        bc = c - b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cosine_angle = (ba * bc).sum(axis=-1) / (np.hypot(ba[:, 0], ba[:, 1]) * np.hypot(bc[:, 0], bc[:, 1]))
+        angles = np.degrees(np.arccos(np.clip(cosine_angle, -1.0, 1.0)))
+        angles = np.where(self.invert[rows], 180.0 - angles, angles)
+
+        changed, completed = advance_state_machines(self, (sessions, rows), rows, angles, batch_times[positions])
+        return sessions, rows, changed, completed
+
+    def get_state(self, session, exercise_name):
+        """
+        Oturumdaki egzersizin durum etiketini döndürür.
+        """
+        row = self._row(exercise_name)
+        if not self.in_progress[session, row]:
+            return INITIAL_STATE
+        return self.state_labels[row][2 if self.active[session, row] else 1]
+
+    def get_repetition_count(self, session, exercise_name):
+        """
+        Oturumdaki egzersizin tekrar sayısını döndürür.
+        """
+        return int(self.repetition_count[session, self._row(exercise_name)])
+
+    def session_count(self):
+        """
+        Açık oturum sayısını döndürür.
+        """
+        return int(self.session_used.sum())
+
+
+def session_ticks(sessions, n_ticks, chunk_ticks):
+    """
+    Oturum üreteçlerinin ilk n_ticks karesini chunk_ticks tiklik parçalar
+    halinde, tik ekseni önde olacak biçimde üretir.
+
+    Bellekte aynı anda yalnızca bir parça bulunur; her oturumun dizisi en az
+    n_ticks kare uzunluğunda olmalıdır.
+
+    Args:
+        sessions: SyntheticExercise listesi
+        n_ticks: Üretilecek tik sayısı
+        chunk_ticks: Parça başına tik sayısı
+
+    Yields:
+        tuple: ((k, n_sessions) zaman damgaları ms, (k, n_sessions, 33, 4) eklemler)
+    """
+    for start in range(0, n_ticks, chunk_ticks):
+        streams = [session.generate(start, min(start + chunk_ticks, n_ticks)) for session in sessions]
+        timestamps_ms = np.stack([stream[0] for stream in streams], axis=1)
+        landmarks = np.stack([stream[1] for stream in streams], axis=1)
+        del streams
+        yield timestamps_ms, landmarks
+
+
+def measure_throughput(n_sessions, n_ticks=200, exercise_names=("squat",), seed=0):
+    """
+    Motorun saniyede işleyebildiği oturum-kare sayısını ölçer.
+
+    Kareler THROUGHPUT_CHUNK_BYTES ile sınırlı parçalar halinde üretilir;
+    yalnızca motor adımları zamanlanır.
+
+    Args:
+        n_sessions: Eşzamanlı oturum sayısı
+        n_ticks: Ölçülecek tik sayısı
+        exercise_names: Her oturumun takip ettiği egzersizler
+        seed: Rastgele sayı üreteci tohumu
+
+    Returns:
+        float: Saniyedeki oturum-kare sayısı
+    """
+    engine = MultiSessionEngine(capacity=n_sessions)
+    for _ in range(n_sessions):
+        engine.add_session(exercise_names)
+
+    # Parça boyu bellek bütçesinden; gürültü bloğu parçayla aynı boyda olunca
+    # her parça oturum başına tek blok üretir
+    tick_bytes = n_sessions * (NUM_LANDMARKS * LANDMARK_FIELDS * 4 + 8)
+    chunk_ticks = int(np.clip(THROUGHPUT_CHUNK_BYTES // tick_bytes, 1, BLOCK_FRAMES))
+
+    # Her oturum kendi tempo ve gürültüsüyle egzersiz yapan sentetik bir kişi;
+    # dizilerden biri n_ticks kareden kısa kalırsa tekrar sayısı artırılır
+    repetitions = int(n_ticks * NOMINAL_FRAME_MS / 1800) + 1
+    while True:
+        sessions = synthetic_sessions(n_sessions, exercise_names, seed, repetitions=repetitions,
+                                      block_frames=chunk_ticks)
+        if min(session.frame_count for session in sessions) >= n_ticks:
+            break
+        repetitions *= 2
+
+    elapsed = 0.0
+    for timestamps_ms, landmarks in session_ticks(sessions, n_ticks, chunk_ticks):
+        start = time.perf_counter()
+        for tick in range(len(timestamps_ms)):
+            engine.step(landmarks[tick], timestamps_ms=timestamps_ms[tick])
+        elapsed += time.perf_counter() - start
+    return n_sessions * n_ticks / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Çok oturumlu motorun verimini ölçer")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--exercises", nargs="+", default=["squat"])
+    args = parser.parse_args(argv)
+
+    for n_sessions in args.sessions:
+        throughput = measure_throughput(n_sessions, args.ticks, args.exercises)
+        print(f"{n_sessions:6d} oturum: {throughput:,.0f} oturum-kare/s")
+
+
+if __name__ == "__main__":
+    main()
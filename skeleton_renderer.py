@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+
+
+class SkeletonRenderer:
+    def __init__(self, connections=None, joint_color=(0, 255, 0), bone_color=(255, 0, 0), joint_radius=5,
+                 bone_thickness=2):
+        """
+        Eklem noktalarını ve kemikleri kareye çizer.
+
+        Bağlantı indeks çiftleri bir kez diziye dönüştürülür; her karede eklemler
+        tek bir NumPy işlemiyle piksel koordinatlarına çevrilir ve tüm kemikler tek
+        bir cv2.polylines çağrısıyla çizilir. Eklemler de sıfır uzunluklu kalın
+        çizgiler olarak tek çağrıda çizilir (yuvarlak uçlar dolu daire verir).
+
+        Args:
+            connections: (başlangıç, bitiş) indeks çiftleri (None ise mp_pose.POSE_CONNECTIONS)
+            joint_color: Eklem rengi (BGR)
+            bone_color: Kemik rengi (BGR)
+            joint_radius: Eklem dairesinin yarıçapı (piksel)
+            bone_thickness: Kemik kalınlığı (piksel)
+        """
+        if connections is None:
+            import mediapipe as mp
+            connections = mp.solutions.pose.POSE_CONNECTIONS
+        self.connections = np.array(sorted(connections), dtype=np.intp).reshape(-1, 2)
+        self.joint_color = joint_color
+        self.bone_color = bone_color
+        self.joint_radius = joint_radius
+        self.bone_thickness = bone_thickness
+
+        self._frame_size = None
+        self._scale = None
+
+    def to_pixels(self, landmark_array, frame_shape):
+        """
+        Normalleştirilmiş eklem noktalarını piksel koordinatlarına çevirir.
+
+        Args:
+            landmark_array: (33, 4) eklem dizisi
+            frame_shape: Karenin şekli (yükseklik, genişlik, ...)
+
+        Returns:
+            np.ndarray: (33, 2) int32 piksel koordinatları
+        """
+        frame_size = frame_shape[:2]
+        if frame_size != self._frame_size:
+            self._frame_size = frame_size
+            self._scale = np.array([frame_size[1], frame_size[0]], dtype=np.float32)
+        return (np.asarray(landmark_array)[:, :2] * self._scale).astype(np.int32)
+
+    def draw(self, frame, landmark_array):
+        """
+        Eklemleri ve kemikleri kareye çizer.
+
+        Args:
+            frame: BGR formatındaki kare (yerinde değiştirilir)
+            landmark_array: (33, 4) eklem dizisi
+        """
+        points = self.to_pixels(landmark_array, frame.shape)
+
+        # Eklemler: her nokta kendisiyle birleşen bir doğru parçası
+        joints = np.repeat(points[:, None, :], 2, axis=1)
+        cv2.polylines(frame, joints, False, self.joint_color, 2 * self.joint_radius)
+
+        # Kemikler: her bağlantı iki noktalı bir doğru parçası
+        bones = points[self.connections]
+        cv2.polylines(frame, bones, False, self.bone_color, self.bone_thickness)
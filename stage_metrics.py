@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from hud import HudLayer
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Canlı döngünün aşamaları (ekran ve metrik dosyasında bu sırayla gösterilir)
+STAGES = ("capture", "convert", "pose", "angles", "state_update", "draw", "display", "frame")
+
+
+class StageMetrics:
+    def __init__(self, window=300, dump_path=None, dump_interval_s=10.0, overlay=False, overlay_interval_s=0.5,
+                 metric_prefix="exercise_validation"):
+        """
+        Kare başına aşama sürelerini toplar ve son window karedeki p50/p95/p99
+        değerlerini hesaplar.
+
+        Her aşama için süreler sabit boyutlu bir halka tamponda tutulur; toplam
+        sayı ve toplam süre de Prometheus özet (summary) metriği için ayrıca
+        biriktirilir. Aşamalar farklı iş parçacıklarından kaydedilebilir.
+
+        Args:
+            window: Yüzdeliklerin hesaplandığı kare sayısı
+            dump_path: Prometheus metin biçiminde metriklerin yazılacağı dosya (None ise yazılmaz)
+            dump_interval_s: Metrik dosyasının yazılma aralığı (s)
+            overlay: True ise canlı döngü yüzdelikleri ekrana çizer (draw_overlay)
+            overlay_interval_s: Ekran katmanının yenilenme aralığı (s)
+            metric_prefix: Prometheus metrik adlarının öneki
+        """
+        self.window = window
+        self.dump_path = dump_path
+        self.dump_interval_s = dump_interval_s
+        self.overlay = overlay
+        self.overlay_interval_s = overlay_interval_s
+        self.metric_prefix = metric_prefix
+
+        self._lock = threading.Lock()
+        self._samples = {}  # aşama -> (halka tampon, [yazma konumu, örnek sayısı, toplam ms])
+        self._last_frame_at = None
+        self._last_dump_at = time.perf_counter()
+        self._last_overlay_at = None
+        self._overlay = HudLayer()
+
+    def lap(self, stage, since):
+        """
+        since anından bu yana geçen süreyi aşamanın süresi olarak kaydeder.
+
+        Args:
+            stage: Aşama adı
+            since: Aşamanın başladığı an (time.perf_counter saniyesi)
+
+        Returns:
+            float: Şimdiki an; sonraki aşamanın başlangıcı olarak kullanılabilir
+        """
+        now = time.perf_counter()
+        self.record(stage, (now - since) * 1000.0)
+        return now
+
+    def record(self, stage, duration_ms):
+        """
+        Bir aşama süresini kaydeder.
+
+        Args:
+            stage: Aşama adı
+            duration_ms: Süre (ms)
+        """
+        with self._lock:
+            entry = self._samples.get(stage)
+            if entry is None:
+                entry = self._samples[stage] = (np.zeros(self.window, dtype=np.float64), [0, 0, 0.0])
+            ring, counters = entry
+            ring[counters[0]] = duration_ms
+            counters[0] = (counters[0] + 1) % self.window
+            counters[1] += 1
+            counters[2] += duration_ms
+
+    def end_frame(self):
+        """
+        Kare sonunu işaretler: kareler arası süreyi "frame" aşaması olarak kaydeder
+        ve gerekiyorsa metrik dosyasını yazar.
+        """
+        now = time.perf_counter()
+        if self._last_frame_at is not None:
+            self.record("frame", (now - self._last_frame_at) * 1000.0)
+        self._last_frame_at = now
+        if self.dump_path and now - self._last_dump_at >= self.dump_interval_s:
+            self._last_dump_at = now
+            self.dump()
+
+    def summary(self):
+        """
+        Aşama başına son penceredeki yüzdelikleri döndürür.
+
+        Returns:
+            dict: aşama -> {"p50", "p95", "p99", "mean", "count", "sum_ms"}
+        """
+        with self._lock:
+            snapshot = {
+                stage: (ring[:min(counters[1], self.window)].copy(), counters[1], counters[2])
+                for stage, (ring, counters) in self._samples.items()
+            }
+        summary = {}
+        for stage, (values, count, total) in snapshot.items():
+            if values.size == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, [q * 100 for q in QUANTILES])
+            summary[stage] = {"p50": p50, "p95": p95, "p99": p99, "mean": values.mean(), "count": count,
+                              "sum_ms": total}
+        return summary
+
+    def fps(self, summary=None):
+        """
+        Son penceredeki ortalama kare hızı.
+        """
+        summary = self.summary() if summary is None else summary
+        frame = summary.get("frame")
+        if frame is None or frame["mean"] <= 0:
+            return 0.0
+        return 1000.0 / frame["mean"]
+
+    def _ordered(self, summary):
+        known = [stage for stage in STAGES if stage in summary]
+        return known + sorted(stage for stage in summary if stage not in STAGES)
+
+    def draw_overlay(self, frame, origin=(20, 240)):
+        """
+        Aşama yüzdeliklerini kareye çizer. Metin overlay_interval_s aralıklarla yenilenir.
+
+        Args:
+            frame: BGR formatındaki kare (yerinde değiştirilir)
+            origin: İlk satırın sol alt köşesi
+        """
+        now = time.perf_counter()
+        if self._last_overlay_at is None or now - self._last_overlay_at >= self.overlay_interval_s:
+            self._last_overlay_at = now
+            summary = self.summary()
+            x, y = origin
+            lines = [(f"FPS {self.fps(summary):5.1f}   p50 / p95 / p99 ms", (x, y), 0.6, (0, 255, 255), 1)]
+            for i, stage in enumerate(self._ordered(summary), start=1):
+                values = summary[stage]
+                lines.append((f"{stage:<13}{values['p50']:7.1f}{values['p95']:7.1f}{values['p99']:7.1f}",
+                              (x, y + i * 22), 0.6, (0, 255, 255), 1))
+            self._overlay.set_lines(lines)
+        self._overlay.draw(frame)
+
+    def prometheus_text(self):
+        """
+        Metrikleri Prometheus metin biçiminde döndürür.
+        """
+        summary = self.summary()
+        name = f"{self.metric_prefix}_stage_latency_ms"
+        lines = [
+            f"# HELP {name} Canlı döngü aşama süreleri (son {self.window} kare üzerinden yüzdelikler).",
+            f"# TYPE {name} summary",
+        ]
+        for stage in self._ordered(summary):
+            values = summary[stage]
+            for quantile in QUANTILES:
+                value = values[f"p{round(quantile * 100)}"]
+                lines.append(f'{name}{{stage="{stage}",quantile="{quantile}"}} {value:.4f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {values["sum_ms"]:.4f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {values["count"]}')
+        fps_name = f"{self.metric_prefix}_fps"
+        lines += [
+            f"# HELP {fps_name} Son penceredeki ortalama kare hızı.",
+            f"# TYPE {fps_name} gauge",
+            f"{fps_name} {self.fps(summary):.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=None):
+        """
+        Metrikleri dosyaya yazar. Dosya geçici bir dosyaya yazılıp yer değiştirilir;
+        böylece okuyucular (örneğin node_exporter textfile toplayıcısı) yarım dosya görmez.
+        """
+        path = path or self.dump_path
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temporary_path, path)
@@ -0,0 +1,383 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from angle_engine import NUM_LANDMARKS, LANDMARK_FIELDS
+from exercise_specs import DECREASING, EXERCISE_SPECS, get_spec
+from peak_detector import COUNTING_METHODS, FSM_COUNTING, PEAK_COUNTING
+
+# Ayakta, kameraya dönük bir kişinin normalize (x, y, z) eklem koordinatları.
+# MediaPipe'ta olduğu gibi "sol" eklemler görüntünün sağ tarafındadır.
+BASE_POSE = np.array([
+    (0.500, 0.180, -0.30),  # 0 burun
+    (0.510, 0.165, -0.28), (0.520, 0.165, -0.28), (0.530, 0.165, -0.28),  # 1-3 sol göz
+    (0.490, 0.165, -0.28), (0.480, 0.165, -0.28), (0.470, 0.165, -0.28),  # 4-6 sağ göz
+    (0.545, 0.175, -0.15), (0.455, 0.175, -0.15),  # 7-8 kulaklar
+    (0.515, 0.200, -0.26), (0.485, 0.200, -0.26),  # 9-10 ağız
+    (0.580, 0.280, -0.05), (0.420, 0.280, -0.05),  # 11-12 omuzlar
+    (0.600, 0.400, -0.03), (0.400, 0.400, -0.03),  # 13-14 dirsekler
+    (0.610, 0.510, -0.05), (0.390, 0.510, -0.05),  # 15-16 bilekler
+    (0.615, 0.540, -0.06), (0.385, 0.540, -0.06),  # 17-18 serçe parmaklar
+    (0.610, 0.550, -0.07), (0.390, 0.550, -0.07),  # 19-20 işaret parmakları
+    (0.600, 0.530, -0.06), (0.400, 0.530, -0.06),  # 21-22 başparmaklar
+    (0.550, 0.550, 0.00), (0.450, 0.550, 0.00),  # 23-24 kalçalar
+    (0.555, 0.720, 0.02), (0.445, 0.720, 0.02),  # 25-26 dizler
+    (0.560, 0.880, 0.06), (0.440, 0.880, 0.06),  # 27-28 ayak bilekleri
+    (0.565, 0.900, 0.08), (0.435, 0.900, 0.08),  # 29-30 topuklar
+    (0.575, 0.920, -0.02), (0.425, 0.920, -0.02),  # 31-32 ayak uçları
+], dtype=np.float64)
+
+UPPER_BODY = tuple(range(23))
+
+# Eklem üçlüsü -> (hareket eden uç, o uçla birlikte b etrafında dönen eklemler).
+# Listede olmayan üçlülerde yalnızca c noktası döner.
+MOTION_CHAINS = {
+    (23, 25, 27): (27, (27, 29, 31)),  # Baldır ve ayak dizin etrafında
+    (0, 11, 12): (0, tuple(range(11))),  # Baş sol omuz etrafında
+    (11, 13, 15): (15, (15, 17, 19, 21)),  # Ön kol ve el dirseğin etrafında
+    (23, 11, 13): (13, (13, 15, 17, 19, 21)),  # Tüm kol omzun etrafında
+    (11, 23, 25): (11, UPPER_BODY),  # Gövde kalçanın etrafında
+    (11, 23, 27): (11, UPPER_BODY),
+    (24, 23, 25): (25, (25, 27, 29, 31)),  # Bacak kalçanın etrafında (yana açılma)
+}
+
+BLOCK_FRAMES = 4096  # Gürültü bu boyuttaki bloklar halinde üretilir (parçalı üretimden bağımsız sonuç)
+SWAY_PERIOD_S = 7.0  # Gövde salınımının periyodu
+
+
+class SyntheticExercise:
+    def __init__(self, exercise_name, repetitions=10, rep_duration_s=2.5, tempo_variation=0.1, range_of_motion=1.0,
+                 range_variation=0.05, hold_fraction=0.3, lead_in_s=1.0, fps=30.0, timestamp_jitter_ms=0.0,
+                 jitter=0.002, sway=0.005, dropout_rate=0.0, dropout_frames=3, occlusion_rate=0.0, seed=None,
+                 block_frames=BLOCK_FRAMES):
+        """
+        Bir egzersizin tekrarlarını yapan kişinin 33 eklemlik kare dizisini üretir.
+
+        Egzersiz açısı dinlenme açısından (tanımdaki hareket aralığının dinlenme
+        ucu) hareket ucuna yumuşak (kosinüs) bir eğriyle gidip döner; her tekrar
+        iniş, altta bekleme, çıkış ve üstte bekleme evrelerinden oluşur. Açı,
+        tanımdaki (a, b, c) üçlüsünün hareket eden ucunu (ve ona bağlı eklemleri)
+        b etrafında döndürerek iskelete uygulanır; ardından gövde salınımı, eklem
+        gürültüsü, görünürlük düşüşleri ve poz kayıpları eklenir.
+
+        Tüm üretim vektöreldir; kareler istenen aralık için tek seferde veya
+        parça parça (chunks) üretilebilir. Tekrar zamanları ve tempo kurulumda
+        belirlenir; gürültü block_frames karelik bloklar halinde seed ve blok
+        numarasından üretildiği için sonuç parça boyutundan bağımsızdır.
+
+        Args:
+            exercise_name: EXERCISE_SPECS anahtarı
+            repetitions: Tekrar sayısı
+            rep_duration_s: Bir tekrarın ortalama süresi (s)
+            tempo_variation: Tekrar süresinin göreli standart sapması
+            range_of_motion: Hareket aralığının kullanılan oranı (1.0 tam aralık;
+                küçük değerler eşiğe ulaşmayan, sayılmaması gereken tekrarlar üretir)
+            range_variation: Tekrar başına hareket aralığının göreli standart sapması
+            hold_fraction: Tekrar süresinin altta ve üstte beklemeye ayrılan oranı
+            lead_in_s: İlk tekrardan önce ve son tekrardan sonra dinlenme süresi (s)
+            fps: Kare hızı
+            timestamp_jitter_ms: Zaman damgalarına eklenen düzgün dağılımlı sapma (ms)
+            jitter: Eklem koordinatlarına eklenen gürültünün standart sapması (normalize)
+            sway: Gövde salınımının genliği (normalize)
+            dropout_rate: Poz bulunamayan karelerin yaklaşık oranı (NaN kareler)
+            dropout_frames: Bir poz kaybının sürdüğü kare sayısı
+            occlusion_rate: Görünürlüğü düşük (0-0.3) eklemlerin oranı
+            seed: Rastgele sayı üreteci tohumu
+            block_frames: Gürültü bloğu boyu; aynı seed farklı blok boyunda farklı
+                gürültü üretir. Çok sayıda oturumun küçük parçalarla üretildiği
+                yük testlerinde her parçanın tam blok hesaplamaması için küçültülür.
+        """
+        self.spec = get_spec(exercise_name)
+        self.exercise_name = exercise_name
+        self.repetitions = repetitions
+        self.fps = fps
+        self.timestamp_jitter_ms = min(timestamp_jitter_ms, 0.49 * 1000.0 / fps)
+        self.jitter = jitter
+        self.sway = sway
+        self.dropout_rate = dropout_rate
+        self.dropout_frames = max(1, int(dropout_frames))
+        self.occlusion_rate = occlusion_rate
+        self.block_frames = max(1, int(block_frames))
+        self.seed = np.random.SeedSequence(seed).entropy if seed is None else seed
+
+        # Egzersiz açısının dinlenme ve hareket uçları
+        if self.spec.direction == DECREASING:
+            self.rest_angle, self.peak_angle = self.spec.max_angle, self.spec.min_angle
+        else:
+            self.rest_angle, self.peak_angle = self.spec.min_angle, self.spec.max_angle
+
+        # Tekrar planı: süreler ve derinlikler kurulumda belirlenir
+        rng = np.random.default_rng([self.seed, 0])
+        durations_ms = rep_duration_s * 1000.0 * np.clip(
+            1.0 + tempo_variation * rng.standard_normal(repetitions), 0.5, 1.5)
+        self.depths = np.clip(range_of_motion * (1.0 + range_variation * rng.standard_normal(repetitions)), 0.0, 1.0)
+        self.move_ms = durations_ms * (1.0 - hold_fraction) / 2.0  # İniş ve çıkış
+        self.hold_ms = durations_ms * hold_fraction / 2.0  # Altta ve üstte bekleme
+        self.rep_start_ms = lead_in_s * 1000.0 + np.concatenate(([0.0], np.cumsum(durations_ms)[:-1]))
+        self.duration = lead_in_s * 2000.0 + durations_ms.sum()
+        self.frame_count = int(self.duration * fps / 1000.0) + 1
+
+        # Ground truth: tekrarın en alt noktası ve dinlenme açısına dönüş anı
+        self.rep_bottom_ms = self.rep_start_ms + self.move_ms + self.hold_ms / 2.0
+        self.rep_times_ms = self.rep_start_ms + 2.0 * self.move_ms + self.hold_ms
+
+        self._prepare_chain()
+
+    def _prepare_chain(self):
+        """
+        Hareket eden ucun b etrafındaki dönüş yönünü ve başlangıç açısını hesaplar.
+        """
+        a, b, c = self.spec.landmark_indices
+        moving, chain = MOTION_CHAINS.get((a, b, c), (c, (c,)))
+        fixed = a if moving == c else c
+        self.pivot = b
+        self.chain = np.array(chain, dtype=np.intp)
+
+        to_fixed = BASE_POSE[fixed, :2] - BASE_POSE[b, :2]
+        to_moving = BASE_POSE[moving, :2] - BASE_POSE[b, :2]
+        self.fixed_direction = np.arctan2(to_fixed[1], to_fixed[0])
+        self.moving_direction = np.arctan2(to_moving[1], to_moving[0])
+        # Hareket eden uç sabit uca göre hangi taraftaysa dönüş o tarafta kalır
+        offset = np.angle(np.exp(1j * (self.moving_direction - self.fixed_direction)))
+        self.side = 1.0 if offset >= 0 else -1.0
+
+    def __len__(self):
+        return self.frame_count
+
+    def duration_ms(self):
+        """
+        Dizinin süresi (ms).
+        """
+        return self.duration
+
+    def exercise_angles(self, timestamps_ms):
+        """
+        Verilen anlardaki gerçek (gürültüsüz) egzersiz açıları.
+
+        Args:
+            timestamps_ms: Zaman damgaları (ms)
+
+        Returns:
+            np.ndarray: Derece cinsinden egzersiz açıları
+        """
+        t = np.asarray(timestamps_ms, dtype=np.float64)
+        rep = np.searchsorted(self.rep_start_ms, t, side="right") - 1
+        valid = rep >= 0
+        rep = np.maximum(rep, 0)
+        local = t - self.rep_start_ms[rep]
+        move = self.move_ms[rep]
+        hold = self.hold_ms[rep]
+
+        def ease(x):
+            return (1.0 - np.cos(np.pi * np.clip(x, 0.0, 1.0))) / 2.0
+
+        # İniş -> altta bekleme -> çıkış -> üstte bekleme
+        progress = np.where(local < move + hold, ease(local / move), 1.0 - ease((local - move - hold) / move))
+        progress = np.where(valid, progress * self.depths[rep], 0.0)
+        return self.rest_angle + progress * (self.peak_angle - self.rest_angle)
+
+    def joint_angles(self, timestamps_ms):
+        """
+        Üçlünün b noktasındaki eklem açısı (invert tanımlıysa 180 - egzersiz açısı).
+        """
+        angles = self.exercise_angles(timestamps_ms)
+        return 180.0 - angles if self.spec.invert else angles
+
+    def _block(self, block):
+        """
+        block numaralı block_frames karelik bloğu üretir.
+        """
+        start = block * self.block_frames
+        stop = min(start + self.block_frames, self.frame_count)
+        n = stop - start
+        rng = np.random.default_rng([self.seed, block + 1])
+
+        timestamps_ms = np.arange(start, stop) * (1000.0 / self.fps)
+        if self.timestamp_jitter_ms > 0:
+            timestamps_ms += rng.uniform(-self.timestamp_jitter_ms, self.timestamp_jitter_ms, n)
+            timestamps_ms = np.maximum(timestamps_ms, 0.0)
+
+        landmarks = np.empty((n, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+        xyz = np.broadcast_to(BASE_POSE, (n, NUM_LANDMARKS, 3)).copy()
+
+        # Hareket eden zinciri b etrafında hedef açıya döndür
+        rotation = self.fixed_direction + self.side * np.radians(self.joint_angles(timestamps_ms)) \
+            - self.moving_direction
+        cos, sin = np.cos(rotation)[:, None], np.sin(rotation)[:, None]
+        pivot = BASE_POSE[self.pivot, :2]
+        relative = BASE_POSE[self.chain, :2] - pivot
+        xyz[:, self.chain, 0] = pivot[0] + cos * relative[:, 0] - sin * relative[:, 1]
+        xyz[:, self.chain, 1] = pivot[1] + sin * relative[:, 0] + cos * relative[:, 1]
+
+        # Gövde salınımı ve eklem gürültüsü
+        if self.sway > 0:
+            phase = 2.0 * np.pi * timestamps_ms / (SWAY_PERIOD_S * 1000.0) + (self.seed % 1000)
+            xyz[:, :, 0] += (self.sway * np.sin(phase))[:, None]
+            xyz[:, :, 1] += (0.3 * self.sway * np.sin(2.0 * phase))[:, None]
+        landmarks[:, :, :3] = xyz
+        if self.jitter > 0:
+            landmarks[:, :, :3] += rng.normal(0.0, self.jitter, (n, NUM_LANDMARKS, 3)).astype(np.float32)
+
+        # Görünürlük: çoğunlukla yüksek, occlusion_rate oranında düşük
+        visibility = rng.uniform(0.9, 1.0, (n, NUM_LANDMARKS)).astype(np.float32)
+        if self.occlusion_rate > 0:
+            occluded = rng.random((n, NUM_LANDMARKS)) < self.occlusion_rate
+            visibility[occluded] = rng.uniform(0.0, 0.3, occluded.sum())
+        landmarks[:, :, 3] = visibility
+
+        # Poz kayıpları: dropout_frames uzunluğunda NaN kare dizileri
+        if self.dropout_rate > 0:
+            starts = rng.random(n) < self.dropout_rate / self.dropout_frames
+            lost = np.convolve(starts, np.ones(self.dropout_frames), mode="full")[:n] > 0
+            landmarks[lost] = np.nan
+        return timestamps_ms, landmarks
+
+    def generate(self, start=0, stop=None):
+        """
+        [start, stop) aralığındaki kareleri üretir.
+
+        Returns:
+            tuple: ((n,) zaman damgaları ms, (n, 33, 4) float32 eklemler; poz kaybında NaN)
+        """
+        stop = self.frame_count if stop is None else min(stop, self.frame_count)
+        if start >= stop:
+            return np.zeros(0), np.zeros((0, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+        size = self.block_frames
+        blocks = [self._block(block) for block in range(start // size, (stop - 1) // size + 1)]
+        offset = start - (start // size) * size
+        timestamps_ms = np.concatenate([block[0] for block in blocks])[offset:offset + stop - start]
+        landmarks = np.concatenate([block[1] for block in blocks])[offset:offset + stop - start]
+        return timestamps_ms, landmarks
+
+    def chunks(self, chunk_frames=BLOCK_FRAMES * 16):
+        """
+        Tüm diziyi chunk_frames karelik parçalar halinde üretir (bellek sınırlı üretim için).
+
+        Yields:
+            tuple: ((n,) zaman damgaları ms, (n, 33, 4) eklemler)
+        """
+        for start in range(0, self.frame_count, chunk_frames):
+            yield self.generate(start, start + chunk_frames)
+
+    def ground_truth(self):
+        """
+        Üretilen dizinin gerçek tekrar bilgileri.
+
+        Returns:
+            dict: Egzersiz, tekrar sayısı ve tekrar zamanları (en alt nokta ve tamamlanma)
+        """
+        return {
+            "exercise": self.exercise_name,
+            "frames": self.frame_count,
+            "fps": self.fps,
+            "duration_ms": round(self.duration, 1),
+            "repetition_count": self.repetitions,
+            "rep_bottom_ms": [round(float(t), 1) for t in self.rep_bottom_ms],
+            "rep_times_ms": [round(float(t), 1) for t in self.rep_times_ms],
+            "range_of_motion": [round(float(depth), 3) for depth in self.depths],
+        }
+
+
+def synthetic_sessions(count, exercise_names=None, seed=0, **options):
+    """
+    Çok oturumlu yük testleri için farklı egzersiz, tempo ve gürültüye sahip
+    üreteçler oluşturur.
+
+    Args:
+        count: Oturum sayısı
+        exercise_names: Oturumlara sırayla dağıtılacak egzersizler (None ise tümü)
+        seed: Tohum; oturum i'nin tohumu (seed, i)'den türetilir
+        **options: Tüm oturumlara verilecek SyntheticExercise argümanları
+
+    Returns:
+        list: SyntheticExercise nesneleri
+    """
+    exercise_names = list(EXERCISE_SPECS) if exercise_names is None else list(exercise_names)
+    rng = np.random.default_rng(seed)
+    sessions = []
+    for i in range(count):
+        session_options = {"rep_duration_s": float(rng.uniform(1.8, 3.5)), "lead_in_s": float(rng.uniform(0.5, 2.0))}
+        session_options.update(options)
+        sessions.append(SyntheticExercise(exercise_names[i % len(exercise_names)], seed=seed * 1000003 + i,
+                                          **session_options))
+    return sessions
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Sentetik eklem dizileri üretir (.lmk kaydı ve gerçek tekrar zamanları)")
+    parser.add_argument("exercise", choices=list(EXERCISE_SPECS))
+    parser.add_argument("--output", default=None, help="Yazılacak .lmk kayıt dosyası")
+    parser.add_argument("--truth", default=None, help="Gerçek tekrar bilgilerinin yazılacağı JSON dosyası (- ise standart çıktı)")
+    parser.add_argument("--reps", type=int, default=10, help="Tekrar sayısı")
+    parser.add_argument("--rep-duration", type=float, default=2.5, help="Ortalama tekrar süresi (s)")
+    parser.add_argument("--tempo-variation", type=float, default=0.1)
+    parser.add_argument("--range-of-motion", type=float, default=1.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--timestamp-jitter", type=float, default=0.0, help="Zaman damgası sapması (ms)")
+    parser.add_argument("--jitter", type=float, default=0.002, help="Eklem gürültüsü (normalize)")
+    parser.add_argument("--dropout-rate", type=float, default=0.0, help="Poz bulunamayan kare oranı")
+    parser.add_argument("--occlusion-rate", type=float, default=0.0, help="Düşük görünürlüklü eklem oranı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true",
+                        help="Diziyi ExerciseDetection'dan geçirip sayılan tekrarları gerçek değerle karşılaştır")
+    parser.add_argument("--counting", choices=COUNTING_METHODS, default=FSM_COUNTING,
+                        help="--check için tekrar sayma yöntemi")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    synthetic = SyntheticExercise(
+        args.exercise, repetitions=args.reps, rep_duration_s=args.rep_duration,
+        tempo_variation=args.tempo_variation, range_of_motion=args.range_of_motion, fps=args.fps,
+        timestamp_jitter_ms=args.timestamp_jitter, jitter=args.jitter, dropout_rate=args.dropout_rate,
+        occlusion_rate=args.occlusion_rate, seed=args.seed)
+
+    start = time.perf_counter()
+    frames = 0
+    recorder = None
+    if args.output:
+        from landmark_recording import LandmarkRecorder
+        recorder = LandmarkRecorder(args.output, append=False)
+    try:
+        for timestamps_ms, landmarks in synthetic.chunks():
+            frames += len(timestamps_ms)
+            if recorder is not None:
+                recorder.write_batch(timestamps_ms, landmarks)
+    finally:
+        if recorder is not None:
+            recorder.close()
+    elapsed = time.perf_counter() - start
+    print(f"{args.exercise}: {frames} kare, {synthetic.duration_ms() / 1000:.1f} s, "
+          f"{frames / elapsed:,.0f} kare/s üretildi", file=sys.stderr)
+
+    truth = synthetic.ground_truth()
+    if args.truth:
+        if args.truth == "-":
+            json.dump(truth, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        else:
+            with open(args.truth, "w", encoding="utf-8") as f:
+                json.dump(truth, f, ensure_ascii=False, indent=2)
+
+    if args.check:
+        from replay import replay_engine
+        timestamps_ms, landmarks = synthetic.generate()
+        peak_counting = [args.exercise] if args.counting == PEAK_COUNTING else []
+        results, _ = replay_engine(timestamps_ms, landmarks, [args.exercise], peak_counting)
+        counted = results[args.exercise][0]
+        expected = truth["repetition_count"] if args.range_of_motion >= 1.0 else None
+        print(f"Sayılan tekrar: {counted}, gerçek: {truth['repetition_count']}", file=sys.stderr)
+        if expected is not None and counted != expected:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
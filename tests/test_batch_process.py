@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+from batch_process import collect_videos, main, output_names, recording_path, write_result
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+    return path
+
+
+def test_same_basename_in_different_directories(tmp_path):
+    first = touch(str(tmp_path / "a" / "x.mp4"))
+    second = touch(str(tmp_path / "b" / "x.mp4"))
+    videos = collect_videos([str(tmp_path / "a"), str(tmp_path / "b")])
+    assert videos == [first, second]
+    names = output_names(videos)
+    assert names == {first: os.path.join("a", "x"), second: os.path.join("b", "x")}
+
+    output_dir = str(tmp_path / "out")
+    paths = [write_result({"video": video}, output_dir, names[video]) for video in videos]
+    assert len(set(paths)) == 2
+    for video, path in zip(videos, paths):
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["video"] == video
+    assert recording_path(names[first], str(tmp_path / "rec")) == str(tmp_path / "rec" / "a" / "x.lmk")
+    assert os.path.isdir(tmp_path / "rec" / "a")
+
+
+def test_single_directory_keeps_plain_names(tmp_path):
+    videos = [touch(str(tmp_path / name)) for name in ("x.mp4", "y.avi")]
+    assert list(output_names(videos).values()) == ["x", "y"]
+
+
+def test_duplicate_inputs_are_processed_once(tmp_path):
+    video = touch(str(tmp_path / "x.mp4"))
+    assert collect_videos([video, str(tmp_path), os.path.join(str(tmp_path), ".", "x.mp4")]) == [video]
+
+
+def test_colliding_names_are_rejected(tmp_path):
+    videos = [touch(str(tmp_path / "x.mp4")), touch(str(tmp_path / "x.avi"))]
+    with pytest.raises(ValueError):
+        output_names(videos)
+    assert main([str(tmp_path), "--exercise", "squat", "--output", str(tmp_path / "out")]) == 1
+    assert not os.path.exists(tmp_path / "out")
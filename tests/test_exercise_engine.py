@@ -0,0 +1,308 @@
+import math
+
+import numpy as np
+import pytest
+
+import exercise_classes
+from exercise_detection import ExerciseDetection
+from angle_engine import AngleEngine
+from exercise_engine import (NOMINAL_FRAME_MS, REQUIRED_STABLE_MS, SCALAR_MAX_ROWS, STATE_FIELDS, ExerciseEngine,
+                             advance_state_machines)
+from exercise_specs import DECREASING, EXERCISE_SPECS, ExerciseSpec, get_spec
+
+# Tanım registrisinden önceki sınıfların eşikleri:
+# (ad, sınıf, eklemler, invert, azalan, threshold, min, max, tekrar payı, (dinlenme, hareket))
+BASELINE_CLASSES = [
+    ("squat", "Squat", (23, 25, 27), False, True, 120, 90, 170, 20, ("up", "down")),
+    ("neck_flexion_extension", "NeckFlexionExtension", (0, 11, 12), False, True, 150, 130, 170, 20, ("up", "down")),
+    ("shoulder_region", "ShoulderRegion", (11, 13, 15), False, True, 100, 80, 160, 20, ("down", "up")),
+    ("arm_raise_lateral_front", "ArmRaiseLateralFront", (23, 11, 13), False, False, 90, 30, 150, 20, ("down", "up")),
+    ("thoracic_extension", "ThoracicExtension", (11, 23, 25), False, True, 160, 140, 180, 20, ("up", "down")),
+    ("lumbar_side_bending_flexion", "LumbarSideBendingFlexion", (11, 23, 27), False, True, 160, 140, 180, 20,
+     ("up", "down")),
+    ("hip_abduction", "HipAbduction", (24, 23, 25), False, False, 30, 10, 45, 10, ("closed", "open")),
+    ("knee_flexion_extension", "KneeFlexionExtension", (23, 25, 27), False, True, 120, 90, 170, 20,
+     ("extended", "flexed")),
+    ("leg_raise_straight_leg_raise", "LegRaiseStraightLegRaise", (23, 25, 27), True, False, 45, 10, 60, 10,
+     ("down", "up")),
+    ("abdominal_crunches", "AbdominalCrunches", (11, 23, 25), False, True, 130, 100, 170, 20, ("down", "up")),
+]
+
+
+class BaselineExercise:
+    def __init__(self, name, class_name, indices, invert, decreasing, threshold, min_angle, max_angle,
+                 return_margin, states):
+        """
+        Registri öncesindeki egzersiz sınıflarının kare sayısına dayalı durum makinesi
+        (açı farkı 5°'den küçük 5 kare kararlılık, max - 10 / min + 10 ile başlama).
+        """
+        self.name = name
+        self.indices = indices
+        self.invert = invert
+        self.decreasing = decreasing
+        self.threshold = threshold
+        self.min_angle = min_angle
+        self.max_angle = max_angle
+        self.return_margin = return_margin
+        self.rest, self.moving = states
+        self.state = "up"
+        self.repetition_count = 0
+        self.stable_frames = 0
+        self.previous_angle = None
+        self.in_progress = False
+
+    def angle(self, landmarks):
+        (a_x, a_y), (b_x, b_y), (c_x, c_y) = (landmarks[i, :2].astype(np.float64) for i in self.indices)
+        ba_x, ba_y, bc_x, bc_y = a_x - b_x, a_y - b_y, c_x - b_x, c_y - b_y
+        cosine = (ba_x * bc_x + ba_y * bc_y) / (math.hypot(ba_x, ba_y) * math.hypot(bc_x, bc_y))
+        angle = math.degrees(math.acos(min(1.0, max(-1.0, cosine))))
+        return 180 - angle if self.invert else angle
+
+    def is_stable(self, angle):
+        if self.previous_angle is None:
+            self.previous_angle = angle
+            return False
+        self.stable_frames = self.stable_frames + 1 if abs(angle - self.previous_angle) < 5 else 0
+        self.previous_angle = angle
+        return self.stable_frames >= 5
+
+    def update_angle(self, angle):
+        if not self.is_stable(angle):
+            return
+        if self.decreasing:
+            starting, moving, returning = (angle > self.max_angle - 10, angle < self.threshold,
+                                           angle > self.max_angle - self.return_margin)
+        else:
+            starting, moving, returning = (angle < self.min_angle + 10, angle > self.threshold,
+                                           angle < self.min_angle + self.return_margin)
+        if not self.in_progress and starting:
+            self.in_progress = True
+            self.state = self.rest
+            return
+        if self.in_progress:
+            if moving and self.state == self.rest:
+                self.state = self.moving
+            elif returning and self.state == self.moving:
+                self.state = self.rest
+                self.repetition_count += 1
+
+
+def baseline_exercises():
+    return [BaselineExercise(*row) for row in BASELINE_CLASSES]
+
+
+def angle_stream(frames, seed):
+    """
+    Her egzersiz için 0-180° arasında gezinen, yer yer sıçramalı rastgele açı dizisi.
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 2.5, (frames, len(BASELINE_CLASSES)))
+    jumps = rng.random(steps.shape) < 0.01
+    steps[jumps] = rng.normal(0.0, 40.0, jumps.sum())
+    angles = rng.uniform(0, 180, len(BASELINE_CLASSES)) + np.cumsum(steps, axis=0)
+    # [0, 180] aralığına yansıt
+    return 180.0 - np.abs(180.0 - np.mod(angles, 360.0))
+
+
+def landmark_walk(frames, seed):
+    """
+    Tüm eklemlerin görüntü içinde yavaşça gezindiği (33, 4) kare dizisi.
+    """
+    rng = np.random.default_rng(seed)
+    landmarks = np.empty((frames, 33, 4), dtype=np.float32)
+    current = rng.random((33, 4)).astype(np.float32)
+    for t in range(frames):
+        current[:, :2] = np.clip(current[:, :2] + rng.normal(0, 0.01, (33, 2)).astype(np.float32), 0, 1)
+        landmarks[t] = current
+    return landmarks
+
+
+def assert_matches(baseline, states, counts):
+    assert [exercise.state for exercise in baseline] == list(states)
+    assert [exercise.repetition_count for exercise in baseline] == list(counts)
+
+
+def test_registry_matches_baseline_classes():
+    assert list(EXERCISE_SPECS) == [row[0] for row in BASELINE_CLASSES]
+    for name, class_name, indices, invert, *_, states in BASELINE_CLASSES:
+        spec = EXERCISE_SPECS[name]
+        assert spec.landmark_indices == indices
+        assert spec.invert == invert
+        assert spec.states == states
+        assert exercise_classes.EXERCISE_CLASSES[name].__name__ == class_name
+
+
+def test_engine_matches_baseline_on_angle_stream():
+    angles = angle_stream(20000, seed=0)
+    engine = ExerciseEngine(list(EXERCISE_SPECS.values()))
+    rows = np.arange(len(BASELINE_CLASSES))
+    baseline = baseline_exercises()
+    for t, frame_angles in enumerate(angles):
+        engine.update_angles(frame_angles, rows, t * NOMINAL_FRAME_MS)
+        for exercise, angle in zip(baseline, frame_angles):
+            exercise.update_angle(float(angle))
+        assert_matches(baseline, [engine.get_state(row) for row in rows], engine.repetition_count)
+    # Akış tüm egzersizlerde tekrar üretmeli; aksi halde karşılaştırma anlamsız kalır
+    assert all(exercise.repetition_count > 0 for exercise in baseline)
+
+
+def test_exercise_classes_match_baseline():
+    angles = angle_stream(5000, seed=1)
+    baseline = baseline_exercises()
+    exercises = [getattr(exercise_classes, row[1])() for row in BASELINE_CLASSES]
+    for frame_angles in angles:
+        for exercise, reference, angle in zip(exercises, baseline, frame_angles):
+            exercise.update_angle(float(angle))
+            reference.update_angle(float(angle))
+        assert_matches(baseline, [exercise.get_state() for exercise in exercises],
+                       [exercise.get_repetition_count() for exercise in exercises])
+
+
+@pytest.mark.parametrize("monitor_all", [True, False])
+def test_detection_matches_baseline_on_landmarks(monitor_all):
+    detection = ExerciseDetection(monitor_all=monitor_all)
+    if not monitor_all:
+        detection.subscribe(*EXERCISE_SPECS)
+    baseline = baseline_exercises()
+    for landmarks in landmark_walk(5000, seed=2):
+        detection.detect_exercises(landmarks)
+        for exercise in baseline:
+            exercise.update_angle(exercise.angle(landmarks))
+        assert_matches(baseline, [detection.exercises[exercise.name].get_state() for exercise in baseline],
+                       [detection.exercises[exercise.name].get_repetition_count() for exercise in baseline])
+
+
+@pytest.mark.parametrize("exercise_name", list(EXERCISE_SPECS))
+def test_single_subscription_matches_baseline_on_landmarks(exercise_name):
+    detection = ExerciseDetection(monitor_all=False)
+    detection.subscribe(exercise_name)
+    exercise = detection.exercises[exercise_name]
+    reference = next(exercise for exercise in baseline_exercises() if exercise.name == exercise_name)
+    for landmarks in landmark_walk(3000, seed=3):
+        detection.detect_exercises(landmarks)
+        reference.update_angle(reference.angle(landmarks))
+        assert (exercise.get_state(), exercise.get_repetition_count()) == (reference.state, reference.repetition_count)
+
+
+def test_scalar_angles_match_vectorized():
+    engine = AngleEngine(spec.landmark_indices for spec in EXERCISE_SPECS.values())
+    landmarks = landmark_walk(200, seed=4)
+    landmarks[7, 25, :2] = landmarks[7, 23, :2]  # Sıfır uzunluklu kol: NaN
+    for frame in landmarks:
+        np.testing.assert_allclose(engine.compute_scalar(frame), engine.compute(frame), rtol=0, atol=1e-9)
+
+
+def test_scalar_step_matches_vectorized_step():
+    specs = list(EXERCISE_SPECS.values())[:SCALAR_MAX_ROWS]
+    specs[0] = ExerciseSpec("dwell", "Dwell", specs[0].landmark_indices, specs[0].min_angle, specs[0].max_angle,
+                            specs[0].threshold_angle, specs[0].start_angle, specs[0].return_angle,
+                            specs[0].direction, specs[0].states, min_dwell_ms=400.0)
+    scalar, vectorized = ExerciseEngine(specs), ExerciseEngine(specs)
+    rows = np.arange(len(specs))
+    rng = np.random.default_rng(5)
+    angles = angle_stream(20000, seed=5)[:, :len(specs)]
+    angles[rng.random(angles.shape) < 0.005] = np.nan
+    # Değişken kare aralıkları, uzun boşluklar, tekrarlanan ve geri giden zaman damgaları
+    timestamps_ms = np.cumsum(rng.choice([0.0, 16.7, 33.3, 50.0, 1500.0, -40.0], len(angles),
+                                         p=[0.01, 0.3, 0.5, 0.17, 0.005, 0.015]))
+    for frame_angles, timestamp_ms in zip(angles, timestamps_ms):
+        scalar_result = scalar.update_angles(frame_angles, rows, timestamp_ms)
+        vectorized_result = advance_state_machines(vectorized, rows, rows, frame_angles, timestamp_ms)
+        np.testing.assert_array_equal(scalar_result, vectorized_result)
+        for field, _, _ in STATE_FIELDS:
+            np.testing.assert_array_equal(getattr(scalar, field), getattr(vectorized, field), err_msg=field)
+    assert scalar.repetition_count.min() > 0
+
+
+def squat_engine(min_dwell_ms=0.0):
+    spec = get_spec("squat")
+    if min_dwell_ms:
+        spec = ExerciseSpec("dwell_squat", "Squat", spec.landmark_indices, spec.min_angle, spec.max_angle,
+                            spec.threshold_angle, spec.start_angle, spec.return_angle, DECREASING, spec.states,
+                            min_dwell_ms=min_dwell_ms)
+    return ExerciseEngine([spec])
+
+
+def step(engine, angle, timestamp_ms):
+    changed, completed = engine.update_angles(np.array([angle]), np.array([0]), timestamp_ms)
+    return bool(changed[0]), bool(completed[0])
+
+
+@pytest.mark.parametrize("fps", [15, 30, 60])
+def test_stability_is_time_based(fps):
+    engine = squat_engine()
+    frame_ms = 1000.0 / fps
+    started_at = None
+    for i in range(fps):
+        changed, _ = step(engine, 170.0, i * frame_ms)
+        if changed:
+            started_at = i * frame_ms
+            break
+    # Başlama, kare hızından bağımsız olarak REQUIRED_STABLE_MS dolduktan sonraki ilk karede olur
+    assert REQUIRED_STABLE_MS <= started_at < REQUIRED_STABLE_MS + frame_ms
+    assert engine.get_state(0) == "up"
+
+
+@pytest.mark.parametrize("fps", [15, 30, 60])
+def test_rep_timing_is_frame_rate_independent(fps):
+    engine = squat_engine()
+    frame_ms = 1000.0 / fps
+    transitions = []
+    # 3 s periyotlu squat: 170° ile 100° arası, en fazla ~73°/s
+    for i in range(int(9.5 * fps)):
+        timestamp_ms = i * frame_ms
+        angle = 135.0 + 35.0 * math.cos(2.0 * math.pi * timestamp_ms / 3000.0)
+        changed, _ = step(engine, angle, timestamp_ms)
+        if changed:
+            transitions.append((engine.get_state(0), timestamp_ms))
+    # Geçişler açının eşikleri geçtiği anlara bağlıdır (en fazla bir kare aralığı sapma)
+    reference = [("up", 150.0), ("down", 966.7), ("up", 2466.7), ("down", 3966.7), ("up", 5466.7),
+                 ("down", 6966.7), ("up", 8466.7)]
+    assert [state for state, _ in transitions] == [state for state, _ in reference]
+    for (_, timestamp_ms), (_, expected_ms) in zip(transitions, reference):
+        assert abs(timestamp_ms - expected_ms) <= frame_ms
+    assert engine.repetition_count[0] == 3
+
+
+def test_repeated_timestamps_restart_stability():
+    engine = squat_engine()
+    for i in range(4):
+        step(engine, 170.0, i * 40.0)
+    assert engine.stable_ms[0] == pytest.approx(120.0)
+    # Aynı zaman damgasıyla gelen kare hız hesaplamaz ve kararlılığı sıfırlar
+    for angle in (170.0, 100.0, 170.0):
+        changed, _ = step(engine, angle, 120.0)
+        assert not changed
+        assert engine.stable_ms[0] == 0.0
+    assert engine.get_state(0) == "up" and not engine.in_progress[0]
+    # Sonraki kareler yeniden REQUIRED_STABLE_MS biriktirmelidir
+    timestamps = [120.0 + 40.0 * i for i in range(1, 5)]
+    results = [step(engine, 170.0, timestamp_ms)[0] for timestamp_ms in timestamps]
+    assert results == [False, False, False, True]
+
+
+def test_backwards_timestamps_restart_stability():
+    engine = squat_engine(min_dwell_ms=300.0)
+    timestamp_ms = 0.0
+    for _ in range(40):
+        step(engine, 170.0, timestamp_ms)
+        timestamp_ms += 25.0
+    assert engine.in_progress[0]
+    # Zaman 1000 ms -> 200 ms geri gider; kararlılık süresi negatif olmamalı
+    step(engine, 170.0, 200.0)
+    assert engine.stable_ms[0] == 0.0
+    assert engine.state_since_ms[0] <= 200.0
+    for i in range(1, 30):
+        step(engine, 100.0 if i == 1 else 100.5, 200.0 + 25.0 * i)
+        assert engine.stable_ms[0] >= 0.0
+    # Yeni zaman çizgisinde geçişler engellenmemeli
+    assert engine.get_state(0) == "down"
+
+
+@pytest.mark.parametrize("timestamps", [[0.0, 40.0, 40.0], [0.0, 40.0, 10.0]])
+def test_exercise_base_restarts_on_non_increasing_timestamps(timestamps):
+    exercise = exercise_classes.ExerciseBase()
+    for timestamp_ms in timestamps:
+        assert not exercise.is_stable(170.0, timestamp_ms)
+    assert exercise.stable_ms == 0.0
+    assert exercise.previous_time_ms == timestamps[-1]
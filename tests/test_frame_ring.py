@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from frame_ring import RING_TRANSPORT, TRANSPORTS, FrameRing, MultiCameraPipeline
+
+SHM_DIR = "/dev/shm"
+
+
+def shared_memory_segments():
+    return set(os.listdir(SHM_DIR)) if os.path.isdir(SHM_DIR) else set()
+
+
+def write_video(path, frames, width=64, height=48):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (width, height))
+    assert writer.isOpened()
+    for i in range(frames):
+        writer.write(np.full((height, width, 3), (i * 8) % 256, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+def test_ring_attach_shares_frames():
+    ring = FrameRing(2, (4, 6, 3))
+    attached = FrameRing.attach(ring.spec())
+    ring.frames[1] = 7
+    assert np.all(attached.frames[1] == 7) and np.all(attached.frames[0] == 0)
+    attached.close()
+    ring.close()
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_pipeline_counts_every_frame_without_leaks(tmp_path, transport):
+    videos = [write_video(tmp_path / f"camera{i}.avi", frames) for i, frames in enumerate((30, 45))]
+    segments = shared_memory_segments()
+    pipeline = MultiCameraPipeline(videos, workers=2, transport=transport, slots=2, pose_config=None)
+    report = pipeline.run()
+
+    assert report["frames"] == 75
+    for stats, frames in zip(report["cameras"], (30, 45)):
+        # Video dosyalarında kare atılmaz; yakalanan her kare işlenir
+        assert stats["captured"] == stats["processed"] + stats["dropped"] == frames
+        assert stats["dropped"] == 0 and stats["detected"] == 0
+    assert shared_memory_segments() <= segments
+
+
+def test_dead_worker_does_not_block_run(tmp_path):
+    video = write_video(tmp_path / "camera.avi", 300)
+    segments = shared_memory_segments()
+    pipeline = MultiCameraPipeline([video], transport=RING_TRANSPORT, slots=2, pose_config=None)
+
+    def kill_worker():
+        # İşçi başlar başlamaz sinyalle öldürülür; None göndermeden sonlanır
+        deadline = time.monotonic() + 30.0
+        while time.monotonic() < deadline:
+            children = multiprocessing.active_children()
+            if children:
+                for child in children:
+                    child.kill()
+                return
+            time.sleep(0.001)
+
+    killer = threading.Thread(target=kill_worker, daemon=True)
+    killer.start()
+    with pytest.raises(RuntimeError, match="beklenmedik"):
+        pipeline.run()
+    killer.join()
+    assert shared_memory_segments() <= segments
+
+
+def test_unknown_transport_is_rejected():
+    with pytest.raises(ValueError):
+        MultiCameraPipeline(["video.avi"], transport="pipe")
@@ -0,0 +1,237 @@
+import asyncio
+import collections
+
+import pytest
+
+import frame_scheduler
+from frame_scheduler import (CANCELLED, EXPIRED, SERVICE_TIME_ALPHA, SUPERSEDED, FrameDropped, FrameScheduler,
+                             ScheduledFrame)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeWorker:
+    def __init__(self):
+        """
+        Elle tamamlanan işçi: execute her kare için bekleyen bir future döndürür.
+        """
+        self.running = collections.deque()  # (job, future), gönderim sırasıyla
+        self.executed = []
+
+    def execute(self, job):
+        future = asyncio.get_running_loop().create_future()
+        self.running.append((job, future))
+        self.executed.append(job)
+        return future
+
+    async def complete(self, count=1, error=None):
+        for _ in range(count):
+            job, future = self.running.popleft()
+            if error is None:
+                future.set_result(("result", job))
+            else:
+                future.set_exception(error)
+        # Tamamlanma geri çağrıları ve yeni dağıtımlar için döngüye sıra ver
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(frame_scheduler.time, "perf_counter", clock)
+    return clock
+
+
+def offer(scheduler, session, frame_number):
+    return scheduler.offer(ScheduledFrame(session, frame_number, frame_number * 33.0, (session, frame_number)))
+
+
+def dropped(frame):
+    result = frame.future.result()
+    return result.reason if isinstance(result, FrameDropped) else None
+
+
+def test_newer_frame_supersedes_waiting_frame(clock):
+    async def run():
+        worker = FakeWorker()
+        scheduler = FrameScheduler(worker.execute, capacity=1)
+        scheduler.add_session("a", deadline_ms=1000.0)
+        frames = [offer(scheduler, "a", n) for n in range(4)]
+        await worker.complete()
+        await worker.complete()
+        return scheduler, worker, frames
+
+    scheduler, worker, frames = asyncio.run(run())
+    # İlk kare işçideyken gelenlerden yalnızca en yenisi bekler
+    assert worker.executed == [("a", 0), ("a", 3)]
+    assert [dropped(frame) for frame in frames] == [None, SUPERSEDED, SUPERSEDED, None]
+    assert frames[3].future.result() == ("result", ("a", 3))
+    assert frames[1].job is None  # Atılan karenin yükü serbest bırakıldı
+    stats = scheduler.session_stats("a")
+    assert (stats["received"], stats["processed"], stats["dropped_superseded"]) == (4, 2, 2)
+
+
+def test_frame_that_would_miss_deadline_expires(clock):
+    async def run():
+        worker = FakeWorker()
+        scheduler = FrameScheduler(worker.execute, capacity=1)
+        scheduler.add_session("a", deadline_ms=50.0)
+        offer(scheduler, "a", 0)
+        clock.advance(0.020)
+        await worker.complete()  # İşlem süresi tahmini: 20 ms
+
+        blocker = offer(scheduler, "a", 1)
+        waiting = offer(scheduler, "a", 2)
+        clock.advance(0.035)  # Beklerken 35 ms geçti: 35 + 20 > 50
+        await worker.complete()
+        assert dropped(waiting) == EXPIRED
+
+        on_time = offer(scheduler, "a", 3)
+        clock.advance(0.025)
+        await worker.complete()
+        late = offer(scheduler, "a", 4)
+        clock.advance(0.060)  # Tahminden uzun süren işlem son tarihi kaçırır ama sonucu verilir
+        await worker.complete()
+        return scheduler, worker, blocker, on_time, late
+
+    scheduler, worker, blocker, on_time, late = asyncio.run(run())
+    assert worker.executed == [("a", 0), ("a", 1), ("a", 3), ("a", 4)]
+    assert dropped(blocker) is None and dropped(on_time) is None and dropped(late) is None
+    stats = scheduler.session_stats("a")
+    assert (stats["processed"], stats["dropped_expired"], stats["late"]) == (4, 1, 1)
+
+
+def test_service_time_is_exponential_average(clock):
+    async def run():
+        worker = FakeWorker()
+        scheduler = FrameScheduler(worker.execute, capacity=1)
+        scheduler.add_session("a")
+        assert scheduler.stats()["service_time_ms"] is None
+        expected = None
+        for n, seconds in enumerate([0.010, 0.030, 0.020, 0.020]):
+            offer(scheduler, "a", n)
+            clock.advance(seconds)
+            await worker.complete()
+            expected = seconds if expected is None else expected + SERVICE_TIME_ALPHA * (seconds - expected)
+            assert scheduler.service_time == pytest.approx(expected)
+        # Hata veren kareler de işlem süresine katılır
+        offer(scheduler, "a", 4)
+        clock.advance(0.040)
+        await worker.complete(error=RuntimeError("işçi hatası"))
+        expected += SERVICE_TIME_ALPHA * (0.040 - expected)
+        assert scheduler.service_time == pytest.approx(expected)
+        return scheduler, expected
+
+    scheduler, expected = asyncio.run(run())
+    assert scheduler.stats()["service_time_ms"] == round(expected * 1000.0, 2)
+    assert scheduler.session_stats("a")["errors"] == 1
+
+
+def test_session_without_deadline_drops_nothing(clock):
+    async def run():
+        worker = FakeWorker()
+        scheduler = FrameScheduler(worker.execute, capacity=2, max_in_flight=2)
+        scheduler.add_session("lossless")
+        scheduler.service_time = 1.0  # Son tarihli bir oturum olsaydı her kare atılırdı
+        frames = [offer(scheduler, "lossless", n) for n in range(50)]
+        while worker.running:
+            clock.advance(0.5)
+            await worker.complete()
+        return scheduler, worker, frames
+
+    scheduler, worker, frames = asyncio.run(run())
+    assert worker.executed == [("lossless", n) for n in range(50)]
+    assert [frame.future.result() for frame in frames] == [("result", ("lossless", n)) for n in range(50)]
+    stats = scheduler.session_stats("lossless")
+    assert stats["processed"] == 50
+    assert stats["late"] == 0
+    assert all(stats[f"dropped_{reason}"] == 0 for reason in (SUPERSEDED, EXPIRED, CANCELLED))
+
+
+def test_remove_session_cancels_pending_frames(clock):
+    async def run():
+        worker = FakeWorker()
+        scheduler = FrameScheduler(worker.execute, capacity=1)
+        scheduler.add_session("a")
+        scheduler.add_session("b")
+        running = offer(scheduler, "a", 0)
+        pending = [offer(scheduler, "a", n) for n in range(1, 4)]
+        other = offer(scheduler, "b", 0)
+        stats = scheduler.remove_session("a")
+        assert all(frame.future.done() for frame in pending)
+        # İşçideki kare tamamlanır; kapasite diğer oturuma geçer
+        await worker.complete()
+        await worker.complete()
+        return scheduler, worker, running, pending, other, stats
+
+    scheduler, worker, running, pending, other, stats = asyncio.run(run())
+    assert [dropped(frame) for frame in pending] == [CANCELLED] * 3
+    assert running.future.result() == ("result", ("a", 0))
+    assert other.future.result() == ("result", ("b", 0))
+    assert worker.executed == [("a", 0), ("b", 0)]
+    assert stats["dropped_cancelled"] == 3
+    assert scheduler.stats()["dropped_cancelled"] == 3
+    assert "a" not in scheduler.sessions
+
+
+def test_capacity_is_shared_round_robin(clock):
+    async def run():
+        worker = FakeWorker()
+        scheduler = FrameScheduler(worker.execute, capacity=1)
+        for session in "abc":
+            scheduler.add_session(session)
+        for n in range(6):
+            offer(scheduler, "a", n)
+        for n in range(6):
+            offer(scheduler, "b", n)
+        for n in range(2):
+            offer(scheduler, "c", n)
+        while worker.running:
+            await worker.complete()
+        return worker
+
+    worker = asyncio.run(run())
+    # İlk kare boş işçiye hemen gider; sonra "a" kendi kuyruğunu bitirmeden diğer oturumlar sıra alır
+    assert [session for session, _ in worker.executed] == list("a" + "abcabc" + "ababab" + "b")
+    for session in "abc":
+        assert [n for s, n in worker.executed if s == session] == sorted(n for s, n in worker.executed if s == session)
+
+
+def test_overload_reduces_frame_rate_equally(clock):
+    ticks = 300
+
+    async def run():
+        worker = FakeWorker()
+        scheduler = FrameScheduler(worker.execute, capacity=2)
+        for session in "abcd":
+            scheduler.add_session(session, deadline_ms=200.0)
+        scheduler.add_session("slow", deadline_ms=200.0)
+        # Her 10 ms'de dört oturum birer kare gönderir, "slow" ise her 5 turda bir;
+        # işçiler tur başına bir kare bitirir: talep 4.2, kapasite 1 kare/tur
+        for tick in range(ticks):
+            sessions = "abcd" if tick % 2 else "dcba"
+            for session in sessions:
+                offer(scheduler, session, tick)
+            if tick % 5 == 0:
+                offer(scheduler, "slow", tick)
+            clock.advance(0.010)
+            await worker.complete()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    slow = scheduler.session_stats("slow")
+    assert slow["processed"] >= slow["received"] - 1  # Payından az isteyen oturum tüm karelerini işletir
+    processed = [scheduler.session_stats(session)["processed"] for session in "abcd"]
+    fair_share = (ticks - slow["processed"]) / 4
+    assert all(abs(count - fair_share) <= 2 for count in processed)
+    assert all(scheduler.session_stats(session)["late"] == 0 for session in "abcd")
@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+
+from frame_skipping import AdaptiveInference, ConstantVelocityPredictor
+from roi_tracker import RoiTracker
+
+FRAME_MS = 1000.0 / 30
+
+
+class FakeEstimator:
+    def __init__(self, latency_s=0.0):
+        """
+        Görüntünün içinde sağa doğru yürüyen bir kişi döndüren, çağrıları kaydeden tahminci.
+        Eklemler verilen görüntüye göre normalleştirilir (RoiTracker kırpmalarıyla uyumlu).
+        """
+        self.latency_s = latency_s
+        self.calls = []
+        self.resets = 0
+
+    def estimate(self, image_rgb, timestamp_ms=None):
+        self.calls.append((timestamp_ms, image_rgb.shape[:2]))
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        rng = np.random.default_rng(int(timestamp_ms))
+        landmarks = np.empty((33, 4), dtype=np.float32)
+        landmarks[:, 0] = 0.3 + 0.2 * rng.random(33) + timestamp_ms * 1e-4
+        landmarks[:, 1] = 0.3 + 0.4 * rng.random(33)
+        landmarks[:, 2] = 0.0
+        landmarks[:, 3] = 0.9
+        return landmarks
+
+    def reset(self):
+        self.resets += 1
+
+
+def frames(count, width=640, height=480):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    return [(image, i * FRAME_MS) for i in range(count)]
+
+
+def test_predictor_extrapolates_constant_velocity():
+    predictor = ConstantVelocityPredictor(max_extrapolation_ms=100.0)
+    first = np.zeros((33, 4), dtype=np.float32)
+    second = first.copy()
+    second[:, 0] = 0.1
+    predictor.observe(first, 0.0)
+    predictor.observe(second, 50.0)
+    np.testing.assert_allclose(predictor.predict(75.0)[:, 0], 0.15, rtol=1e-6)
+    # Uzun aralıklarda tahmin max_extrapolation_ms ile sınırlanır
+    np.testing.assert_allclose(predictor.predict(500.0)[:, 0], 0.3, rtol=1e-6)
+
+
+def test_wrapper_without_skipping_keeps_tracker_state():
+    bare = RoiTracker(FakeEstimator())
+    wrapped_tracker = RoiTracker(FakeEstimator())
+    wrapped = AdaptiveInference(wrapped_tracker, max_skip=1)
+    for image, timestamp_ms in frames(60):
+        expected = bare.estimate(image, timestamp_ms)
+        actual = wrapped.estimate(image, timestamp_ms)
+        np.testing.assert_array_equal(actual, expected)
+        assert wrapped_tracker.box == bare.box
+    assert wrapped_tracker.estimator.calls == bare.estimator.calls
+    assert wrapped_tracker.report() == bare.report()
+
+
+def test_validation_does_not_touch_tracker_state():
+    # Çıkarım bütçeyi aşar (3 ms / 1 ms), k > 1 olur; doğrulama her atlanan karede çalışır
+    tracker = RoiTracker(FakeEstimator(latency_s=0.003))
+    validation_estimator = FakeEstimator()
+    inference = AdaptiveInference(tracker, frame_budget_ms=2.0, validate_every=1,
+                                  validation_estimator=validation_estimator)
+    bare = RoiTracker(FakeEstimator())
+    predicted = []
+    for image, timestamp_ms in frames(90):
+        result, inferred = inference.process(image, timestamp_ms)
+        if inferred:
+            # Takip durumu, sarmalayıcı olmadan yalnızca çıkarım kareleriyle çalışmakla aynı kalır
+            np.testing.assert_array_equal(result, bare.estimate(image, timestamp_ms))
+        else:
+            predicted.append(timestamp_ms)
+        assert tracker.box == bare.box
+    assert inference.skip_interval > 1 and predicted
+    assert tracker.estimator.calls == bare.estimator.calls
+    # Doğrulama modeli çıkarım karelerini de görür (validate_every=1: tüm kareler)
+    assert [call[0] for call in validation_estimator.calls] == [timestamp_ms for _, timestamp_ms in frames(90)]
+    assert inference.validated_frames == len(predicted)
+
+
+def test_validation_estimator_mirrors_inferred_frames():
+    # Aynı ayarlardaki doğrulama modeli çıkarım karelerini ve her ikinci atlanan kareyi görür
+    estimator = FakeEstimator(latency_s=0.003)
+    validation_estimator = FakeEstimator()
+    inference = AdaptiveInference(estimator, frame_budget_ms=2.0, validate_every=2,
+                                  validation_estimator=validation_estimator)
+    validated = []
+    for image, timestamp_ms in frames(90):
+        _, inferred = inference.process(image, timestamp_ms)
+        if not inferred and inference.predicted_frames % 2 == 0:
+            validated.append(timestamp_ms)
+    inferred = [call[0] for call in estimator.calls]
+    assert validated and len(inferred) < 90
+    assert [call[0] for call in validation_estimator.calls] == sorted(inferred + validated)
+
+
+def test_validation_cost_is_included_in_skip_interval():
+    inference = AdaptiveInference(FakeEstimator(), frame_budget_ms=FRAME_MS, inference_share=0.5, max_skip=6,
+                                  validate_every=2, validation_estimator=FakeEstimator())
+    inference.latency_ms = 20.0
+    inference._update_skip_interval()
+    assert inference.skip_interval == 2  # 20 ms / 16.7 ms
+    # Doğrulama modeli çıkarım karelerinde de çalışır: (20 + 10) ms / (16.7 - 10 / 2) ms
+    inference.validation_latency_ms = 10.0
+    inference._update_skip_interval()
+    assert inference.skip_interval == 3
+    inference.validation_latency_ms = 40.0
+    inference._update_skip_interval()
+    assert inference.skip_interval == 6
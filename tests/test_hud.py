@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+import pytest
+
+from hud import ExerciseHud, HudLayer
+from main import MENU_LINES
+
+
+def put_text_directly(frame, lines):
+    for text, origin, scale, color, thickness in lines:
+        cv2.putText(frame, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+
+
+def assert_close_to_put_text(frame, expected):
+    # Katman harmanlamayı cv2 ile yapar; putText'ten piksel başına en fazla 1 farklı olabilir
+    np.testing.assert_allclose(frame.astype(np.int16), expected.astype(np.int16), rtol=0, atol=1)
+
+
+def random_frame(height=720, width=1280, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("frame_size", [(720, 1280), (1080, 1920), (240, 320)])
+def test_menu_layer_matches_put_text(frame_size):
+    frame = random_frame(*frame_size)
+    expected = frame.copy()
+    put_text_directly(expected, MENU_LINES)
+    layer = HudLayer(MENU_LINES)
+    layer.draw(frame)
+    assert_close_to_put_text(frame, expected)
+    # Önbellekten ikinci çizim de aynı sonucu vermeli
+    frame = random_frame(*frame_size, seed=1)
+    expected = frame.copy()
+    put_text_directly(expected, MENU_LINES)
+    layer.draw(frame)
+    assert_close_to_put_text(frame, expected)
+
+
+def test_clipped_lines_match_put_text():
+    lines = [("Clipped on the left", (-40, 30), 1.5, (0, 0, 255), 3),
+             ("Clipped at the bottom right", (200, 235), 1.5, (0, 255, 0), 3),
+             ("Outside", (1000, 50), 1.0, (255, 255, 255), 2)]
+    frame = random_frame(240, 320)
+    expected = frame.copy()
+    put_text_directly(expected, lines)
+    HudLayer(lines).draw(frame)
+    assert_close_to_put_text(frame, expected)
+
+
+def test_exercise_hud_matches_put_text():
+    hud = ExerciseHud("Squat")
+    frame = random_frame()
+    expected = frame.copy()
+    put_text_directly(expected, [
+        ("Repetitions: 3", (20, 60), 1.5, (0, 255, 0), 3),
+        ("Squat: Down", (20, 120), 1.5, (0, 255, 0), 3),
+        ("Selected Exercise: Squat", (20, 180), 1.5, (255, 0, 0), 3),
+    ])
+    hud.draw_stats(frame, 3, "Down")
+    assert_close_to_put_text(frame, expected)
+
+
+def test_overlapping_lines_match_put_text():
+    lines = [("Repetitions: 12", (20, 60), 1.5, (0, 255, 0), 3),
+             ("Repetitions: 12", (24, 64), 1.5, (0, 0, 255), 2),
+             ("Down", (30, 70), 2.0, (255, 255, 0), 4)]
+    layer = HudLayer(lines)
+    for seed in range(2):
+        frame = random_frame(240, 320, seed)
+        expected = frame.copy()
+        put_text_directly(expected, lines)
+        layer.draw(frame)
+        assert_close_to_put_text(frame, expected)
+    assert len(layer._cache[1]) == 3
+
+
+def test_non_contiguous_frame_matches_put_text():
+    canvas = random_frame(480, 1280)
+    frame, expected = canvas[:, :640], canvas[:, :640].copy()
+    put_text_directly(expected, MENU_LINES)
+    HudLayer(MENU_LINES).draw(frame)
+    assert_close_to_put_text(frame, expected)
+    np.testing.assert_array_equal(canvas[:, 640:], random_frame(480, 1280)[:, 640:])
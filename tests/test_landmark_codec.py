@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from landmark_codec import (DEFAULT_BLOCK_FRAMES, DEFAULT_VISIBILITY_BITS, MAX_ANGLE_ERROR_DEG, QUANT_SCALE,
+                            TIME_SCALE, decode_landmark_stream, encode_landmark_stream, reconstruction_error)
+from synthetic_landmarks import SyntheticExercise
+
+COORDINATE_BOUND = 0.5 / QUANT_SCALE + 1e-6  # Nicemleme + float32 yuvarlaması
+VISIBILITY_BOUND = 0.5 / ((1 << DEFAULT_VISIBILITY_BITS) - 1) + 1e-6
+TIME_BOUND_MS = 0.5 / TIME_SCALE + 1e-9
+
+# Kodlama NaN nicemlemeye kalkarsa int16 dönüşümü RuntimeWarning verir
+pytestmark = pytest.mark.filterwarnings("error")
+
+
+def synthetic_stream(frames=None, dropout_rate=0.0, seed=0):
+    timestamps_ms, landmarks = SyntheticExercise("squat", repetitions=3, timestamp_jitter_ms=4.0, occlusion_rate=0.1,
+                                                 dropout_rate=dropout_rate, seed=seed).generate(stop=frames)
+    return timestamps_ms, landmarks
+
+
+def round_trip(timestamps_ms, landmarks, **options):
+    decoded_timestamps_ms, decoded = decode_landmark_stream(encode_landmark_stream(timestamps_ms, landmarks, **options))
+    assert decoded.shape == landmarks.shape
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded_timestamps_ms, timestamps_ms, rtol=0, atol=TIME_BOUND_MS)
+    return decoded
+
+
+def assert_within_bounds(landmarks, decoded):
+    lost = np.isnan(landmarks[:, :, :3]).any(axis=(1, 2))
+    assert np.isnan(decoded[lost]).all()
+    assert not np.isnan(decoded[~lost]).any()
+    np.testing.assert_allclose(decoded[~lost, :, :3], landmarks[~lost, :, :3], rtol=0, atol=COORDINATE_BOUND)
+    np.testing.assert_allclose(decoded[~lost, :, 3], landmarks[~lost, :, 3], rtol=0, atol=VISIBILITY_BOUND)
+
+
+@pytest.mark.parametrize("block_frames", [1, DEFAULT_BLOCK_FRAMES, 1000])
+def test_round_trip_error_is_bounded(block_frames):
+    timestamps_ms, landmarks = synthetic_stream(dropout_rate=0.02)
+    assert np.isnan(landmarks[:, 0, 0]).any()
+    decoded = round_trip(timestamps_ms, landmarks, block_frames=block_frames)
+    assert_within_bounds(landmarks, decoded)
+    assert reconstruction_error(landmarks, decoded)["max_angle_error_deg"] < MAX_ANGLE_ERROR_DEG
+
+
+@pytest.mark.parametrize("frames", [1, DEFAULT_BLOCK_FRAMES - 1, DEFAULT_BLOCK_FRAMES + 1, 3 * DEFAULT_BLOCK_FRAMES + 7])
+def test_stream_length_not_multiple_of_block(frames):
+    timestamps_ms, landmarks = synthetic_stream(frames)
+    assert len(timestamps_ms) == frames
+    assert_within_bounds(landmarks, round_trip(timestamps_ms, landmarks))
+
+
+def test_all_lost_block():
+    timestamps_ms, landmarks = synthetic_stream(3 * DEFAULT_BLOCK_FRAMES)
+    landmarks[DEFAULT_BLOCK_FRAMES:2 * DEFAULT_BLOCK_FRAMES] = np.nan
+    decoded = round_trip(timestamps_ms, landmarks)
+    assert_within_bounds(landmarks, decoded)
+
+    # Yalnızca poz kaybı içeren akış
+    landmarks[:] = np.nan
+    assert np.isnan(round_trip(timestamps_ms, landmarks)).all()
+
+
+@pytest.mark.parametrize("field", [0, 1, 2])
+def test_partial_nan_frame_is_encoded_as_lost(field):
+    timestamps_ms, landmarks = synthetic_stream(2 * DEFAULT_BLOCK_FRAMES)
+    partial = 10
+    landmarks[partial, 25, field] = np.nan
+    decoded = round_trip(timestamps_ms, landmarks)
+    assert np.isnan(decoded[partial]).all()
+    # Sonraki kareler kayıptan önceki son poza göre fark olarak kodlanır ve bozulmaz
+    assert_within_bounds(landmarks, decoded)
+    assert reconstruction_error(landmarks, decoded)["max_angle_error_deg"] < MAX_ANGLE_ERROR_DEG
+
+
+def test_nan_visibility_keeps_pose():
+    timestamps_ms, landmarks = synthetic_stream(DEFAULT_BLOCK_FRAMES)
+    landmarks[5, :, 3] = np.nan
+    decoded = round_trip(timestamps_ms, landmarks)
+    np.testing.assert_allclose(decoded[5, :, :3], landmarks[5, :, :3], rtol=0, atol=COORDINATE_BOUND)
+    assert (decoded[5, :, 3] == 0.0).all()
+
+
+def test_empty_stream():
+    timestamps_ms, landmarks = decode_landmark_stream(encode_landmark_stream(np.zeros(0), np.zeros((0, 33, 4))))
+    assert timestamps_ms.shape == (0,)
+    assert landmarks.shape == (0, 33, 4)
+
+
+def test_truncated_stream_is_rejected():
+    timestamps_ms, landmarks = synthetic_stream(DEFAULT_BLOCK_FRAMES)
+    encoded = encode_landmark_stream(timestamps_ms, landmarks)
+    with pytest.raises(ValueError):
+        decode_landmark_stream(encoded[:-1])
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from angle_engine import AngleEngine
+from exercise_detection import ExerciseDetection
+from exercise_engine import MAX_FRAME_GAP_MS
+from exercise_specs import EXERCISE_SPECS
+from landmark_filter import FILTERED_STABLE_MS, OneEuroFilter
+from synthetic_landmarks import SyntheticExercise
+
+EXERCISES = list(EXERCISE_SPECS)
+
+
+def count_reps(exercise_name, timestamps_ms, landmarks, **options):
+    detection = ExerciseDetection(monitor_all=False, **options)
+    detection.subscribe(exercise_name)
+    for timestamp_ms, frame in zip(timestamps_ms, landmarks):
+        if not np.isnan(frame[0, 0]):
+            detection.detect_exercises(frame, timestamp_ms)
+    return detection.exercises[exercise_name].get_repetition_count()
+
+
+def filtered(timestamps_ms, landmarks):
+    landmark_filter = OneEuroFilter()
+    landmarks = landmarks.copy()
+    for timestamp_ms, frame in zip(timestamps_ms, landmarks):
+        landmark_filter.apply(frame, timestamp_ms)
+    return landmarks
+
+
+def angle_jitter(angles):
+    """
+    Ardışık karelerdeki açıların ikinci farkının RMS'i (derece); yavaş hareketi değil titreşimi ölçer.
+    """
+    second_difference = np.diff(angles, 2)
+    return np.sqrt(np.nanmean(second_difference ** 2))
+
+
+@pytest.mark.parametrize("exercise_name", EXERCISES)
+def test_filtered_stream_keeps_rep_count(exercise_name):
+    stream = SyntheticExercise(exercise_name, repetitions=8, dropout_rate=0.01, seed=4)
+    timestamps_ms, landmarks = stream.generate()
+    expected = stream.ground_truth()["repetition_count"]
+    assert count_reps(exercise_name, timestamps_ms, landmarks) == expected
+    assert count_reps(exercise_name, timestamps_ms, landmarks, landmark_filter=OneEuroFilter(),
+                      required_stable_ms=FILTERED_STABLE_MS) == expected
+
+
+@pytest.mark.parametrize("exercise_name", EXERCISES)
+def test_filter_reduces_angle_jitter(exercise_name):
+    stream = SyntheticExercise(exercise_name, repetitions=8, seed=5)
+    timestamps_ms, landmarks = stream.generate()
+    angle_engine = AngleEngine([EXERCISE_SPECS[exercise_name].landmark_indices])
+    raw = angle_engine.compute(landmarks)[:, 0]
+    smoothed = angle_engine.compute(filtered(timestamps_ms, landmarks))[:, 0]
+    assert angle_jitter(smoothed) < 0.5 * angle_jitter(raw)
+    # Yumuşatma hareketi bastırmaz: hareket aralığı korunur
+    assert np.ptp(smoothed) > 0.9 * np.ptp(stream.joint_angles(timestamps_ms))
+
+
+def test_filter_passes_first_frame_and_visibility_through():
+    rng = np.random.default_rng(0)
+    frames = rng.random((3, 33, 4)).astype(np.float32)
+    output = frames.copy()
+    landmark_filter = OneEuroFilter()
+    landmark_filter.apply(output[0], 0.0)
+    np.testing.assert_array_equal(output[0], frames[0])
+    landmark_filter.apply(output[1], 33.0)
+    np.testing.assert_array_equal(output[1, :, 3], frames[1, :, 3])
+    # Filtrelenmiş kare önceki ve yeni kare arasında kalır
+    low, high = np.minimum(frames[0], frames[1])[:, :3], np.maximum(frames[0], frames[1])[:, :3]
+    assert np.all((output[1, :, :3] >= low - 1e-6) & (output[1, :, :3] <= high + 1e-6))
+
+
+@pytest.mark.parametrize("gap_ms", [MAX_FRAME_GAP_MS + 1.0, 0.0, -10.0])
+def test_filter_restarts_after_gap_or_non_increasing_timestamp(gap_ms):
+    rng = np.random.default_rng(1)
+    frames = rng.random((2, 33, 4)).astype(np.float32)
+    landmark_filter = OneEuroFilter()
+    landmark_filter.apply(frames[0].copy(), 1000.0)
+    output = landmark_filter.apply(frames[1].copy(), 1000.0 + gap_ms)
+    np.testing.assert_array_equal(output, frames[1])
+
+
+def test_filter_restarts_after_lost_pose():
+    rng = np.random.default_rng(2)
+    frames = rng.random((2, 33, 4)).astype(np.float32)
+    landmark_filter = OneEuroFilter()
+    landmark_filter.apply(frames[0].copy(), 0.0)
+    landmark_filter.apply(np.full((33, 4), np.nan, dtype=np.float32), 33.0)
+    output = landmark_filter.apply(frames[1].copy(), 66.0)
+    np.testing.assert_array_equal(output, frames[1])
@@ -0,0 +1,126 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from exercise_detection import ExerciseDetection
+from landmark_ingest import LandmarkIngestService
+from synthetic_landmarks import synthetic_sessions
+
+
+def sessions(count=6, seed=0):
+    """
+    Farklı egzersiz ve tempolu oturumlar; her oturum (egzersizler, zaman damgaları, eklemler).
+    """
+    streams = synthetic_sessions(count, seed=seed, repetitions=4, dropout_rate=0.02)
+    # Bir oturum aynı kareden iki egzersizi birlikte takip eder
+    exercises = [[stream.exercise_name] for stream in streams]
+    exercises[0].append("arm_raise_lateral_front" if streams[0].exercise_name != "arm_raise_lateral_front"
+                        else "squat")
+    return [(names, *stream.generate()) for names, stream in zip(exercises, streams)]
+
+
+def reference(exercise_names, timestamps_ms, landmarks):
+    """
+    Karelerin tek tek ExerciseDetection'a verildiği referans: olaylar ve son durumlar.
+    """
+    detection = ExerciseDetection(monitor_all=False)
+    detection.subscribe(*exercise_names)
+    events = []
+    for timestamp_ms, frame in zip(timestamps_ms, landmarks):
+        if np.isnan(frame[0, 0]):
+            continue
+        detection.detect_exercises(frame, timestamp_ms)
+        events += detection.get_events()
+    final = {name: (detection.exercises[name].get_state(), detection.exercises[name].get_repetition_count())
+             for name in exercise_names}
+    return events, final
+
+
+def chunks(timestamps_ms, landmarks, seed):
+    """
+    Akışı düzensiz boyutlu yığınlara böler (istemcilerin farklı gönderim aralıkları).
+    """
+    rng = np.random.default_rng(seed)
+    bounds = np.cumsum(rng.integers(1, 40, len(timestamps_ms)))
+    bounds = np.concatenate(([0], bounds[bounds < len(timestamps_ms)], [len(timestamps_ms)]))
+    return [(timestamps_ms[start:stop], landmarks[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def final_states(service, session, exercise_names):
+    return {name: (service.engine.get_state(session, name), service.engine.get_repetition_count(session, name))
+            for name in exercise_names}
+
+
+def sort_events(events):
+    # Aynı karede birden fazla egzersizin olayları farklı sırada üretilebilir
+    return sorted(events, key=lambda event: (event["timestamp_ms"], event["exercise"], event["type"]))
+
+
+def test_ingest_many_matches_per_session_detection():
+    streams = sessions()
+    service = LandmarkIngestService(capacity=2)  # Kapasite büyümesi de sınanır
+    ids = [service.open_session(names) for names, _, _ in streams]
+    split = [chunks(timestamps_ms, landmarks, seed) for seed, (_, timestamps_ms, landmarks) in enumerate(streams)]
+    events = {session: [] for session in ids}
+    # Her turda oturumların sıradaki yığınları birlikte işlenir; oturumlar farklı turlarda biter
+    for turn in range(max(len(parts) for parts in split)):
+        batches = [(session, *parts[turn]) for session, parts in zip(ids, split) if turn < len(parts)]
+        for session, session_events in service.ingest_many(batches).items():
+            events[session] += session_events
+
+    for session, (names, timestamps_ms, landmarks) in zip(ids, streams):
+        expected_events, expected_final = reference(names, timestamps_ms, landmarks)
+        assert sum(event["type"] == "rep" for event in expected_events) > 0
+        assert sort_events(events[session]) == sort_events(expected_events)
+        assert final_states(service, session, names) == expected_final
+        summary = service.close_session(session)
+        assert summary["frames"] == len(timestamps_ms)
+        assert summary["detected_frames"] == int((~np.isnan(landmarks[:, 0, 0])).sum())
+        assert summary["exercises"] == {name: expected_final[name][1] for name in names}
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_submit_coalesces_batches_and_keeps_session_order(seed):
+    streams = sessions(seed=seed)
+
+    async def client(service, session, parts):
+        events = []
+        for timestamps_ms, landmarks in parts:
+            events += await service.submit(session, timestamps_ms, landmarks)
+        return events
+
+    async def run():
+        service = LandmarkIngestService()
+        ids = [service.open_session(names) for names, _, _ in streams]
+        calls = []
+        ingest_many = service.ingest_many
+        service.ingest_many = lambda batches: calls.append(len(batches)) or ingest_many(batches)
+        split = [chunks(timestamps_ms, landmarks, seed + i) for i, (_, timestamps_ms, landmarks) in enumerate(streams)]
+        # Bir oturum tüm yığınlarını beklemeden gönderir: aynı turda birden fazla yığını olur
+        burst = asyncio.gather(*(service.submit(ids[0], *part) for part in split[0]))
+        results = await asyncio.gather(burst, *(client(service, session, parts)
+                                                for session, parts in zip(ids[1:], split[1:])))
+        events = [[event for part in results[0] for event in part]] + list(results[1:])
+        return service, ids, events, calls
+
+    service, ids, events, calls = asyncio.run(run())
+    assert max(calls) == len(streams)  # Farklı oturumların yığınları tek çağrıda işlendi
+    for session, session_events, (names, timestamps_ms, landmarks) in zip(ids, events, streams):
+        expected_events, expected_final = reference(names, timestamps_ms, landmarks)
+        assert sort_events(session_events) == sort_events(expected_events)
+        assert final_states(service, session, names) == expected_final
+
+
+def test_submit_propagates_errors_to_every_waiting_batch():
+    async def run():
+        service = LandmarkIngestService()
+        first, second = service.open_session(["squat"]), service.open_session(["squat"])
+        bad = np.zeros((2, 10, 4), dtype=np.float32)  # Eksik eklemli yığın
+        good = np.zeros((2, 33, 4), dtype=np.float32)
+        return await asyncio.gather(service.submit(first, np.zeros(2), bad), service.submit(second, np.zeros(2), good),
+                                    return_exceptions=True)
+
+    first, second = asyncio.run(run())
+    assert isinstance(first, ValueError)
+    assert second is first
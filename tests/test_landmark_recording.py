@@ -0,0 +1,144 @@
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from landmark_recording import (HEADER_FORMAT, HEADER_SIZE, MAGIC, RECORD_DTYPE, VERSION, LandmarkRecorder,
+                                LandmarkRecording, RecordingEstimator)
+
+
+def random_frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps_ms = np.cumsum(rng.uniform(25.0, 40.0, count))
+    landmarks = rng.random((count, 33, 4)).astype(np.float32)
+    return timestamps_ms, landmarks
+
+
+def test_layout():
+    assert HEADER_SIZE == 64
+    assert RECORD_DTYPE.itemsize == 8 + 33 * 4 * 4 == 536
+
+
+def test_write_reopen_memmap_round_trip(tmp_path):
+    path = str(tmp_path / "session.lmk")
+    timestamps_ms, landmarks = random_frames(700)
+    lost = np.zeros(len(timestamps_ms), dtype=bool)
+    lost[[3, 4, 500]] = True
+    # Tampon sınırlarını geçen tek kare yazımları, ardından bir yığın
+    with LandmarkRecorder(path, buffer_frames=64) as recorder:
+        for timestamp_ms, frame, missing in zip(timestamps_ms[:600], landmarks[:600], lost[:600]):
+            recorder.write(timestamp_ms, None if missing else frame)
+        batch = landmarks[600:].copy()
+        batch[lost[600:]] = np.nan
+        recorder.write_batch(timestamps_ms[600:], batch)
+    assert recorder.frames_written == 700
+    assert os.path.getsize(path) == HEADER_SIZE + 700 * RECORD_DTYPE.itemsize
+
+    recording = LandmarkRecording(path)
+    assert isinstance(recording.records, np.memmap)
+    assert len(recording) == 700
+    np.testing.assert_array_equal(recording.timestamps_ms, timestamps_ms)
+    np.testing.assert_array_equal(recording.detected(), ~lost)
+    np.testing.assert_array_equal(recording.landmarks[~lost], landmarks[~lost])
+    assert np.isnan(recording.landmarks[lost]).all()
+    assert recording.duration_ms() == pytest.approx(timestamps_ms[-1] - timestamps_ms[0])
+
+
+def test_append_continues_existing_recording(tmp_path):
+    path = str(tmp_path / "session.lmk")
+    timestamps_ms, landmarks = random_frames(20)
+    with LandmarkRecorder(path) as recorder:
+        recorder.write_batch(timestamps_ms[:10], landmarks[:10])
+    with LandmarkRecorder(path) as recorder:
+        recorder.write_batch(timestamps_ms[10:], landmarks[10:])
+    np.testing.assert_array_equal(LandmarkRecording(path).landmarks, landmarks)
+    with LandmarkRecorder(path, append=False) as recorder:
+        recorder.write_batch(timestamps_ms[:5], landmarks[:5])
+    np.testing.assert_array_equal(LandmarkRecording(path).timestamps_ms, timestamps_ms[:5])
+
+
+def test_truncated_tail_is_ignored_and_cut_on_reopen(tmp_path):
+    path = str(tmp_path / "session.lmk")
+    timestamps_ms, landmarks = random_frames(30)
+    with LandmarkRecorder(path) as recorder:
+        recorder.write_batch(timestamps_ms[:20], landmarks[:20])
+    # Çökme sonrası yarım kalmış son kayıt
+    with open(path, "ab") as f:
+        f.write(b"\xff" * 100)
+    recording = LandmarkRecording(path)
+    assert len(recording) == 20
+    np.testing.assert_array_equal(recording.landmarks, landmarks[:20])
+    del recording
+
+    with LandmarkRecorder(path) as recorder:
+        recorder.write_batch(timestamps_ms[20:], landmarks[20:])
+    assert os.path.getsize(path) == HEADER_SIZE + 30 * RECORD_DTYPE.itemsize
+    recording = LandmarkRecording(path)
+    np.testing.assert_array_equal(recording.timestamps_ms, timestamps_ms)
+    np.testing.assert_array_equal(recording.landmarks, landmarks)
+
+
+def test_header_only_recording_is_empty(tmp_path):
+    path = str(tmp_path / "empty.lmk")
+    LandmarkRecorder(path).close()
+    recording = LandmarkRecording(path)
+    assert len(recording) == 0
+    assert recording.duration_ms() == 0.0
+    assert len(recording.time_slice(0.0, 100.0)) == 0
+
+
+@pytest.mark.parametrize("header", [
+    struct.pack(HEADER_FORMAT, b"NOTLMK\x00\x01", VERSION, 33, 4, RECORD_DTYPE.itemsize),
+    struct.pack(HEADER_FORMAT, MAGIC, VERSION + 1, 33, 4, RECORD_DTYPE.itemsize),
+    struct.pack(HEADER_FORMAT, MAGIC, VERSION, 25, 4, RECORD_DTYPE.itemsize),
+    struct.pack(HEADER_FORMAT, MAGIC, VERSION, 33, 4, 528),
+    MAGIC + b"\x00" * 8,  # Eksik başlık
+], ids=["magic", "version", "landmarks", "record-size", "short"])
+def test_bad_header_is_rejected(tmp_path, header):
+    path = str(tmp_path / "bad.lmk")
+    with open(path, "wb") as f:
+        f.write(header)
+    with pytest.raises(ValueError):
+        LandmarkRecording(path)
+    with pytest.raises(ValueError):
+        LandmarkRecorder(path)
+    # Reddedilen dosyaya dokunulmaz
+    with open(path, "rb") as f:
+        assert f.read() == header
+
+
+def test_time_slice(tmp_path):
+    path = str(tmp_path / "session.lmk")
+    timestamps_ms = np.arange(10) * 100.0
+    with LandmarkRecorder(path) as recorder:
+        recorder.write_batch(timestamps_ms, np.zeros((10, 33, 4), dtype=np.float32))
+    recording = LandmarkRecording(path)
+    np.testing.assert_array_equal(recording.time_slice(200.0, 500.0)["timestamp_ms"], [200.0, 300.0, 400.0])
+    np.testing.assert_array_equal(recording.time_slice(150.0, 350.0)["timestamp_ms"], [200.0, 300.0])
+    np.testing.assert_array_equal(recording.time_slice(end_ms=200.0)["timestamp_ms"], [0.0, 100.0])
+    np.testing.assert_array_equal(recording.time_slice(start_ms=850.0)["timestamp_ms"], [900.0])
+    assert len(recording.time_slice(2000.0)) == 0
+    # Dilimler kopya değil görünümdür
+    assert np.shares_memory(recording.time_slice(100.0, 300.0), recording.records)
+
+
+def test_recording_estimator_records_results(tmp_path):
+    path = str(tmp_path / "session.lmk")
+    _, landmarks = random_frames(3)
+
+    class Estimator:
+        def __init__(self):
+            self.results = [landmarks[0], None, landmarks[2]]
+
+        def estimate(self, image_rgb, timestamp_ms=None):
+            return self.results.pop(0)
+
+    with LandmarkRecorder(path) as recorder:
+        estimator = RecordingEstimator(Estimator(), recorder)
+        results = [estimator.estimate(None, timestamp_ms) for timestamp_ms in (0.0, 33.0, 66.0)]
+    assert results[1] is None
+    recording = LandmarkRecording(path)
+    np.testing.assert_array_equal(recording.timestamps_ms, [0.0, 33.0, 66.0])
+    np.testing.assert_array_equal(recording.detected(), [True, False, True])
+    np.testing.assert_array_equal(recording.landmarks[[0, 2]], landmarks[[0, 2]])
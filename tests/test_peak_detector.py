@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from exercise_detection import ExerciseDetection
+from exercise_specs import EXERCISE_SPECS
+import peak_detector
+from peak_detector import FSM_COUNTING, PEAK_COUNTING, PEAK_FIELDS, PeakDetector
+from synthetic_landmarks import SyntheticExercise
+
+EXERCISES = list(EXERCISE_SPECS)
+
+
+def detect(stream, exercise_name, **options):
+    """
+    Üretilen kareleri tek tek ExerciseDetection'a verir; tekrar olaylarının zamanlarını döndürür.
+    """
+    detection = ExerciseDetection(monitor_all=False, **options)
+    detection.subscribe(exercise_name)
+    rep_times_ms = []
+    for timestamp_ms, frame in zip(*stream.generate()):
+        if np.isnan(frame[0, 0]):
+            continue
+        detection.detect_exercises(frame, timestamp_ms)
+        rep_times_ms += [event["timestamp_ms"] for event in detection.get_events() if event["type"] == "rep"]
+    assert detection.exercises[exercise_name].get_repetition_count() == len(rep_times_ms)
+    return rep_times_ms
+
+
+@pytest.mark.parametrize("exercise_name", EXERCISES)
+def test_counts_ground_truth_on_clean_angles(exercise_name):
+    stream = SyntheticExercise(exercise_name, repetitions=12, seed=3)
+    timestamps_ms = stream.generate()[0]
+    detector = PeakDetector([EXERCISE_SPECS[exercise_name]])
+    rows = np.array([0])
+    for timestamp_ms, angle in zip(timestamps_ms, stream.exercise_angles(timestamps_ms)):
+        detector.update([angle], rows, timestamp_ms)
+    assert detector.repetition_count[0] == stream.ground_truth()["repetition_count"]
+
+
+@pytest.mark.parametrize("exercise_name", EXERCISES)
+@pytest.mark.parametrize("seed", [0, 1])
+def test_counts_ground_truth_on_noisy_landmarks(exercise_name, seed):
+    # Eşikli durum makinesinin tekrar kaçırdığı gürültü düzeyi
+    stream = SyntheticExercise(exercise_name, repetitions=8, jitter=0.004, dropout_rate=0.01, seed=seed)
+    truth = stream.ground_truth()
+    rep_times_ms = detect(stream, exercise_name, peak_counting=(exercise_name,))
+    assert len(rep_times_ms) == truth["repetition_count"]
+    # Her tekrar en alt noktasından sonra, dinlenme açısına dönmeden sayılır
+    assert np.all(np.array(rep_times_ms) > truth["rep_bottom_ms"])
+    assert np.all(np.array(rep_times_ms) <= truth["rep_times_ms"])
+
+
+@pytest.mark.parametrize("exercise_name", ["squat", "arm_raise_lateral_front"])
+def test_shallow_reps_are_not_counted(exercise_name):
+    stream = SyntheticExercise(exercise_name, repetitions=8, range_of_motion=0.3, range_variation=0.0, seed=0)
+    assert detect(stream, exercise_name, peak_counting=(exercise_name,)) == []
+
+
+def test_switching_counting_method_restarts_detector_only():
+    stream = SyntheticExercise("squat", repetitions=6, seed=2)
+    timestamps_ms, landmarks = stream.generate()
+    half = len(timestamps_ms) // 2
+    detection = ExerciseDetection(monitor_all=False)
+    detection.subscribe("squat")
+    for timestamp_ms, frame in zip(timestamps_ms[:half], landmarks[:half]):
+        detection.detect_exercises(frame, timestamp_ms)
+    fsm_reps = detection.exercises["squat"].get_repetition_count()
+    assert fsm_reps > 0
+
+    detection.set_counting("squat", PEAK_COUNTING)
+    assert detection.exercises["squat"].get_repetition_count() == 0
+    for timestamp_ms, frame in zip(timestamps_ms[half:], landmarks[half:]):
+        detection.detect_exercises(frame, timestamp_ms)
+    peak_reps = detection.exercises["squat"].get_repetition_count()
+    assert fsm_reps + peak_reps == stream.ground_truth()["repetition_count"]
+
+    # Durum makinesi her iki yöntemde de saymaya devam eder
+    detection.set_counting("squat", FSM_COUNTING)
+    assert detection.exercises["squat"].get_repetition_count() == stream.ground_truth()["repetition_count"]
+
+
+def test_scalar_update_matches_vectorized_update(monkeypatch):
+    specs = list(EXERCISE_SPECS.values())
+    rng = np.random.default_rng(4)
+    streams = [SyntheticExercise(spec.name, repetitions=6, seed=i) for i, spec in enumerate(specs)]
+    frames = min(len(stream) for stream in streams)
+    timestamps_ms = streams[0].generate(0, frames)[0]
+    angles = np.stack([stream.exercise_angles(timestamps_ms) for stream in streams], axis=1)
+    angles += rng.normal(0.0, 3.0, angles.shape)
+    angles[rng.random(angles.shape) < 0.01] = np.nan
+    rows = np.arange(len(specs))
+
+    def run():
+        detector = PeakDetector(specs, prominence={specs[0].name: 0.0})
+        steps = []
+        for frame_angles, timestamp_ms in zip(angles, timestamps_ms):
+            completed = detector.update(frame_angles, rows, timestamp_ms)
+            steps.append((completed, *(getattr(detector, field).copy() for field, _, _ in PEAK_FIELDS)))
+        return detector, steps
+
+    scalar, scalar_steps = run()
+    monkeypatch.setattr(peak_detector, "SCALAR_MAX_ROWS", 0)
+    _, vectorized_steps = run()
+    for scalar_step, vectorized_step in zip(scalar_steps, vectorized_steps):
+        for scalar_value, vectorized_value in zip(scalar_step, vectorized_step):
+            np.testing.assert_array_equal(scalar_value, vectorized_value)
+    # Belirginliği 0 olan ilk satır her örnekte yön değiştirir; diğerleri tekrar sayar
+    assert scalar.repetition_count[1:].min() > 0
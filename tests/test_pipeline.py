@@ -0,0 +1,175 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from exercise_detection import ExerciseDetection
+from main import is_video_file, run_headless
+from pipeline import PipelinedLoop
+from synthetic_landmarks import SyntheticExercise
+
+
+class FakeVideo:
+    def __init__(self, frame_count, fps=30.0):
+        """
+        Kare numarasını piksellerinde taşıyan video dosyası benzeri kaynak.
+        """
+        self.frame_count = frame_count
+        self.fps = fps
+        self.position = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.position >= self.frame_count:
+            return False, None
+        frame = np.zeros((2, 2, 3), dtype=np.uint8)
+        # BGR -> RGB dönüşümünde 0 ve 2 kanalları yer değiştirir; 1. kanal yerinde kalır
+        frame[..., 0] = frame[..., 2] = self.position % 256
+        frame[..., 1] = self.position // 256
+        self.position += 1
+        return True, frame
+
+    def get(self, prop):
+        assert prop == cv2.CAP_PROP_POS_MSEC
+        return (self.position - 1) * 1000.0 / self.fps
+
+
+def frame_number(image):
+    return int(image[0, 0, 0]) + 256 * int(image[0, 0, 1])
+
+
+class FakePose:
+    def __init__(self, landmarks, latency_s=0.0):
+        """
+        Kare numarasına göre önceden üretilmiş eklemleri döndüren, isteğe bağlı yavaş tahminci.
+        """
+        self.landmarks = landmarks
+        self.latency_s = latency_s
+
+    def estimate(self, image_rgb, timestamp_ms=None):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        landmarks = self.landmarks[frame_number(image_rgb)]
+        return None if np.isnan(landmarks[0, 0]) else landmarks
+
+
+class EventCollector:
+    def __init__(self):
+        self.events = []
+
+    def write(self, event):
+        self.events.append(event)
+
+    def write_all(self, events):
+        self.events.extend(events)
+
+
+def test_video_time_processes_every_frame_in_order():
+    video = FakeVideo(200)
+    seen = []
+
+    def process(frame, timestamp_ms):
+        time.sleep(0.001)  # Çıkarım yakalamadan yavaş
+        seen.append((frame_number(frame), timestamp_ms))
+        return None
+
+    loop = PipelinedLoop(video, process, lambda frame, result: True, video_time=True).run()
+    assert loop.dropped_capture == loop.dropped_render == 0
+    assert loop.processed_frames == loop.rendered_frames == 200
+    assert seen == [(i, i * 1000.0 / 30.0) for i in range(200)]
+
+
+def test_live_mode_keeps_latest_frame():
+    video = FakeVideo(200)
+    seen = []
+
+    def process(frame, timestamp_ms):
+        time.sleep(0.002)
+        seen.append(frame_number(frame))
+        return None
+
+    loop = PipelinedLoop(video, process, lambda frame, result: True).run()
+    # Canlı kaynakta çıkarım geride kalınca eski kareler atılır
+    assert loop.dropped_capture > 0
+    assert seen == sorted(seen)
+
+
+def test_render_can_stop_video_time_loop():
+    loop = PipelinedLoop(FakeVideo(1000), lambda frame, timestamp_ms: None,
+                         lambda frame, result: frame_number(frame) < 9, video_time=True).run()
+    assert loop.rendered_frames == 10
+
+
+def test_live_mode_keep_results_never_drops_results():
+    video = FakeVideo(200)
+    processed, rendered = [], []
+
+    def process(frame, timestamp_ms):
+        processed.append(frame_number(frame))
+        return frame_number(frame)
+
+    def render(frame, result):
+        time.sleep(0.002)  # Çizim çıkarımdan yavaş
+        rendered.append(result)
+        return True
+
+    loop = PipelinedLoop(video, process, render, keep_results=True).run()
+    # Kareler atılabilir ama işlenen her karenin sonucu, akışın sonundakiler dahil, çizilir
+    assert loop.dropped_capture > 0 and loop.dropped_render == 0
+    assert rendered == processed
+    assert loop.rendered_frames == loop.processed_frames
+
+
+def test_only_existing_files_use_video_time(tmp_path):
+    video_path = tmp_path / "session.mp4"
+    video_path.write_bytes(b"")
+    assert is_video_file(str(video_path))
+    assert not is_video_file(str(tmp_path / "missing.mp4"))
+    assert not is_video_file("rtsp://camera.local/stream")
+    assert not is_video_file(0)
+
+
+def test_headless_pipeline_on_live_source_writes_every_result():
+    synthetic = SyntheticExercise("squat", repetitions=2, rep_duration_s=2.0, seed=3)
+    _, landmarks = synthetic.generate()
+    detection = ExerciseDetection(monitor_all=False)
+    detection.subscribe("squat")
+    batches = []
+
+    class SlowWriter(EventCollector):
+        def write_all(self, events):
+            time.sleep(0.002)  # Yazma çıkarımdan yavaş
+            batches.append(list(events))
+            super().write_all(events)
+
+    class LiveVideo(FakeVideo):
+        def read(self):
+            time.sleep(0.001)  # Kamera hızında kare
+            return super().read()
+
+    writer = SlowWriter()
+    run_headless(LiveVideo(len(landmarks)), FakePose(landmarks), detection, "squat", writer, pipelined=True)
+    # Canlı kaynakta da işlenen her karenin olay listesi yazılır
+    assert writer.events[-1]["frames"] > 1
+    assert len(batches) == writer.events[-1]["frames"]
+
+
+@pytest.mark.parametrize("exercise", ["squat", "arm_raise_lateral_front"])
+def test_headless_pipeline_on_video_matches_serial(exercise):
+    synthetic = SyntheticExercise(exercise, repetitions=4, rep_duration_s=2.0, dropout_rate=0.01, seed=3)
+    _, landmarks = synthetic.generate()
+    results = []
+    for pipelined in (False, True):
+        detection = ExerciseDetection(monitor_all=False)
+        detection.subscribe(exercise)
+        writer = EventCollector()
+        run_headless(FakeVideo(len(landmarks)), FakePose(landmarks, latency_s=0.0005 * pipelined), detection,
+                     exercise, writer, pipelined=pipelined, video_time=True)
+        results.append(writer.events)
+    serial, pipelined = results
+    assert pipelined == serial
+    assert serial[-1]["repetition_count"] == 4
+    assert serial[-1]["frames"] == len(landmarks)
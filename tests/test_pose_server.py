@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from frame_scheduler import SUPERSEDED, FrameDropped
+from pose_protocol import ACK, BYE, ERROR, LANDMARKS, encode_landmarks, encode_message, read_message
+from pose_server import PoseServer, ServerSession
+from synthetic_landmarks import SyntheticExercise
+
+
+class FakeWriter:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+async def read_all(data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(bytes(data))
+    reader.feed_eof()
+    messages = []
+    while True:
+        header, _ = await read_message(reader)
+        if header is None:
+            return messages
+        messages.append(header)
+
+
+class FakeFrame:
+    def __init__(self, frame_number, timestamp_ms):
+        self.frame_number = frame_number
+        self.timestamp_ms = timestamp_ms
+        self.received_at = time.perf_counter()
+        self.future = asyncio.get_running_loop().create_future()
+
+
+def test_failed_frames_are_reported_as_errors():
+    landmarks = SyntheticExercise("squat", repetitions=1, seed=0).generate()[1]
+
+    async def run():
+        server = PoseServer(workers=0)
+        session = ServerSession(1, ["squat"], acks=True)
+        frames = [FakeFrame(i, i * 33.0) for i in range(4)]
+        frames[0].future.set_result(landmarks[0])
+        frames[1].future.set_exception(RuntimeError("bozuk kare"))
+        frames[2].future.set_result(None)
+        frames[3].future.set_result(FrameDropped(SUPERSEDED))
+        for frame in frames + [None]:
+            session.pending.put_nowait(frame)
+        writer = FakeWriter()
+        await server._send_results(session, writer)
+        return server, session, await read_all(writer.data)
+
+    server, session, messages = asyncio.run(run())
+    acks = {message["frame"]: message for message in messages if message["type"] == ACK}
+    errors = [message for message in messages if message["type"] == ERROR]
+    assert sorted(acks) == [0, 2, 3]
+    assert acks[0]["detected"] and not acks[2]["detected"]
+    assert acks[3]["dropped"] == SUPERSEDED
+    assert [(error["frame"], error["message"]) for error in errors] == [(1, "bozuk kare")]
+    assert server.frames_processed == 2
+    assert server.frames_failed == 1
+    assert server.frames_dropped == 1
+    assert session.detected_frames == 1
+    assert server.report()["frames_failed"] == 1
+
+
+def test_filtered_landmark_session_accepts_read_only_payload():
+    stream = SyntheticExercise("squat", repetitions=3, seed=1)
+    timestamps_ms, landmarks = stream.generate()
+
+    async def run():
+        server = PoseServer(workers=0)
+        session = ServerSession(1, ["squat"], landmark_filter=True, acks=True)
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_message({"type": LANDMARKS, "count": len(timestamps_ms)},
+                                        encode_landmarks(timestamps_ms, landmarks)))
+        reader.feed_data(encode_message({"type": BYE}))
+        writer = FakeWriter()
+        await server._receive_landmarks(session, reader, writer)
+        return session, await read_all(writer.data)
+
+    session, messages = asyncio.run(run())
+    assert sum(message["type"] == "rep" for message in messages) == stream.ground_truth()["repetition_count"]
+    assert session.repetition_count("squat") == stream.ground_truth()["repetition_count"]
+    assert messages[-1]["type"] == ACK and messages[-1]["frames"] == len(timestamps_ms)
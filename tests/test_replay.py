@@ -0,0 +1,15 @@
+import pytest
+
+from replay import parse_args
+
+
+@pytest.mark.parametrize("mode", ["classes", "both"])
+@pytest.mark.parametrize("option", [["--peak-counting", "squat"], ["--landmark-filter"]])
+def test_engine_only_options_rejected_for_class_path(mode, option):
+    with pytest.raises(SystemExit):
+        parse_args(["session.lmk", "--mode", mode, *option])
+
+
+def test_engine_only_options_accepted_for_engine():
+    args = parse_args(["session.lmk", "--peak-counting", "squat", "--landmark-filter"])
+    assert args.peak_counting == ["squat"] and args.landmark_filter
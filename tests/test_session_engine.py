@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import session_engine
+from session_engine import measure_throughput, session_ticks
+from synthetic_landmarks import synthetic_sessions
+
+
+@pytest.mark.parametrize("chunk_ticks", [1, 7, 64])
+def test_session_ticks_match_whole_streams(chunk_ticks):
+    sessions = synthetic_sessions(5, seed=3, repetitions=2, block_frames=16)
+    n_ticks = min(session.frame_count for session in sessions)
+    chunks = list(session_ticks(sessions, n_ticks, chunk_ticks))
+    assert all(len(timestamps_ms) <= chunk_ticks for timestamps_ms, _ in chunks)
+
+    timestamps_ms = np.concatenate([chunk[0] for chunk in chunks])
+    landmarks = np.concatenate([chunk[1] for chunk in chunks])
+    for i, session in enumerate(sessions):
+        expected_timestamps_ms, expected_landmarks = session.generate(0, n_ticks)
+        np.testing.assert_array_equal(timestamps_ms[:, i], expected_timestamps_ms)
+        np.testing.assert_array_equal(landmarks[:, i], expected_landmarks)
+
+
+def test_measure_throughput_streams_cover_all_ticks(monkeypatch):
+    # Küçük bellek bütçesi: parça başına birkaç tik; hızlı tempoda tahmini
+    # tekrar sayısı n_ticks kareyi dolduramaz ve artırılmak zorundadır
+    monkeypatch.setattr(session_engine, "THROUGHPUT_CHUNK_BYTES", 3 * 4 * 33 * 4 * 8)
+    monkeypatch.setattr(session_engine, "synthetic_sessions", lambda *args, **options: synthetic_sessions(
+        *args, rep_duration_s=0.3, lead_in_s=0.1, **options))
+    steps = []
+    step = session_engine.MultiSessionEngine.step
+
+    def counting_step(self, landmarks, timestamps_ms=None):
+        steps.append(landmarks.shape[0])
+        return step(self, landmarks, timestamps_ms=timestamps_ms)
+
+    monkeypatch.setattr(session_engine.MultiSessionEngine, "step", counting_step)
+    assert measure_throughput(3, n_ticks=400) > 0
+    assert steps == [3] * 400